@@ -0,0 +1,171 @@
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Benchmark:
+    """
+    One benchmark case: `setup(**params)` builds the state and returns a
+    zero-argument callable that performs one operation. `items` is how many
+    units (agents, messages, ...) one operation processes, so results can
+    also be read as a rate.
+    """
+    def __init__(self, name: str, setup: Callable[..., Callable[[], Any]], params: List[Dict[str, Any]],
+                 unit: str = "op", items: Optional[Callable[..., int]] = None,
+                 quick_params: Optional[List[Dict[str, Any]]] = None):
+        self.name = name
+        self.setup = setup
+        self.params = params
+        self.quick_params = quick_params if quick_params is not None else params[:1]
+        self.unit = unit
+        self.items = items
+
+
+def key(name: str, params: Dict[str, Any]) -> str:
+    """
+    Stable identifier used to match results against a baseline.
+    """
+    if not params:
+        return name
+    return name + "[" + ",".join(f"{k}={params[k]}" for k in sorted(params)) + "]"
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    """
+    Time `fn` like timeit.autorange: pick a loop count that takes at least
+    `min_time` / `repeat` seconds, then take `repeat` samples.
+    Returns seconds per call (median, min, max, stdev) and the loop count.
+    """
+    fn()  # warm-up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / repeat / elapsed) + 1))
+
+    samples = []
+    # Like timeit, keep collector pauses out of the samples
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+    }
+
+
+def run(benchmarks: List[Benchmark], quick: bool = False, select: Optional[str] = None,
+        repeat: int = 5, min_time: float = 0.2, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Run every case whose key contains `select` and return the results
+    document (metadata plus one record per case).
+    """
+    results = []
+    for bench in benchmarks:
+        for params in (bench.quick_params if quick else bench.params):
+            name = key(bench.name, params)
+            if select and select not in name:
+                continue
+            fn = bench.setup(**params)
+            stats = measure(fn, repeat=repeat, min_time=min_time)
+            record = {"key": name, "name": bench.name, "params": params, "unit": bench.unit, **stats}
+            if bench.items is not None:
+                record["items"] = bench.items(**params)
+                record["items_per_sec"] = record["items"] / stats["median"]
+            results.append(record)
+            log(format_record(record))
+    return {"metadata": metadata(quick), "results": results}
+
+
+def format_record(record: Dict[str, Any]) -> str:
+    line = f"{record['key']:55s} {_format_time(record['median']):>10s}/{record['unit']}"
+    line += f"  (+-{_format_time(record['stdev'])})"
+    if "items_per_sec" in record:
+        line += f"  {record['items_per_sec']:14,.0f} items/s"
+    return line
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Tuple[str, float, float, float]]:
+    """
+    Match results to baseline by key. Returns (key, baseline median,
+    current median, ratio) for every case slower than the baseline by
+    more than `threshold` (0.2 = 20%).
+    """
+    base = {r["key"]: r for r in baseline["results"]}
+    regressions = []
+    for record in results["results"]:
+        old = base.get(record["key"])
+        if old is None:
+            continue
+        ratio = record["median"] / old["median"]
+        if ratio > 1.0 + threshold:
+            regressions.append((record["key"], old["median"], record["median"], ratio))
+    return regressions
+
+
+def report(results: Dict[str, Any], baseline: Dict[str, Any], log: Callable[[str], None] = print):
+    base = {r["key"]: r for r in baseline["results"]}
+    for record in results["results"]:
+        old = base.get(record["key"])
+        if old is None:
+            log(f"{record['key']:55s} {'new':>10s}")
+            continue
+        ratio = record["median"] / old["median"]
+        log(f"{record['key']:55s} {_format_time(old['median']):>10s} -> {_format_time(record['median']):>10s}  x{ratio:.2f}")
+
+
+def metadata(quick: bool) -> Dict[str, Any]:
+    import numpy
+    import torch
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "quick": quick,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "numpy": numpy.__version__,
+        "torch": torch.__version__,
+    }
+
+
+def save(results: Dict[str, Any], path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f}{unit}"
+    return f"{seconds / 1e-9:.1f}ns"
@@ -0,0 +1,221 @@
+"""
+Benchmark suite for the simulation engine and training loop.
+
+    python benchmarks/run.py                        # full suite, print results
+    python benchmarks/run.py --quick -o out.json     # small sizes, save JSON
+    python benchmarks/run.py --baseline base.json    # compare; exit 1 on regressions
+    python benchmarks/run.py -k env_step             # only matching cases
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import torch
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.harness import Benchmark, compare, load, report, run, save
+from src.agents.abstract import TaskAgent
+from src.agents.physical import TruckAgent
+from src.core.agent import Agent
+from src.core.events import EventScheduler
+from src.core.communication import CommunicationChannel, Message, MessagePool, MessageType
+from src.learning.rl_policy import RLPolicy
+from src.simulation.environment import LogisticsEnv
+from src.simulation.parallel_env import ring_world
+from src.vis.visualizer import Visualizer
+
+
+def env_sizes(*pairs):
+    return [{"trucks": t, "warehouses": w} for t, w in pairs]
+
+
+# --- World.tick throughput vs. agent count ---
+
+def setup_world_tick(agents):
+    # One warehouse per 10 agents in a ring, the rest trucks asking for work
+    num_warehouses = max(2, agents // 10)
+    world = ring_world(num_warehouses)
+    for i in range(agents - num_warehouses):
+        truck = TruckAgent(agent_id=world.next_id())
+        world.add_agent(truck)
+        world.place(truck.id, i % num_warehouses)
+    world.tick()
+    return world.tick
+
+
+def setup_sparse_tick(agents, scheduler):
+    # 100 trucks on 100 warehouses; every other agent is an idle task
+    world = ring_world(100)
+    if scheduler == "event":
+        world.scheduler = EventScheduler()
+        world.scheduler.bind(world)
+    for i in range(100):
+        truck = TruckAgent(agent_id=world.next_id())
+        world.add_agent(truck)
+        world.place(truck.id, i)
+    for i in range(agents - 200):
+        task = TaskAgent(origin=i % 100, destination=(i + 1) % 100, agent_id=world.next_id())
+        world.add_agent(task)
+        world.place(task.id, task.origin)
+    world.tick()
+    return world.tick
+
+
+# --- Message routing vs. volume ---
+
+def setup_routing(messages, pooled=False):
+    receivers = max(1, messages // 100)
+    channel = CommunicationChannel()
+    agents = {r: Agent(agent_id=r) for r in range(receivers)}
+    pool = MessagePool() if pooled else None
+
+    def route_tick():
+        for s in range(messages):
+            if pool is not None:
+                msg = pool.acquire(s, s % receivers, MessageType.ASK, "Any tasks?")
+            else:
+                msg = Message(s, s % receivers, MessageType.ASK, "Any tasks?")
+            msg.refs = 1
+            channel.send(msg)
+        delivered = [] if pool is not None else None
+        channel.route(agents, delivered)
+        for agent in agents.values():
+            agent.inbox.clear()
+        if pool is not None:
+            pool.release_delivered(delivered)
+    return route_tick
+
+
+# --- LogisticsEnv ---
+
+def setup_env_step(trucks, warehouses):
+    env = LogisticsEnv(num_trucks=trucks, num_warehouses=warehouses)
+    env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 5, size=(256, trucks)).tolist()
+    step = [0]
+
+    def env_step():
+        _, _, _, truncated, _ = env.step(actions[step[0] % 256])
+        step[0] += 1
+        if truncated:
+            env.reset()
+    return env_step
+
+
+def setup_env_reset(trucks, warehouses):
+    env = LogisticsEnv(num_trucks=trucks, num_warehouses=warehouses)
+    env.reset(seed=0)
+    return env.reset
+
+
+def setup_get_obs(trucks, warehouses, dirty):
+    env = LogisticsEnv(num_trucks=trucks, num_warehouses=warehouses)
+    env.reset(seed=0)
+    env.step([1] * trucks)
+    if not dirty:
+        return env._get_obs
+    # Worst case: every truck and warehouse changed since the last call
+    agents = env.world.agents_by_role("truck") + env.world.agents_by_role("warehouse")
+    encoder = env._encoder
+
+    def get_obs_all_dirty():
+        for agent in agents:
+            encoder.mark_dirty(agent)
+        return env._get_obs()
+    return get_obs_all_dirty
+
+
+# --- RLPolicy ---
+
+def setup_rl_decide(batch):
+    torch.set_num_threads(1)
+    torch.manual_seed(0)
+    env = LogisticsEnv()
+    obs, _ = env.reset(seed=0)
+    policy = RLPolicy(input_dim=len(obs), output_dim=5)
+    policy.eval()
+    states = [{"vector": obs}] * batch
+    if batch == 1:
+        return lambda: policy.decide(states[0], None)
+    return lambda: policy.decide_batch(states, None)
+
+
+# --- Visualizer.draw ---
+
+def setup_vis_draw(trucks, warehouses):
+    env = LogisticsEnv(num_trucks=trucks, num_warehouses=warehouses)
+    env.reset(seed=0)
+    for _ in range(20):
+        env.step([1] * trucks)
+    output_dir = tempfile.TemporaryDirectory(prefix="bench_vis_")
+    vis = Visualizer(env.world, output_dir=output_dir.name)
+
+    def vis_draw():
+        vis.draw()
+    # Keep the directory alive as long as the case; it is removed with it
+    vis_draw.output_dir = output_dir
+    return vis_draw
+
+
+BENCHMARKS = [
+    Benchmark("world_tick", setup_world_tick, [{"agents": n} for n in (100, 1000, 10000)],
+              unit="tick", items=lambda agents: agents,
+              quick_params=[{"agents": 100}, {"agents": 1000}]),
+    Benchmark("sparse_tick", setup_sparse_tick,
+              [{"agents": n, "scheduler": k} for n in (1000, 10000, 100000) for k in ("sequential", "event")],
+              unit="tick", quick_params=[{"agents": 1000, "scheduler": "event"}]),
+    Benchmark("routing", setup_routing,
+              [{"messages": n, "pooled": p} for n in (1000, 10000, 100000) for p in (False, True)],
+              unit="tick", items=lambda messages, pooled: messages,
+              quick_params=[{"messages": 1000, "pooled": False}, {"messages": 1000, "pooled": True}]),
+    Benchmark("env_step", setup_env_step, env_sizes((4, 8), (16, 32), (64, 128)), unit="step",
+              quick_params=env_sizes((4, 8), (16, 32))),
+    Benchmark("env_reset", setup_env_reset, env_sizes((4, 8), (16, 32), (64, 128)), unit="reset",
+              quick_params=env_sizes((4, 8))),
+    Benchmark("get_obs", setup_get_obs,
+              [{**size, "dirty": d} for size in env_sizes((4, 8), (64, 128)) for d in (False, True)],
+              unit="call", quick_params=[{"trucks": 4, "warehouses": 8, "dirty": True}]),
+    Benchmark("rl_decide", setup_rl_decide, [{"batch": b} for b in (1, 64, 1024)],
+              unit="call", items=lambda batch: batch, quick_params=[{"batch": 1}, {"batch": 64}]),
+    Benchmark("vis_draw", setup_vis_draw, env_sizes((4, 8), (16, 32)), unit="frame"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation engine and training loop benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes, for CI and smoke runs")
+    parser.add_argument("-k", dest="select", default=None, help="Only run cases whose key contains this")
+    parser.add_argument("-o", "--output", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Compare against a saved results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown vs. baseline counted as a regression (0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds spent measuring each case")
+    args = parser.parse_args()
+
+    results = run(BENCHMARKS, quick=args.quick, select=args.select, repeat=args.repeat, min_time=args.min_time)
+    if args.output:
+        save(results, args.output)
+        print(f"Results saved to {args.output}")
+    if args.baseline:
+        baseline = load(args.baseline)
+        print(f"\nBaseline {args.baseline} (commit {baseline['metadata'].get('commit')}):")
+        report(results, baseline)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for name, old, new, ratio in regressions:
+                print(f"  {name}: x{ratio:.2f}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
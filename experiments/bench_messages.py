@@ -0,0 +1,128 @@
+import argparse
+import sys
+import os
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.agent import Agent
+from src.core.communication import CommunicationChannel, Message, MessagePool, MessageType
+from src.core.world import World
+
+
+@dataclass
+class LegacyMessage:
+    """
+    The original Message: plain dataclass with a uuid4 string ID.
+    """
+    sender_id: str
+    receiver_id: str
+    msg_type: MessageType
+    content: Any
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    timestamp: int = 0
+
+
+class Asker(Agent):
+    """
+    Sends one ASK per tick to a fixed receiver, like an idle TruckAgent.
+    """
+    def __init__(self, target):
+        super().__init__(role="asker")
+        self.target = target
+
+    def decide(self):
+        super().decide()
+        self.send_message(self.target, MessageType.ASK, "Any tasks?")
+        return []
+
+
+def bytes_per_message(factory, n=10000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = [factory(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return (after - before) / n
+
+
+def bench_legacy(senders, receivers, ticks):
+    inboxes = {r: [] for r in range(receivers)}
+    start = time.perf_counter()
+    for tick in range(ticks):
+        queue = [LegacyMessage(s, s % receivers, MessageType.ASK, "Any tasks?") for s in range(senders)]
+        for msg in queue:
+            msg.timestamp = tick
+            if msg.receiver_id in inboxes:
+                inboxes[msg.receiver_id].append(msg)
+        for inbox in inboxes.values():
+            inbox.clear()
+    return senders * ticks / (time.perf_counter() - start)
+
+
+def bench_slotted(senders, receivers, ticks, pool=None):
+    channel = CommunicationChannel()
+    agents = {r: Agent(agent_id=r) for r in range(receivers)}
+    start = time.perf_counter()
+    for tick in range(ticks):
+        for s in range(senders):
+            if pool is not None:
+                msg = pool.acquire(s, s % receivers, MessageType.ASK, "Any tasks?")
+            else:
+                msg = Message(s, s % receivers, MessageType.ASK, "Any tasks?")
+            msg.timestamp = tick
+            msg.refs = 1
+            channel.send(msg)
+        delivered = [] if pool is not None else None
+        channel.route(agents, delivered)
+        for agent in agents.values():
+            agent.inbox.clear()
+        if pool is not None:
+            pool.release_delivered(delivered)
+    return senders * ticks / (time.perf_counter() - start)
+
+
+def bench_world(senders, receivers, ticks, pool=None):
+    world = World(message_pool=pool)
+    targets = [Agent(role="warehouse") for _ in range(receivers)]
+    for t in targets:
+        world.add_agent(t)
+    for i in range(senders):
+        world.add_agent(Asker(targets[i % receivers].id))
+    world.tick()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        world.tick()
+    return senders * ticks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Message throughput before/after slotted + pooled messages")
+    parser.add_argument("--senders", type=int, default=5000)
+    parser.add_argument("--receivers", type=int, default=50)
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    legacy_bytes = bytes_per_message(lambda i: LegacyMessage(i, i, MessageType.ASK, None))
+    slotted_bytes = bytes_per_message(lambda i: Message(i, i, MessageType.ASK, None))
+    print(f"bytes/message: legacy {legacy_bytes:.0f}, slotted {slotted_bytes:.0f}")
+
+    rows = [
+        ("legacy dataclass + uuid4", bench_legacy(args.senders, args.receivers, args.ticks)),
+        ("slotted", bench_slotted(args.senders, args.receivers, args.ticks)),
+        ("slotted + pool", bench_slotted(args.senders, args.receivers, args.ticks, MessagePool())),
+        ("World.tick", bench_world(args.senders, args.receivers, args.ticks)),
+        ("World.tick + pool", bench_world(args.senders, args.receivers, args.ticks, MessagePool())),
+    ]
+    for name, rate in rows:
+        print(f"{name:28s} {rate:12,.0f} msgs/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,20 @@
 import streamlit as st
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import networkx as nx
+import functools
 import sys
 import os
 import time
 import numpy as np
+from matplotlib.collections import LineCollection
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.simulation.environment import LogisticsEnv
-from src.core.world import World
+from src.simulation.live import LiveSimulation
 
 st.set_page_config(page_title="Emergent MAS Dashboard", layout="wide")
 
@@ -18,9 +22,60 @@ st.title("Autonomous World Engine Dashboard")
 
 # Sidebar controls
 st.sidebar.header("Simulation Config")
-num_trucks = st.sidebar.slider("Number of Trucks", 1, 10, 3)
-num_warehouses = st.sidebar.slider("Number of Warehouses", 2, 10, 5)
-run_sim = st.sidebar.button("Run Simulation")
+num_trucks = st.sidebar.slider("Number of Trucks", 1, 2000, 3)
+num_warehouses = st.sidebar.slider("Number of Warehouses", 2, 500, 5)
+fps = st.sidebar.slider("Dashboard FPS", 1, 30, 10)
+start_sim = st.sidebar.button("Start Simulation")
+stop_sim = st.sidebar.button("Stop Simulation")
+
+
+class WarehouseView:
+    """
+    Persistent figure for LiveFrames: the layout is computed once per
+    simulation, and each frame only updates marker sizes and colours
+    (trucks present / tasks waiting per warehouse).
+    """
+    def __init__(self, num_warehouses, edges):
+        graph = nx.Graph()
+        graph.add_nodes_from(range(num_warehouses))
+        graph.add_edges_from(map(tuple, edges.tolist()))
+        layout = nx.spring_layout(graph, seed=42) if num_warehouses < 500 else nx.circular_layout(graph)
+        self.xy = np.array([layout[i] for i in range(num_warehouses)])
+        self.fig, self.ax = plt.subplots(figsize=(8, 6))
+        self.ax.set_axis_off()
+        self.ax.add_collection(LineCollection(self.xy[edges], colors="lightgray", linewidths=0.8, zorder=1))
+        self.nodes = self.ax.scatter(self.xy[:, 0], self.xy[:, 1], s=40, c=np.zeros(num_warehouses),
+                                     cmap="Reds", vmin=0, vmax=5, edgecolors="black", zorder=2)
+        self.fig.colorbar(self.nodes, ax=self.ax, label="Tasks waiting")
+        self.title = self.ax.set_title("")
+
+    def render(self, frame):
+        # Marker area grows with the number of trucks at the warehouse
+        self.nodes.set_sizes(40 + 60 * np.sqrt(frame.trucks_at))
+        self.nodes.set_array(frame.inventory)
+        self.nodes.set_clim(0, max(5, int(frame.inventory.max(initial=0))))
+        self.title.set_text(f"Episode {frame.episode}, tick {frame.tick}")
+        self.fig.canvas.draw()
+        return np.asarray(self.fig.canvas.buffer_rgba())
+
+    def close(self):
+        plt.close(self.fig)
+
+
+# The simulation lives in its own process, kept across script reruns;
+# this script only attaches to it and polls at its own frame rate.
+if stop_sim and "sim" in st.session_state:
+    st.session_state.pop("sim").stop()
+    st.session_state.pop("view").close()
+
+if start_sim:
+    if "sim" in st.session_state:
+        st.session_state.pop("sim").stop()
+        st.session_state.pop("view").close()
+    env_fn = functools.partial(LogisticsEnv, num_trucks=num_trucks, num_warehouses=num_warehouses)
+    sim = LiveSimulation(env_fn, publish_interval=1.0 / 30, context="spawn")
+    st.session_state["sim"] = sim
+    st.session_state["view"] = WarehouseView(sim.num_warehouses, sim.edges)
 
 # Placeholders for live updates
 col1, col2 = st.columns([2, 1])
@@ -29,48 +84,23 @@ with col1:
 with col2:
     metrics_placeholder = st.empty()
 
-if run_sim:
-    env = LogisticsEnv(num_trucks=num_trucks, num_warehouses=num_warehouses)
-    env.reset()
-    
-    # Run for 50 ticks
-    for i in range(50):
-        # Random actions for now
-        actions = [np.random.randint(0, 5) for _ in range(num_trucks)]
-        env.step(actions)
-        
-        # Draw Graph
-        fig, ax = plt.subplots(figsize=(8, 6))
-        pos = nx.spring_layout(env.world.graph, seed=42)
-        
-        colors = []
-        labels = {}
-        for node in env.world.graph.nodes():
-            agent = env.world.agents.get(node)
-            if agent:
-                labels[node] = f"{agent.role[:1]}.{agent.id[:4]}"
-                if agent.role == "truck":
-                    colors.append("blue")
-                elif agent.role == "warehouse":
-                    colors.append("red")
-                elif agent.role == "task":
-                    colors.append("green")
-                else:
-                    colors.append("gray")
-            else:
-                colors.append("black")
-                labels[node] = "?"
-                
-        nx.draw(env.world.graph, pos, ax=ax, node_color=colors, with_labels=True, labels=labels)
-        ax.set_title(f"Tick: {env.world.tick_count}")
-        
-        with col1:
-            graph_placeholder.pyplot(fig)
-        plt.close(fig)
-        
-        # Update Metrics
-        with col2:
-            metrics_placeholder.metric("Tick", env.world.tick_count)
-            metrics_placeholder.metric("Active Agents", len(env.world.agents))
-            
-        time.sleep(0.1)
+if "sim" not in st.session_state:
+    st.info("Start a simulation from the sidebar.")
+else:
+    sim = st.session_state["sim"]
+    view = st.session_state["view"]
+    while True:
+        frame = sim.read()
+        if frame is not None:
+            graph_placeholder.image(view.render(frame))
+            with metrics_placeholder.container():
+                st.metric("Tick", frame.tick)
+                st.metric("Sim steps/sec", f"{frame.metrics['steps_per_sec']:,.0f}")
+                st.metric("Deliveries", int(frame.metrics["deliveries"]))
+                st.metric("Episode reward", f"{frame.metrics['episode_reward']:.2f}")
+                st.metric("Active Agents", int(frame.metrics["agents"]))
+            if frame.finished:
+                break
+        if not sim.is_alive():
+            break
+        time.sleep(1.0 / fps)
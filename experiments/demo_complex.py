@@ -11,36 +11,44 @@ import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.simulation.environment import LogisticsEnv
-from src.vis.visualizer import Visualizer
-from src.core.metrics import MetricsLogger
+from src.core.trajectory import TrajectoryRecorder
+from src.core.metrics import StreamingMetricsLogger
+from experiments.make_gif import make_gif_from_trajectory
 
 def run_complex_demo():
     # Initialize environment with 3 trucks and 5 warehouses
     env = LogisticsEnv(num_trucks=3, num_warehouses=5)
     env.reset()
     
-    vis = Visualizer(env.world, output_dir="outputs")
-    logger = MetricsLogger(filepath="outputs/complex_metrics.csv")
+    # Every tick is streamed to disk; the GIF is rendered from the recording afterwards
+    recorder = TrajectoryRecorder(env.world, "outputs/complex_trajectory")
+    logger = StreamingMetricsLogger("outputs/complex_metrics")
     
     print("Starting complex simulation...")
     
     # Run for 50 ticks
     for i in range(50):
         # Simple Heuristic Policy:
-        # If truck has cargo, move to destination (if neighbor) or random neighbor
+        # If truck has cargo, follow the routing table's next hop to its destination
         # If truck is empty, move to random neighbor
         
         actions = []
-        trucks = [a for a in env.world.agents.values() if a.role == "truck"]
-        trucks.sort(key=lambda x: x.id)
+        trucks = sorted(env.world.agents_by_role("truck"), key=lambda x: x.id)
         
         for truck in trucks:
-            neighbors = list(env.world.graph.neighbors(truck.location))
+            neighbors = list(env.world.neighbors(truck.location))
             if not neighbors:
                 actions.append(0) # Stay
                 continue
+
+            if truck.cargo:
+                task = env.world.agents.get(truck.cargo[0])
+                hop = env.world.routing.next_hop(truck.location, task.destination) if task else None
+                if hop in neighbors:
+                    actions.append(neighbors.index(hop) + 1)
+                    continue
                 
-            # Random walk for now
+            # Random walk otherwise
             # Action 1 corresponds to neighbors[0], Action 2 to neighbors[1], etc.
             choice = random.randint(0, len(neighbors) - 1)
             actions.append(choice + 1)
@@ -48,9 +56,6 @@ def run_complex_demo():
         # Step environment
         obs, reward, terminated, truncated, info = env.step(actions)
         
-        # Visualize
-        vis.draw()
-        
         # Log metrics
         metrics = {
             "tick": i,
@@ -64,8 +69,9 @@ def run_complex_demo():
             print(f"Tick {i}: {len(env.world.agents)} agents active.")
 
     print("Complex simulation finished.")
-    vis.close()
-    logger.save()
+    recorder.close()
+    logger.close()
+    make_gif_from_trajectory("outputs/complex_trajectory", "outputs/complex.gif")
 
 if __name__ == "__main__":
     run_complex_demo()
@@ -13,6 +13,7 @@ from src.core.world import World
 from src.agents.physical import TruckAgent, WarehouseAgent
 from src.agents.abstract import TaskAgent
 from src.vis.visualizer import Visualizer
+from src.vis.frames import GifFrameSink
 from src.core.communication import MessageType
 from src.core.metrics import MetricsLogger
 
@@ -40,18 +41,16 @@ def run_demo():
     world.connect_agents(w3.id, w1.id) # Cycle
     
     # Place trucks
-    t1.location = w1.id
-    t2.location = w2.id
-    world.connect_agents(t1.id, w1.id) # Truck is at W1
-    world.connect_agents(t2.id, w2.id) # Truck is at W2
+    world.place(t1.id, w1.id) # Truck is at W1
+    world.place(t2.id, w2.id) # Truck is at W2
     
     # Add some tasks to warehouses
     task1 = TaskAgent(origin=w1.id, destination=w3.id)
     w1.inventory.append(task1.id)
     world.add_agent(task1) 
-    world.connect_agents(task1.id, w1.id)
+    world.place(task1.id, w1.id)
 
-    vis = Visualizer(world, output_dir="outputs")
+    vis = Visualizer(world, sink=GifFrameSink("outputs/demo.gif"))
     logger = MetricsLogger(filepath="outputs/demo_metrics.csv")
     
     print("Starting simulation...")
@@ -72,7 +71,7 @@ def run_demo():
             task2 = TaskAgent(origin=w2.id, destination=w1.id)
             w2.inventory.append(task2.id)
             world.add_agent(task2)
-            world.connect_agents(task2.id, w2.id)
+            world.place(task2.id, w2.id)
             
         time.sleep(0.1)
 
@@ -13,6 +13,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from src.simulation.environment import LogisticsEnv
 from src.learning.rl_policy import RLPolicy
 from src.vis.visualizer import Visualizer
+from src.vis.frames import GifFrameSink
 from src.core.metrics import MetricsLogger
 
 def run_trained_demo():
@@ -32,8 +33,10 @@ def run_trained_demo():
         print(f"Loaded trained model from {model_path}")
     else:
         print(f"Model not found at {model_path}. Running with random weights.")
+    # Inference only: no log-probs recorded, forward pass under torch.inference_mode
+    policy.eval()
 
-    vis = Visualizer(env.world, output_dir="outputs")
+    vis = Visualizer(env.world, sink=GifFrameSink("outputs/trained.gif"))
     logger = MetricsLogger(filepath="outputs/trained_metrics.csv")
     
     print("Starting trained agent simulation...")
@@ -47,12 +50,11 @@ def run_trained_demo():
         
         # Get action from policy (deterministic or stochastic? decide samples stochastically)
         # For demo, stochastic is fine, or we could modify to take argmax.
-        # Let's stick to the policy's decide method.
-        action_list = policy.decide(state_dict, None)
-        action = action_list[0]
+        # Let's stick to the policy's decide method (batched over trucks).
+        actions = [a[0] for a in policy.decide_batch([state_dict] * env.num_trucks, None)]
         
         # Step environment
-        next_obs, reward, terminated, truncated, info = env.step([action])
+        next_obs, reward, terminated, truncated, info = env.step(actions)
         
         total_reward += reward
         obs = next_obs
@@ -61,7 +63,7 @@ def run_trained_demo():
         vis.draw()
         
         # Find the truck agent for logging
-        truck = next((a for a in env.world.agents.values() if a.role == "truck"), None)
+        truck = next(iter(env.world.agents_by_role("truck")), None)
         cargo_status = 1 if truck and truck.cargo else 0
         
         # Log metrics
@@ -2,6 +2,19 @@ import glob
 import contextlib
 from PIL import Image
 import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.trajectory import TrajectoryReader
+from src.vis.frames import GifWriter
+from src.vis.visualizer import ROLE_COLORS
 
 def make_gif(input_folder="outputs", output_file="outputs/simulation.gif", duration=200):
     # Find all PNG files
@@ -14,20 +27,64 @@ def make_gif(input_folder="outputs", output_file="outputs/simulation.gif", durat
 
     print(f"Found {len(img_paths)} frames. Creating GIF...")
 
-    # Load images
-    images = [Image.open(f) for f in img_paths]
-    
-    # Save as GIF
-    images[0].save(
-        output_file,
-        format='GIF',
-        append_images=images[1:],
-        save_all=True,
-        duration=duration,
-        loop=0
-    )
+    # Stream frames one at a time: memory does not grow with the frame count
+    writer = GifWriter(output_file, duration=duration)
+    for f in img_paths:
+        with Image.open(f) as image:
+            writer.write(image)
+    writer.close()
     
     print(f"GIF saved to {output_file}")
 
+def make_gif_from_trajectory(trajectory_dir, output_file="outputs/simulation.gif", start=0, stop=None, duration=200):
+    """
+    Render frames [start, stop) of a recorded trajectory straight into a
+    streaming GIF, without re-simulating or writing intermediate PNGs.
+    Static nodes keep one layout; trucks and tasks are drawn next to the
+    node they occupy.
+    """
+    reader = TrajectoryReader(trajectory_dir)
+    if start >= len(reader):
+        print(f"No frames in {trajectory_dir} from {start}")
+        return
+
+    fig, ax = plt.subplots()
+    pos = None
+    writer = GifWriter(output_file, duration=duration)
+    for state in reader.iter_states(start, stop):
+        graph = nx.Graph()
+        graph.add_edges_from(map(tuple, state.edges.tolist()))
+        if pos is None or any(n not in pos for n in graph):
+            pos = nx.spring_layout(graph, seed=42)
+
+        ax.clear()
+        nx.draw_networkx_edges(graph, pos, ax=ax)
+        stacked = {}
+        xs, ys, colors = [], [], []
+        for agent, location in zip(state.agents.tolist(), state.location.tolist()):
+            if agent in pos:
+                x, y = pos[agent]
+            elif location in pos:
+                # Fan out agents sharing a node
+                k = stacked[location] = stacked.get(location, 0) + 1
+                x, y = pos[location][0] + 0.06 * k, pos[location][1] + 0.06
+            else:
+                continue
+            xs.append(x)
+            ys.append(y)
+            colors.append(ROLE_COLORS.get(reader.roles[agent], "gray"))
+        ax.scatter(xs, ys, c=colors, zorder=2)
+        ax.set_title(f"Tick: {state.tick}")
+        ax.set_axis_off()
+
+        fig.canvas.draw()
+        writer.write_array(np.asarray(fig.canvas.buffer_rgba()))
+    plt.close(fig)
+    writer.close()
+    print(f"GIF of {writer.num_frames} frames saved to {output_file}")
+
 if __name__ == "__main__":
-    make_gif()
+    if len(sys.argv) > 1:
+        make_gif_from_trajectory(sys.argv[1])
+    else:
+        make_gif()
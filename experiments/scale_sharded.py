@@ -0,0 +1,93 @@
+import argparse
+import random
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.world import World
+from src.core.ids import SequentialIdAllocator
+from src.core.sharding import ShardedWorld
+from src.agents.physical import TruckAgent, WarehouseAgent
+
+
+def build_world(num_clusters: int, cluster_size: int, trucks_per_warehouse: int) -> World:
+    """
+    Ring of warehouse clusters: each cluster is a ring, and neighbouring
+    clusters are linked by one edge.
+    """
+    world = World(id_allocator=SequentialIdAllocator())
+    clusters = []
+    for _ in range(num_clusters):
+        cluster = [WarehouseAgent(agent_id=world.next_id()) for _ in range(cluster_size)]
+        for w in cluster:
+            world.add_agent(w)
+        for i in range(cluster_size):
+            world.connect_agents(cluster[i].id, cluster[(i + 1) % cluster_size].id)
+        clusters.append(cluster)
+    for c in range(num_clusters):
+        world.connect_agents(clusters[c][0].id, clusters[(c + 1) % num_clusters][cluster_size // 2].id)
+
+    for cluster in clusters:
+        for w in cluster:
+            for _ in range(trucks_per_warehouse):
+                t = TruckAgent(agent_id=world.next_id())
+                world.add_agent(t)
+                world.place(t.id, w.id)
+    return world
+
+
+def random_walk(world: World, move_prob: float = 0.1):
+    """
+    Per-shard step: each truck moves to a random neighbouring warehouse
+    (local or ghost) with probability move_prob. Draws from the global
+    `random` module, which ShardedWorld seeds per shard.
+    """
+    for agent in world.agents_by_role("truck"):
+        if random.random() >= move_prob:
+            continue
+        options = world.neighbors(agent.location)
+        if not options:
+            continue
+        world.place(agent.id, random.choice(options))
+
+
+def run(num_shards: int, args) -> float:
+    world = build_world(args.clusters, args.cluster_size, args.trucks_per_warehouse)
+    if num_shards == 1:
+        random.seed(args.seed)
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            world.tick()
+            random_walk(world)
+        return args.ticks / (time.perf_counter() - start)
+
+    sharded = ShardedWorld(world, num_shards=num_shards, step_fn=random_walk, seed=args.seed)
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        sharded.tick()
+    rate = args.ticks / (time.perf_counter() - start)
+    sharded.close()
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ticks/sec of a single World vs. a ShardedWorld")
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--cluster-size", type=int, default=16)
+    parser.add_argument("--trucks-per-warehouse", type=int, default=8)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    agents = args.clusters * args.cluster_size * (1 + args.trucks_per_warehouse)
+    print(f"{agents} agents, {os.cpu_count()} CPUs")
+    for n in args.shards:
+        print(f"shards={n}: {run(n, args):.2f} ticks/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+import argparse
+import functools
+import time
 import torch
 import torch.optim as optim
 import numpy as np
@@ -9,8 +12,30 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.simulation.environment import LogisticsEnv
 from src.learning.rl_policy import RLPolicy
+from src.learning.rollout import RolloutBuffer
+from src.learning.actors import ActorPool
 
-def train():
+def update_policy(policy, optimizer, buffer):
+    """
+    One REINFORCE step on a filled rollout buffer.
+    Returns are discounted along time within each truck's column.
+    """
+    policy.train()
+    buffer.compute_returns()
+    batch = buffer.tensors()
+    returns = batch["returns"]
+    # Normalize returns
+    if len(returns) > 1:
+        returns = (returns - returns.mean()) / (returns.std() + 1e-9)
+    
+    log_probs, _ = policy.evaluate_actions(batch["obs"], batch["actions"])
+    policy_loss = -(log_probs * returns).sum()
+        
+    optimizer.zero_grad()
+    policy_loss.backward()
+    optimizer.step()
+
+def train(episodes: int = 200):
     # Use default 12 agents (4 trucks, 8 warehouses)
     env = LogisticsEnv()
     
@@ -20,7 +45,6 @@ def train():
     input_dim = (2 * 4) + 8 
     output_dim = 5 # 5 discrete actions
     learning_rate = 0.001
-    episodes = 200 # Increase episodes for more complex task
     gamma = 0.99
 
     # Independent PPO: Shared policy for all homogeneous agents (trucks)
@@ -29,37 +53,27 @@ def train():
     
     print(f"Starting MARL training with {env.num_trucks} trucks...")
     
+    # One (T, N) rollout per episode; arrays are allocated once and reused
+    buffer = RolloutBuffer(num_steps=200, num_agents=env.num_trucks, obs_dim=input_dim, gamma=gamma)
+
     for episode in range(episodes):
         obs, _ = env.reset()
         done = False
         episode_reward = 0
+        buffer.reset()
         
-        # Store trajectory
-        # For IPPO with shared weights, we can just flatten all agent experiences into one buffer
-        log_probs = []
-        rewards = []
-        
+        # Collect the trajectory without autograd; log-probs are recomputed at update time
+        policy.eval()
         while not done:
             # Prepare state for policy
             # In this simple env, obs is global state vector, shared by all agents
             state_dict = {'vector': obs}
             
-            # Get actions for ALL trucks
-            actions = []
-            current_log_probs = []
-            
-            # We need to run the policy N times, or batch it.
-            # RLPolicy.decide returns a list of actions.
-            # If we pass the same state, it will sample independently.
-            
-            for _ in range(env.num_trucks):
-                # In a real MARL setting, each agent might have a different observation (partial view).
-                # Here we share the global view.
-                action_list = policy.decide(state_dict, None)
-                actions.append(action_list[0])
-                # We need to capture the log_prob of this specific action.
-                # RLPolicy stores it in self.saved_log_probs.
-                # Since we called decide() multiple times, saved_log_probs grew by N.
+            # Get actions for ALL trucks in one batched forward pass.
+            # In a real MARL setting, each agent might have a different observation (partial view).
+            # Here we share the global view; each row is sampled independently.
+            action_lists = policy.decide_batch([state_dict] * env.num_trucks, None)
+            actions = [action_list[0] for action_list in action_lists]
             
             # Step env
             next_obs, reward, terminated, truncated, _ = env.step(actions)
@@ -67,50 +81,15 @@ def train():
             
             # Reward is global in this env (-0.01 per tick, +10 per delivery).
             # We assign this global reward to ALL agents (Cooperative).
-            # So we push 'reward' N times to match the N actions.
-            for _ in range(env.num_trucks):
-                rewards.append(reward)
+            # The buffer broadcasts the shared obs/reward across the N agent columns.
+            buffer.add(obs, actions, reward, done)
             
             episode_reward += reward
             obs = next_obs
             
         # Update Policy (REINFORCE)
-        # We have N * T actions and N * T rewards.
-        R = 0
-        policy_loss = []
-        returns = []
-        
-        # Calculate returns in reverse
-        for r in rewards[::-1]:
-            R = r + gamma * R
-            returns.insert(0, R)
-            
-        returns = torch.tensor(returns)
-        # Normalize returns
-        if len(returns) > 1:
-            returns = (returns - returns.mean()) / (returns.std() + 1e-9)
-        
-        # policy.saved_log_probs contains all log_probs from all agents across time
-        if len(policy.saved_log_probs) != len(returns):
-            print(f"Warning: Mismatch in log_probs ({len(policy.saved_log_probs)}) and returns ({len(returns)})")
-            # Truncate to match (shouldn't happen if logic is correct)
-            min_len = min(len(policy.saved_log_probs), len(returns))
-            policy.saved_log_probs = policy.saved_log_probs[:min_len]
-            returns = returns[:min_len]
-
-        for log_prob, R in zip(policy.saved_log_probs, returns):
-            policy_loss.append(-log_prob * R)
-            
-        optimizer.zero_grad()
-        if policy_loss:
-            policy_loss = torch.stack(policy_loss).sum()
-            policy_loss.backward()
-            optimizer.step()
+        update_policy(policy, optimizer, buffer)
             
-        # Clear memory
-        policy.saved_log_probs = []
-        policy.rewards = []
-        
         if episode % 10 == 0:
             print(f"Episode {episode}, Reward: {episode_reward:.2f}")
 
@@ -119,5 +98,43 @@ def train():
     # Save model
     torch.save(policy.state_dict(), "outputs/rl_policy_marl.pth")
 
+def train_async(num_workers: int, episodes: int = 200):
+    """
+    Actor/learner mode: `num_workers` processes play episodes with the latest
+    published weights and stream them through shared memory; this process
+    updates the policy on each rollout and broadcasts the new weights.
+    """
+    torch.set_num_threads(1)
+    env_fn = functools.partial(LogisticsEnv)
+    policy_fn = functools.partial(RLPolicy, input_dim=(2 * 4) + 8, output_dim=5)
+    policy = policy_fn()
+    optimizer = optim.Adam(policy.parameters(), lr=0.001)
+    buffer = RolloutBuffer(num_steps=200, num_agents=4, obs_dim=(2 * 4) + 8, gamma=0.99)
+
+    print(f"Starting actor/learner training with {num_workers} actors...")
+    steps = 0
+    start = time.perf_counter()
+    with ActorPool(env_fn, policy_fn, num_agents=4, num_workers=num_workers, num_steps=200, policy=policy) as pool:
+        for episode in range(episodes):
+            info = pool.next_rollout(buffer)
+            update_policy(policy, optimizer, buffer)
+            pool.publish(policy)
+            steps += info.steps
+            if episode % 10 == 0:
+                rate = steps / (time.perf_counter() - start)
+                print(f"Episode {episode}, Reward: {info.episode_reward:.2f} "
+                      f"(actor {info.worker}, weights v{info.policy_version}, {rate:.0f} env-steps/s)")
+
+    print("Training finished.")
+    torch.save(policy.state_dict(), "outputs/rl_policy_marl.pth")
+
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train a shared RLPolicy for all trucks")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="actor processes for asynchronous collection (0 = single process)")
+    parser.add_argument("--episodes", type=int, default=200)
+    args = parser.parse_args()
+    if args.workers > 0:
+        train_async(args.workers, args.episodes)
+    else:
+        train(args.episodes)
@@ -1,8 +1,20 @@
+import numpy as np
+from typing import Hashable, Optional
 from src.core.agent import Agent
+from src.core.store import Column, HandleColumn
 
 class TaskAgent(Agent):
-    def __init__(self, origin: str, destination: str, reward: float = 10.0):
-        super().__init__(role="task")
+    # Stored in AgentStore columns when the world is columnar
+    origin = HandleColumn()
+    destination = HandleColumn()
+    reward = Column(dtype=np.float64, fill=0.0)
+    # Moved around by trucks, never decides anything
+    passive = True
+    wake_interval = None
+
+    def __init__(self, origin: Hashable, destination: Hashable, reward: float = 10.0,
+                 agent_id: Optional[Hashable] = None):
+        super().__init__(role="task", agent_id=agent_id)
         self.origin = origin
         self.destination = destination
         self.reward = reward
@@ -1,21 +1,35 @@
-from typing import List, Any, Optional
+from typing import Hashable, List, Any, Optional
 from src.core.agent import Agent
 from src.core.communication import Message, MessageType
 from src.core.world import World
+from src.core.store import Column, HandleColumn, HandleListColumn
 
 class TruckAgent(Agent):
-    def __init__(self, capacity: int = 1):
-        super().__init__(role="truck")
+    # Stored in AgentStore columns when the world is columnar
+    capacity = Column()
+    cargo = HandleListColumn()
+    location = HandleColumn()
+    destination = HandleColumn()
+
+    def __init__(self, capacity: int = 1, agent_id: Optional[Hashable] = None):
+        super().__init__(role="truck", agent_id=agent_id)
         self.capacity = capacity
-        self.cargo: List[str] = [] # List of Task IDs
-        self.location: Optional[str] = None # Current node ID
-        self.destination: Optional[str] = None
+        self.cargo: List[Hashable] = [] # List of Task IDs
+        self.location: Optional[Hashable] = None # Current node ID
+        self.destination: Optional[Hashable] = None
 
     def perceive(self, world: World):
         # Simple perception: know current location and connected nodes
-        if self.location:
+        if self.location is not None:
             self.state["location"] = self.location
-            self.state["neighbors"] = list(world.graph.neighbors(self.location))
+            self.state["neighbors"] = list(world.neighbors(self.location))
+        # Route toward the destination of the cargo we carry
+        self.state["next_hop"] = None
+        if self.cargo and self.location is not None:
+            task = world.agents.get(self.cargo[0])
+            if task is not None:
+                self.destination = task.destination
+                self.state["next_hop"] = world.routing.next_hop(self.location, self.destination)
 
     def decide(self) -> List[Any]:
         super().decide() # Process messages
@@ -23,12 +37,13 @@ class TruckAgent(Agent):
         actions = []
         # Basic logic: if has cargo, move to destination. If empty, look for tasks.
         if self.cargo:
-            # Move towards destination (simplified: random neighbor for now if no pathfinding)
-            # In real impl, use nx.shortest_path
-            pass
+            # Move towards destination along the precomputed shortest path
+            next_hop = self.state.get("next_hop")
+            if next_hop is not None:
+                actions.append(("move", next_hop))
         else:
             # Ask current location for tasks
-            if self.location:
+            if self.location is not None:
                 self.send_message(self.location, MessageType.ASK, "Any tasks?")
         
         return actions
@@ -37,9 +52,12 @@ class TruckAgent(Agent):
         pass
 
 class WarehouseAgent(Agent):
-    def __init__(self):
-        super().__init__(role="warehouse")
-        self.inventory: List[str] = [] # Task IDs waiting here
+    # Only reacts to ASK messages
+    wake_interval = None
+
+    def __init__(self, agent_id: Optional[Hashable] = None):
+        super().__init__(role="warehouse", agent_id=agent_id)
+        self.inventory: List[Hashable] = [] # Task IDs waiting here
 
     def perceive(self, world: World):
         pass
@@ -1,16 +1,36 @@
-import uuid
-from typing import List, Dict, Any, Optional
-from src.core.communication import Message, MessageType
+from typing import Hashable, List, Dict, Any, Optional
+from src.core.communication import Mailbox, Message, MessageType
+from src.core.ids import default_allocator
 
 from src.learning.policy import Policy, RandomPolicy
 
 class Agent:
-    def __init__(self, role: str = "generic", policy: Optional[Policy] = None):
-        self.id = str(uuid.uuid4())
+    # Column attributes declared on subclasses (see src.core.store.Column)
+    __columns__ = {}
+    # Set by AgentStore.attach when the world keeps agent state in columns
+    _store = None
+    _index = -1
+    # Inbox bound and overflow policy (see Mailbox); None = unbounded
+    inbox_capacity: Optional[int] = None
+    inbox_policy: str = Mailbox.DROP_OLDEST
+    # Set by World.add_agent when the world recycles messages
+    message_pool = None
+    # Ticks between decisions under EventScheduler (1 = every tick);
+    # None = only when a message arrives or the agent is woken explicitly
+    wake_interval: Optional[int] = 1
+    # Passive agents (e.g. tasks) are never scheduled: they do not perceive,
+    # decide or act, so they cost nothing per tick
+    passive: bool = False
+    # Seconds an async decision may take under AsyncWorld; None = the world's default
+    decide_timeout: Optional[float] = None
+
+    def __init__(self, role: str = "generic", policy: Optional[Policy] = None, agent_id: Optional[Hashable] = None):
+        # IDs are dense ints by default; pass world.next_id() to use a world's allocator
+        self.id = agent_id if agent_id is not None else default_allocator().allocate()
         self.role = role
         self.state: Dict[str, Any] = {}
         self.memory: List[Any] = []
-        self.inbox: List[Message] = []
+        self.inbox = Mailbox(self.inbox_capacity, self.inbox_policy)
         self.outbox: List[Message] = []
         self.policy = policy
 
@@ -24,8 +44,9 @@ class Agent:
     def receive_message(self, message: Message):
         """
         Receive a message from the world/communication channel.
+        Returns False if a full inbox refused it under backpressure.
         """
-        self.inbox.append(message)
+        return self.inbox.append(message)
 
     def decide(self) -> List[Any]:
         """
@@ -41,6 +62,21 @@ class Agent:
         
         return []
 
+    async def adecide(self) -> List[Any]:
+        """
+        Async variant of decide(), used by AsyncWorld.atick. Override it for
+        agents that wait on I/O (a policy server, an external planner);
+        decisions of one tick run concurrently. Agents that do not override
+        it are decided synchronously with decide().
+        """
+        return self.decide()
+
+    def default_action(self) -> List[Any]:
+        """
+        Actions used when adecide() misses its timeout (it is cancelled).
+        """
+        return []
+
     def process_messages(self):
         """
         Process messages in the inbox.
@@ -55,11 +91,35 @@ class Agent:
         """
         pass
 
-    def send_message(self, receiver_id: str, msg_type: MessageType, content: Any):
+    @property
+    def name(self) -> str:
+        """
+        Short human-readable label for display (visualization, logs).
+        """
+        return f"{self.role[:1]}.{str(self.id)[:4]}"
+
+    def send_message(self, receiver_id: Hashable, msg_type: MessageType, content: Any):
         """
         Queue a message to be sent.
         """
-        msg = Message(sender_id=self.id, receiver_id=receiver_id, msg_type=msg_type, content=content)
+        pool = self.message_pool
+        if pool is not None:
+            msg = pool.acquire(self.id, receiver_id, msg_type, content)
+        else:
+            msg = Message(self.id, receiver_id, msg_type, content)
+        self.outbox.append(msg)
+
+    def broadcast(self, msg_type: MessageType, content: Any, receiver_ids: Optional[List[Hashable]] = None):
+        """
+        Queue one message for several receivers (default: graph neighbours).
+        The channel shares the message object between recipients.
+        """
+        recipients = tuple(receiver_ids) if receiver_ids is not None else None
+        pool = self.message_pool
+        if pool is not None:
+            msg = pool.acquire(self.id, None, msg_type, content, recipients)
+        else:
+            msg = Message(self.id, None, msg_type, content, recipients=recipients)
         self.outbox.append(msg)
 
     def get_outbox(self) -> List[Message]:
@@ -71,4 +131,4 @@ class Agent:
         return messages
 
     def __repr__(self):
-        return f"Agent(id={self.id[:8]}, role={self.role})"
+        return f"Agent(id={str(self.id)[:8]}, role={self.role})"
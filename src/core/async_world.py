@@ -0,0 +1,58 @@
+import asyncio
+from typing import Optional
+
+from src.core.world import World
+
+
+class AsyncWorld(World):
+    """
+    World whose tick is a coroutine, for agents that wait on I/O (a policy
+    server, an external planner) in their decide step.
+
+    Agents override Agent.adecide(). In atick(), the decisions of all due
+    async agents run concurrently on the event loop, each limited to its
+    `decide_timeout` seconds (Agent.decide_timeout, or this world's default;
+    None = no limit). A late agent is cancelled and falls back to its
+    default_action(), so a slow dependency costs at most one timeout per
+    tick instead of stalling it. Other agents decide synchronously as usual,
+    and every other phase of the tick is unchanged.
+
+    Run it with `await world.atick()` inside an existing loop, or call
+    tick(), which drives a private loop. The decide phase goes through
+    Scheduler.arun: SequentialScheduler and EventScheduler support async
+    agents; other schedulers decide them synchronously with decide().
+    """
+    def __init__(self, *args, decide_timeout: Optional[float] = 1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decide_timeout = decide_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def atick(self):
+        """
+        Advance the world by one step, awaiting async decisions.
+        """
+        delivered = self._begin_tick()
+        decisions = await self.scheduler.arun(self)
+        self._end_tick(decisions, delivered)
+
+    def tick(self):
+        """
+        Run atick() to completion on this world's own event loop. Use atick()
+        from code that is already running in a loop.
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self.atick())
+
+    def fork(self) -> "AsyncWorld":
+        world = super().fork()
+        world.decide_timeout = self.decide_timeout
+        return world
+
+    def close(self):
+        """
+        Close the event loop used by tick().
+        """
+        if self._loop is not None:
+            self._loop.close()
+            self._loop = None
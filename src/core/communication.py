@@ -1,7 +1,7 @@
-from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Any, Optional, List
-import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+import itertools
 
 class MessageType(Enum):
     INFO = auto()
@@ -12,33 +12,284 @@ class MessageType(Enum):
     ACCEPT = auto()
     REJECT = auto()
 
-@dataclass
+# Sequence numbers are unique per process and much cheaper than uuid4 strings
+_message_ids = itertools.count()
+
 class Message:
-    sender_id: str
-    receiver_id: str
-    msg_type: MessageType
-    content: Any
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: int = 0
+    """
+    A single message between agents.
+
+    Slotted to keep per-message memory small; IDs are process-wide sequence
+    numbers. `freeze()` turns the instance into a FrozenMessage in place.
+    """
+    __slots__ = ("sender_id", "receiver_id", "msg_type", "content", "id", "timestamp", "recipients", "refs")
+
+    def __init__(self, sender_id: Hashable, receiver_id: Optional[Hashable], msg_type: MessageType, content: Any,
+                 id: Optional[int] = None, timestamp: int = 0,
+                 recipients: Optional[Tuple[Hashable, ...]] = None):
+        self.sender_id = sender_id
+        self.receiver_id = receiver_id
+        self.msg_type = msg_type
+        self.content = content
+        self.id = id if id is not None else next(_message_ids)
+        self.timestamp = timestamp
+        # Multicast targets when receiver_id is None (None = sender's graph neighbours)
+        self.recipients = recipients
+        # Outstanding deliveries; used by MessagePool to know when to recycle
+        self.refs = 0
+
+    def freeze(self) -> "Message":
+        """
+        Make the message read-only in place.
+        """
+        self.__class__ = FrozenMessage
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in Message.__slots__[:7])
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"Message(sender_id={self.sender_id!r}, receiver_id={self.receiver_id!r}, "
+                f"msg_type={self.msg_type}, content={self.content!r}, id={self.id}, timestamp={self.timestamp})")
+
+class FrozenMessage(Message):
+    """
+    Read-only Message. Same layout as Message, so freezing is a class swap.
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"FrozenMessage is read-only (tried to set {name!r})")
+
+    def freeze(self) -> "Message":
+        return self
+
+    def __reduce__(self):
+        # The default slots unpickling sets attributes one by one, which
+        # __setattr__ refuses; rebuild a Message and freeze it instead
+        return _frozen_message, tuple(getattr(self, f) for f in Message.__slots__)
+
+def _frozen_message(sender_id, receiver_id, msg_type, content, id, timestamp, recipients, refs) -> Message:
+    msg = Message(sender_id, receiver_id, msg_type, content, id=id, timestamp=timestamp, recipients=recipients)
+    msg.refs = refs
+    return msg.freeze()
+
+class MessagePool:
+    """
+    Free list of Message objects.
+
+    Agent.send_message draws from the pool attached to its world, and
+    World.tick hands messages back once their deliveries have been consumed.
+    Agents must finish with their inbox during decide(); a message kept past
+    the tick it was delivered in may be reused.
+    """
+    def __init__(self, max_size: int = 65536):
+        self.max_size = max_size
+        self._free: List[Message] = []
+        self.allocated = 0
+        self.reused = 0
+
+    def acquire(self, sender_id: Hashable, receiver_id: Optional[Hashable], msg_type: MessageType, content: Any,
+                recipients: Optional[Tuple[Hashable, ...]] = None) -> Message:
+        if not self._free:
+            self.allocated += 1
+            return Message(sender_id, receiver_id, msg_type, content, recipients=recipients)
+        self.reused += 1
+        msg = self._free.pop()
+        msg.sender_id = sender_id
+        msg.receiver_id = receiver_id
+        msg.msg_type = msg_type
+        msg.content = content
+        msg.id = next(_message_ids)
+        msg.timestamp = 0
+        msg.recipients = recipients
+        msg.refs = 0
+        return msg
+
+    def release(self, msg: Message):
+        if len(self._free) >= self.max_size:
+            return
+        if type(msg) is FrozenMessage:
+            object.__setattr__(msg, "__class__", Message)
+        msg.content = None  # don't keep payloads alive
+        msg.recipients = None
+        self._free.append(msg)
+
+    def release_delivered(self, messages: Iterable[Message]):
+        """
+        Drop one reference per entry and recycle messages with none left.
+        A multicast message appears once per recipient.
+        """
+        for msg in messages:
+            refs = msg.refs - 1
+            if refs > 0:
+                object.__setattr__(msg, "refs", refs)
+            else:
+                self.release(msg)
+
+    def __len__(self):
+        return len(self._free)
+
+class Mailbox:
+    """
+    Bounded FIFO inbox backed by a ring buffer (collections.deque).
+
+    When full, the overflow policy decides what happens to a new message:
+      - "drop_oldest": evict the oldest queued message (deque maxlen behaviour)
+      - "drop_newest": discard the incoming message
+      - "backpressure": refuse it; the channel keeps it queued for a later tick
+    """
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    BACKPRESSURE = "backpressure"
+
+    def __init__(self, capacity: Optional[int] = None, policy: str = DROP_OLDEST):
+        if policy not in (self.DROP_OLDEST, self.DROP_NEWEST, self.BACKPRESSURE):
+            raise ValueError(f"Unknown overflow policy {policy!r}")
+        self.capacity = capacity
+        self.policy = policy
+        self.dropped = 0
+        maxlen = capacity if policy == self.DROP_OLDEST else None
+        self._queue: Deque[Message] = deque(maxlen=maxlen)
+
+    @property
+    def free(self) -> Optional[int]:
+        """
+        Remaining slots, or None if unbounded.
+        """
+        return None if self.capacity is None else self.capacity - len(self._queue)
+
+    def append(self, message: Message) -> bool:
+        """
+        Queue a message. Returns False if it was refused under backpressure.
+        """
+        if self.capacity is not None and len(self._queue) >= self.capacity:
+            if self.policy == self.BACKPRESSURE:
+                return False
+            self.dropped += 1
+            if self.policy == self.DROP_NEWEST:
+                return True
+        self._queue.append(message)
+        return True
+
+    def extend(self, messages: Iterable[Message]):
+        for message in messages:
+            self.append(message)
+
+    def popleft(self) -> Message:
+        return self._queue.popleft()
+
+    def clear(self):
+        self._queue.clear()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._queue)
+
+    def __getitem__(self, index: int) -> Message:
+        return self._queue[index]
+
+    def __bool__(self):
+        return bool(self._queue)
 
 class CommunicationChannel:
     """
     Simulates the medium through which agents communicate.
     Can be extended to include noise, delay, or cost.
+
+    Messages are queued per receiver, so delivery touches each recipient once
+    per tick instead of scanning every message. A multicast message is queued
+    by reference for each recipient; it is never copied.
+    With freeze=True, messages become read-only once sent.
     """
-    def __init__(self):
-        self.message_queue: List[Message] = []
+    def __init__(self, freeze: bool = False):
+        # receiver id -> pending messages; only receivers with mail are present
+        self.queues: Dict[Hashable, Deque[Message]] = {}
+        self.freeze = freeze
+        self.routed = 0
+        self.dropped = 0
+        # Receivers that had mail in the last route() (for event-driven scheduling)
+        self.receivers: List[Hashable] = []
 
     def send(self, message: Message):
         """
         Send a message. In this simple version, it's instant delivery to the queue.
         """
-        self.message_queue.append(message)
+        if self.freeze:
+            message.freeze()
+        queue = self.queues.get(message.receiver_id)
+        if queue is None:
+            queue = self.queues[message.receiver_id] = deque()
+        queue.append(message)
+
+    def multicast(self, message: Message, receiver_ids: Iterable[Hashable]):
+        """
+        Queue the same message object for several receivers.
+        """
+        if self.freeze:
+            message.freeze()
+        queues = self.queues
+        for receiver_id in receiver_ids:
+            queue = queues.get(receiver_id)
+            if queue is None:
+                queue = queues[receiver_id] = deque()
+            queue.append(message)
+
+    def pending(self) -> int:
+        return sum(len(q) for q in self.queues.values())
 
     def deliver(self) -> List[Message]:
         """
         Retrieve all messages for the current tick.
         """
-        messages = self.message_queue
-        self.message_queue = []
+        messages = [msg for queue in self.queues.values() for msg in queue]
+        self.queues = {}
         return messages
+
+    def route(self, agents: Dict[Hashable, Any], delivered: Optional[List[Message]] = None) -> int:
+        """
+        Move queued messages into the receivers' inboxes.
+        Messages for unknown receivers, or evicted by a full inbox, are dropped;
+        messages refused under backpressure stay queued for the next call.
+        If `delivered` is given, every entry that left the channel (handed over
+        or dropped) is appended to it, once per recipient.
+        Returns the number of messages handed to inboxes.
+        """
+        routed = dropped = 0
+        blocked: Dict[Hashable, Deque[Message]] = {}
+        receivers = self.receivers = []
+        for receiver_id, queue in self.queues.items():
+            agent = agents.get(receiver_id)
+            if agent is None:
+                dropped += len(queue)
+                if delivered is not None:
+                    delivered.extend(queue)
+                continue
+            receivers.append(receiver_id)
+            inbox = agent.inbox
+            if inbox.capacity is None:
+                inbox._queue.extend(queue)
+                routed += len(queue)
+                if delivered is not None:
+                    delivered.extend(queue)
+                continue
+            before = inbox.dropped
+            while queue:
+                if not inbox.append(queue[0]):
+                    blocked[receiver_id] = queue
+                    break
+                msg = queue.popleft()
+                routed += 1
+                if delivered is not None:
+                    delivered.append(msg)
+            dropped += inbox.dropped - before
+        self.queues = blocked
+        self.routed += routed
+        self.dropped += dropped
+        return routed
@@ -0,0 +1,132 @@
+import heapq
+import random
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from src.core.agent import Agent
+from src.core.scheduler import Decisions, SequentialScheduler
+from src.core.world import World, WorldListener
+
+
+class EventScheduler(SequentialScheduler, WorldListener):
+    """
+    Discrete-event alternative to SequentialScheduler: only agents with a
+    pending event perceive, decide and act in a tick.
+
+    An agent is due when
+      - its timer fires: every `agent.wake_interval` ticks after its last
+        decision (1 = every tick; None = no timer);
+      - a message was routed to it at the start of the tick;
+      - it was just added to the world, or was woken with wake().
+    Passive agents are never due.
+
+    Timers live in a heap, and message receivers come from the channel's
+    last route(), so the per-tick cost follows the number of due agents
+    rather than the population. Idle warehouses and tasks (wake_interval
+    None) cost nothing until something happens to them. Due agents run in
+    shuffled order, as with SequentialScheduler (batch_policies included).
+
+    Pass it to World(scheduler=...). It keeps per-world state, so one
+    instance drives one world (World.fork gives the copy a new one).
+    """
+    def __init__(self, batch_policies: bool = False):
+        super().__init__(batch_policies=batch_policies)
+        self.world: Optional[World] = None
+        # (tick, seq, agent_id, periodic); periodic entries are stale unless
+        # they match _timer[agent_id]
+        self._heap: List[Tuple[int, int, Hashable, bool]] = []
+        self._timer: Dict[Hashable, int] = {}
+        self._seq = 0
+        # Agents that ran in the last tick
+        self.last_due = 0
+
+    def bind(self, world: World):
+        if self.world is not None and self.world is not world:
+            raise ValueError("EventScheduler is already driving another world")
+        self.world = world
+        world.add_listener(self)
+
+    def fork(self) -> "EventScheduler":
+        return EventScheduler(batch_policies=self.batch_policies)
+
+    def wake(self, agent_id: Hashable, tick: Optional[int] = None):
+        """
+        Make an agent due at `tick` (default: the next tick).
+        """
+        if tick is None:
+            tick = self.world.tick_count + 1
+        self._push(tick, agent_id, False)
+
+    def run(self, world: World) -> Decisions:
+        agent_ids = self._due(world)
+        decisions = self.decide(world, agent_ids)
+        self._reschedule(world, agent_ids)
+        return decisions
+
+    async def arun(self, world: World) -> Decisions:
+        agent_ids = self._due(world)
+        decisions = await self.adecide(world, agent_ids)
+        self._reschedule(world, agent_ids)
+        return decisions
+
+    def _due(self, world: World) -> List[Hashable]:
+        """
+        Pop the agents due this tick, in shuffled order.
+        """
+        now = world.tick_count
+        agents = world.active_agents
+        heap = self._heap
+        due: Dict[Hashable, None] = {}
+        while heap and heap[0][0] <= now:
+            tick, _, agent_id, periodic = heapq.heappop(heap)
+            if agent_id not in agents or (periodic and self._timer.get(agent_id) != tick):
+                continue
+            due[agent_id] = None
+        for agent_id in world.comm_channel.receivers:
+            if agent_id in agents:
+                due[agent_id] = None
+
+        agent_ids = list(due)
+        random.shuffle(agent_ids)
+        return agent_ids
+
+    def _reschedule(self, world: World, agent_ids: List[Hashable]):
+        now = world.tick_count
+        agents = world.agents
+        for agent_id in agent_ids:
+            agent = agents.get(agent_id)
+            if agent is None:
+                continue
+            interval = agent.wake_interval
+            if interval is None:
+                self._timer.pop(agent_id, None)
+            else:
+                self._schedule(agent_id, now + interval)
+        self.last_due = len(agent_ids)
+        if world.profiler is not None:
+            world.profiler.count("agents_due", len(agent_ids))
+
+    # --- WorldListener ---
+
+    def on_agent_added(self, agent: Agent):
+        # First decision on the next tick, then by wake_interval
+        if not agent.passive:
+            self._push(self.world.tick_count + 1, agent.id, False)
+
+    def on_agent_removed(self, agent: Agent):
+        self._timer.pop(agent.id, None)
+
+    def on_world_restored(self, world: World):
+        self._heap = []
+        self._timer = {}
+        for agent_id in world.active_agents:
+            self._push(world.tick_count + 1, agent_id, False)
+
+    # --- Internals ---
+
+    def _schedule(self, agent_id: Hashable, tick: int):
+        self._timer[agent_id] = tick
+        self._push(tick, agent_id, True)
+
+    def _push(self, tick: int, agent_id: Hashable, periodic: bool):
+        self._seq += 1
+        heapq.heappush(self._heap, (tick, self._seq, agent_id, periodic))
@@ -0,0 +1,51 @@
+import uuid
+from typing import Hashable
+
+
+class IdAllocator:
+    """
+    Hands out agent IDs. World uses one to name agents it creates.
+    """
+    def allocate(self) -> Hashable:
+        raise NotImplementedError
+
+
+class SequentialIdAllocator(IdAllocator):
+    """
+    Dense integer IDs: start, start + step, ...
+    Cheap to hash and compare, and usable as array indices. Giving each of
+    n allocators a different start and step=n keeps their IDs disjoint.
+    """
+    def __init__(self, start: int = 0, step: int = 1):
+        # Plain ints rather than itertools.count, which cannot be pickled
+        # from Python 3.14 (worlds pickle their allocator in snapshots)
+        self._next = start
+        self._step = step
+
+    def allocate(self) -> int:
+        value = self._next
+        self._next = value + self._step
+        return value
+
+
+class UuidAllocator(IdAllocator):
+    """
+    Random uuid4 strings (the original ID scheme). Unique across processes.
+    """
+    def allocate(self) -> str:
+        return str(uuid.uuid4())
+
+
+_default_allocator: IdAllocator = SequentialIdAllocator()
+
+
+def default_allocator() -> IdAllocator:
+    """
+    Process-wide allocator used for agents created without an explicit ID.
+    """
+    return _default_allocator
+
+
+def set_default_allocator(allocator: IdAllocator):
+    global _default_allocator
+    _default_allocator = allocator
@@ -1,6 +1,13 @@
 import csv
+import importlib.util
+import json
+import os
+import queue
+import threading
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
 
 class MetricsLogger:
     def __init__(self, filepath: str = "metrics.csv"):
@@ -23,8 +30,254 @@ class MetricsLogger:
         if not self.data:
             return
         
-        keys = self.data[0].keys()
+        # Columns in order of first appearance, so keys added later are kept
+        keys = list(dict.fromkeys(key for entry in self.data for key in entry))
         with open(self.filepath, 'w', newline='') as f:
             writer = csv.DictWriter(f, fieldnames=keys)
             writer.writeheader()
             writer.writerows(self.data)
+
+
+class StreamingMetricsLogger:
+    """
+    Metrics sink for long runs: log() only appends the row to an in-memory
+    batch, and a background thread writes batches to `path` as they fill up
+    (`flush_rows`) or every `flush_interval` seconds, whichever comes first.
+
+    `path` is a directory of column-oriented parts (part_NNNNNN.npz, or
+    .parquet with format="parquet", which needs pyarrow) plus schema.json.
+    Every part is written atomically, so a crash loses at most the rows of
+    the last interval. New keys may appear at any time: they become new
+    columns, missing values read back as NaN (None for strings), and a
+    column whose values widen (int to float) is promoted in the schema.
+
+    At most `max_pending` full batches wait for the writer; past that,
+    log() blocks until the writer catches up, so memory stays bounded.
+    log() may be called from several threads.
+    Use read_metrics() to load the parts back as one set of columns.
+    """
+    def __init__(self, path: str = "metrics", flush_rows: int = 4096, flush_interval: float = 5.0,
+                 format: str = "npz", max_pending: int = 4):
+        if format not in ("npz", "parquet"):
+            raise ValueError(f"Unknown metrics format: {format}")
+        if format == "parquet":
+            # Fail here rather than in the writer thread
+            if importlib.util.find_spec("pyarrow") is None:
+                raise ImportError("format='parquet' requires pyarrow")
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.format = format
+        os.makedirs(path, exist_ok=True)
+
+        self.schema: Dict[str, str] = {}
+        self.num_parts = 0
+        self.rows_written = 0
+        self.start_time = time.perf_counter()
+        self._rows: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # Batches are numbered under the lock but queued after releasing it,
+        # so they can reach the writer out of order; it writes them by number
+        self._next_batch = 0
+        self._batches: "queue.Queue[Optional[Tuple[int, List[Dict[str, Any]]]]]" = queue.Queue(maxsize=max_pending)
+        self._next_write = 0
+        self._waiting: Dict[int, Tuple[List[Dict[str, Any]], bool]] = {}
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._writer.start()
+
+    def log(self, tick: int, metrics: Dict[str, Any]):
+        """
+        Log a set of metrics for a specific tick.
+        """
+        row = {"tick": tick, "timestamp": time.perf_counter() - self.start_time}
+        row.update(metrics)
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) < self.flush_rows:
+                return
+            batch = self._take()
+        # Never block on the queue while holding the lock: the writer's
+        # time trigger needs it
+        self._batches.put(batch)
+
+    def flush(self):
+        """
+        Write everything logged so far and wait until it is on disk.
+        """
+        self._hand_off()
+        self._batches.join()
+        self._raise_error()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._hand_off()
+        self._batches.put(None)
+        self._writer.join()
+        self._raise_error()
+
+    # Same call as MetricsLogger
+    save = close
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _take(self) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Swap out the pending rows as the next numbered batch (lock held).
+        """
+        rows, self._rows = self._rows, []
+        if not rows:
+            return None
+        self._next_batch += 1
+        return self._next_batch - 1, rows
+
+    def _hand_off(self):
+        with self._lock:
+            batch = self._take()
+        if batch is not None:
+            self._batches.put(batch)
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Writing metrics to {self.path} failed") from error
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._batches.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Time trigger: take whatever has accumulated
+                with self._lock:
+                    batch = self._take()
+                if batch is not None:
+                    self._write_in_order(batch, queued=False)
+                continue
+            if batch is None:
+                self._batches.task_done()
+                return
+            self._write_in_order(batch, queued=True)
+
+    def _write_in_order(self, batch: Tuple[int, List[Dict[str, Any]]], queued: bool):
+        """
+        Write `batch` and any held-back batches that now follow in order.
+        Queued batches are marked done only once written, so flush() waits
+        for them.
+        """
+        number, rows = batch
+        self._waiting[number] = (rows, queued)
+        while self._next_write in self._waiting:
+            rows, queued = self._waiting.pop(self._next_write)
+            self._next_write += 1
+            self._safe_write(rows)
+            if queued:
+                self._batches.task_done()
+
+    def _safe_write(self, rows: List[Dict[str, Any]]):
+        try:
+            self._write(rows)
+        except BaseException as e:  # surfaced on the next flush()/close()
+            self._error = e
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        keys = list(dict.fromkeys(key for row in rows for key in row))
+        columns = {}
+        for key in keys:
+            column = _to_column([row.get(key) for row in rows])
+            old = self.schema.get(key)
+            self.schema[key] = column.dtype.str if old is None else _widen(old, column.dtype.str)
+            columns[key] = column
+
+        name = f"part_{self.num_parts:06d}.{self.format}"
+        final = os.path.join(self.path, name)
+        tmp = final + ".tmp"
+        if self.format == "npz":
+            with open(tmp, "wb") as f:
+                np.savez(f, **columns)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.table(columns), tmp)
+        os.replace(tmp, final)
+        self.num_parts += 1
+        self.rows_written += len(rows)
+        _write_json(os.path.join(self.path, "schema.json"), {
+            "format": self.format,
+            "columns": self.schema,
+            "parts": self.num_parts,
+            "rows": self.rows_written,
+        })
+
+
+def read_metrics(path: str) -> Dict[str, np.ndarray]:
+    """
+    Load a StreamingMetricsLogger directory as one array per column, cast to
+    the final schema; rows from parts without a column are filled with NaN
+    (or None for non-numeric columns).
+    """
+    with open(os.path.join(path, "schema.json")) as f:
+        meta = json.load(f)
+    schema = {key: np.dtype(dtype) for key, dtype in meta["columns"].items()}
+    parts = []
+    for i in range(meta["parts"]):
+        part_path = os.path.join(path, f"part_{i:06d}.{meta['format']}")
+        if meta["format"] == "npz":
+            with np.load(part_path) as data:
+                parts.append({key: data[key] for key in data.files})
+        else:
+            import pyarrow.parquet as pq
+            table = pq.read_table(part_path)
+            parts.append({key: table[key].to_numpy(zero_copy_only=False) for key in table.column_names})
+
+    result = {}
+    for key, dtype in schema.items():
+        if dtype.kind in "biu" and any(key not in part for part in parts):
+            dtype = np.dtype(np.float64)
+        chunks = []
+        for part in parts:
+            length = len(next(iter(part.values())))
+            if key in part:
+                chunks.append(part[key].astype(dtype, copy=False))
+            elif dtype.kind in "fc":
+                chunks.append(np.full(length, np.nan, dtype=dtype))
+            else:
+                chunks.append(np.full(length, None, dtype=object))
+        result[key] = np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+    return result
+
+
+def _to_column(values: List[Any]) -> np.ndarray:
+    """
+    Turn one batch's values for a key into an array; gaps (None) force a
+    float column when the values are numeric.
+    """
+    present = [v for v in values if v is not None]
+    if len(present) < len(values) and all(isinstance(v, (int, float, np.number)) for v in present):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    column = np.asarray(values)
+    if column.dtype == object:
+        column = np.asarray([("" if v is None else str(v)) for v in values])
+    return column
+
+
+def _widen(old: str, new: str) -> str:
+    old_dtype, new_dtype = np.dtype(old), np.dtype(new)
+    if old_dtype.kind in "biufc" and new_dtype.kind in "biufc":
+        return np.result_type(old_dtype, new_dtype).str
+    if old_dtype.kind == new_dtype.kind == "U":
+        return max(old_dtype, new_dtype, key=lambda d: d.itemsize).str
+    return np.dtype(object).str
+
+
+def _write_json(filepath: str, data: Dict[str, Any]):
+    tmp = filepath + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, filepath)
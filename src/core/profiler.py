@@ -0,0 +1,163 @@
+from time import perf_counter
+from typing import Any, Dict, Hashable, Optional
+
+from src.core.agent import Agent
+from src.core.world import World, WorldListener
+
+# Histogram bucket b holds durations in [2**(b-1), 2**b) nanoseconds
+NUM_BUCKETS = 40
+
+
+class Histogram:
+    """
+    Log2-bucketed duration histogram (nanoseconds). Recording is one
+    bit_length() and a list increment; percentiles are bucket upper bounds.
+    """
+    __slots__ = ("buckets", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.buckets = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns: int):
+        self.buckets[min(ns.bit_length(), NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile_ns(self, q: float) -> int:
+        """
+        Upper bound of the bucket holding the q-th percentile (0 < q <= 100).
+        """
+        if not self.count:
+            return 0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(1 << b, self.max_ns)
+        return self.max_ns
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_us": self.mean_ns() / 1e3,
+            "p50_us": self.percentile_ns(50) / 1e3,
+            "p99_us": self.percentile_ns(99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+        }
+
+
+class TickProfiler(WorldListener):
+    """
+    Opt-in instrumentation for World.tick and LogisticsEnv.step.
+
+    Attach with world.set_profiler(TickProfiler()); with no profiler the
+    instrumented code paths cost one attribute check per tick (and per
+    env step). While attached it collects:
+      - phase timers: time per phase of World.tick (deliver, decide,
+        collect, act, release, listeners) and of LogisticsEnv.step
+        (env.actions for moves/pickups/deliveries, env.spawn, env.obs; the
+        env's world.tick shows up as the tick phases);
+      - per-role decide histograms: perceive + decide time per agent
+        (SequentialScheduler only; batched policy groups are split evenly
+        over their agents);
+      - counters: messages routed/dropped, agents added/removed, static
+        edges added/removed, agent placements, env pickups/deliveries.
+
+    summary() feeds World.get_state(); to_metrics() flattens everything
+    into one dict for MetricsLogger.log / StreamingMetricsLogger.log.
+    """
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.decide: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.ticks = 0
+        self._last = perf_counter()
+
+    # --- Recording (called from instrumented code) ---
+
+    def start(self):
+        """
+        Start timing; the next lap() is measured from here.
+        """
+        self._last = perf_counter()
+
+    def lap(self, phase: str):
+        """
+        Charge the time since the previous start()/lap() to `phase`.
+        """
+        now = perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def add_decide(self, role: str, ns: int):
+        hist = self.decide.get(role)
+        if hist is None:
+            hist = self.decide[role] = Histogram()
+        hist.add(ns)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    # --- WorldListener ---
+
+    def on_agent_added(self, agent: Agent):
+        self.count("agents_added")
+
+    def on_agent_removed(self, agent: Agent):
+        self.count("agents_removed")
+
+    def on_edge_added(self, agent1_id: Hashable, agent2_id: Hashable, weight: float):
+        self.count("edges_added")
+
+    def on_edge_removed(self, agent1_id: Hashable, agent2_id: Hashable):
+        self.count("edges_removed")
+
+    def on_agent_moved(self, agent: Agent, old_node: Optional[Hashable], new_node: Optional[Hashable]):
+        self.count("placements")
+
+    def on_tick_end(self, world: World):
+        self.ticks += 1
+
+    # --- Export ---
+
+    def reset(self):
+        self.phases.clear()
+        self.decide.clear()
+        self.counters.clear()
+        self.ticks = 0
+
+    def summary(self) -> Dict[str, Any]:
+        ticks = max(self.ticks, 1)
+        return {
+            "ticks": self.ticks,
+            "phase_ms_per_tick": {name: total * 1e3 / ticks for name, total in self.phases.items()},
+            "decide": {role: hist.summary() for role, hist in self.decide.items()},
+            "counters": dict(self.counters),
+        }
+
+    def to_metrics(self, reset: bool = False) -> Dict[str, float]:
+        """
+        Flat {name: value} view of summary(). With reset=True the profiler
+        starts over, so successive exports cover successive intervals.
+        """
+        summary = self.summary()
+        metrics: Dict[str, float] = {"profile.ticks": summary["ticks"]}
+        for name, ms in summary["phase_ms_per_tick"].items():
+            metrics[f"profile.phase.{name}_ms"] = ms
+        for role, stats in summary["decide"].items():
+            for stat, value in stats.items():
+                metrics[f"profile.decide.{role}.{stat}"] = value
+        for name, value in summary["counters"].items():
+            metrics[f"profile.{name}"] = value
+        if reset:
+            self.reset()
+        return metrics
@@ -0,0 +1,63 @@
+import random
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_local = threading.local()
+
+
+class ShardRNG:
+    """
+    Random streams for one shard of a parallel decide phase, seeded from
+    (seed, tick, shard) by ParallelScheduler.
+
+    During decide(), policies get it from current_rng() and draw from
+    `random`, `numpy` or `torch` instead of the global generators, which
+    shards running on threads would share. Outside a parallel decide phase
+    current_rng() is None and policies use the globals as usual.
+
+    Per-decision training data (such as RLPolicy's log-probs) goes through
+    record() instead of a list on the policy: the scheduler hands it to
+    Policy.merge_records shard by shard, i.e. in decision order.
+    """
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.numpy = np.random.default_rng(seed)
+        self._torch = None
+        # id(policy) -> (policy, records)
+        self.records: Dict[int, Tuple[Any, List[Any]]] = {}
+
+    @property
+    def torch(self):
+        if self._torch is None:
+            import torch
+            self._torch = torch.Generator().manual_seed(self.seed)
+        return self._torch
+
+    def record(self, policy, items: Iterable[Any]):
+        self.records.setdefault(id(policy), (policy, []))[1].extend(items)
+
+    def merge_records(self):
+        for policy, records in self.records.values():
+            policy.merge_records(records)
+        self.records = {}
+
+
+def current_rng() -> Optional[ShardRNG]:
+    """
+    The ShardRNG of the decide shard running on this thread, if any.
+    """
+    return getattr(_local, "rng", None)
+
+
+@contextmanager
+def using_rng(rng: Optional[ShardRNG]):
+    previous = current_rng()
+    _local.rng = rng
+    try:
+        yield rng
+    finally:
+        _local.rng = previous
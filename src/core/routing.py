@@ -0,0 +1,299 @@
+import heapq
+import math
+import threading
+import numpy as np
+from typing import Dict, Hashable, List, Optional, Tuple
+from src.core.agent import Agent
+from src.core.world import World, WorldListener
+
+INF = math.inf
+
+
+class RoutingTable(WorldListener):
+    """
+    Shortest-path next hops over the network formed by agents of one role
+    (warehouses by default).
+
+    Up to `dense_limit` nodes, next hops and distances live in n x n arrays
+    that are filled one source row at a time on first use, so a lookup is an
+    array read. Edge and node changes only invalidate the rows whose
+    shortest paths they can affect:
+      - a new or cheaper edge (u, v, w) invalidates rows s where
+        d(s, u) + w < d(s, v) or the reverse;
+      - a removed or more expensive edge invalidates rows where it lies on
+        a shortest path, i.e. d(s, u) + w == d(s, v) or the reverse.
+
+    Larger networks use ALT (A* with landmark lower bounds): distances from
+    `num_landmarks` landmarks are precomputed, each query runs A*, and the
+    next hop of every node along the found path is cached.
+    """
+    def __init__(self, world: World, role: str = "warehouse", dense_limit: int = 2048, num_landmarks: int = 8):
+        self.role = role
+        self.dense_limit = dense_limit
+        self.num_landmarks = num_landmarks
+        # Lazy rows and landmarks may be filled from several decide threads
+        self._lock = threading.Lock()
+        self._clear()
+        world.add_listener(self)
+        for u, v, weight in world.topology.edges():
+            self.on_edge_added(u, v, weight)
+        # Topology snapshot this table is known to match (None once edited)
+        self._synced_topology = world.topology
+
+    def _clear(self):
+        self.nodes: List[Optional[Hashable]] = []
+        self.index: Dict[Hashable, int] = {}
+        self.adj: List[Dict[int, float]] = []
+        self._capacity = 0
+        self.dist = np.zeros((0, 0))
+        self.hops = np.zeros((0, 0), dtype=np.int32)
+        self.row_valid = np.zeros(0, dtype=bool)
+        # ALT state, rebuilt lazily after any change
+        self._landmark_dist: Optional[List[Tuple[float, ...]]] = None
+        self._cache: Dict[Tuple[int, int], int] = {}
+
+    @property
+    def dense(self) -> bool:
+        return len(self.nodes) <= self.dense_limit
+
+    # --- WorldListener ---
+
+    def on_agent_added(self, agent: Agent):
+        if agent.role != self.role or agent.id in self.index:
+            return
+        i = len(self.nodes)
+        self.index[agent.id] = i
+        self.nodes.append(agent.id)
+        self.adj.append({})
+        if self.dense:
+            self._ensure_capacity(i + 1)
+        self._changed()
+
+    def on_agent_removed(self, agent: Agent):
+        i = self.index.pop(agent.id, None)
+        if i is None:
+            return
+        for j in self.adj[i]:
+            del self.adj[j][i]
+        self.adj[i] = {}
+        self.nodes[i] = None
+        if self.dense:
+            n = len(self.nodes)
+            self.row_valid[:n] &= ~np.isfinite(self.dist[:n, i])
+        self._changed()
+
+    def on_world_restored(self, world: World):
+        # Restoring the topology we already match (e.g. every LogisticsEnv
+        # reset) keeps all computed rows
+        topology = world.topology
+        if topology is self._synced_topology and \
+                [a.id for a in world.agents_by_role(self.role)] == [n for n in self.nodes if n is not None]:
+            return
+        # Rows are refilled lazily, so a rebuild only costs O(nodes + edges)
+        self._clear()
+        for agent in world.agents.values():
+            self.on_agent_added(agent)
+        for u, v, weight in topology.edges():
+            self.on_edge_added(u, v, weight)
+        self._synced_topology = topology
+
+    def on_edge_added(self, agent1_id: Hashable, agent2_id: Hashable, weight: float):
+        i, j = self.index.get(agent1_id), self.index.get(agent2_id)
+        if i is None or j is None or i == j:
+            return
+        old = self.adj[i].get(j)
+        self.adj[i][j] = self.adj[j][i] = weight
+        if self.dense:
+            if old is not None and weight > old:
+                self._invalidate_using(i, j, old)
+            n = len(self.nodes)
+            d = self.dist[:n]
+            self.row_valid[:n] &= ~((d[:, i] + weight < d[:, j]) | (d[:, j] + weight < d[:, i]))
+        self._changed()
+
+    def on_edge_removed(self, agent1_id: Hashable, agent2_id: Hashable):
+        i, j = self.index.get(agent1_id), self.index.get(agent2_id)
+        if i is None or j is None or j not in self.adj[i]:
+            return
+        weight = self.adj[i].pop(j)
+        del self.adj[j][i]
+        if self.dense:
+            self._invalidate_using(i, j, weight)
+        self._changed()
+
+    # --- Queries ---
+
+    def next_hop(self, src_id: Hashable, dst_id: Hashable) -> Optional[Hashable]:
+        """
+        Neighbour of src on a shortest path to dst, or None if dst is
+        unreachable, equal to src, or not a routed node.
+        """
+        s, d = self.index.get(src_id), self.index.get(dst_id)
+        if s is None or d is None or s == d:
+            return None
+        hop = self._hop(s, d)
+        return self.nodes[hop] if hop >= 0 else None
+
+    def distance(self, src_id: Hashable, dst_id: Hashable) -> float:
+        s, d = self.index.get(src_id), self.index.get(dst_id)
+        if s is None or d is None:
+            return INF
+        if self.dense:
+            self._ensure_row(s)
+            return float(self.dist[s, d])
+        return self._dijkstra(s)[0][d]
+
+    def next_hop_indices(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """
+        Vectorized next hops for arrays of node indices (dense mode only).
+        """
+        for s in np.unique(src):
+            self._ensure_row(int(s))
+        return self.hops[src, dst]
+
+    def precompute(self):
+        """
+        Do the lazy work now instead of on first use: fill every row (dense
+        mode) or compute the landmark distances (ALT mode).
+        """
+        if not self.dense:
+            self._landmarks()
+            return
+        for s, node in enumerate(self.nodes):
+            if node is not None:
+                self._ensure_row(s)
+
+    # --- Internals ---
+
+    def _changed(self):
+        self._synced_topology = None
+        self._landmark_dist = None
+        self._cache.clear()
+
+    def _hop(self, s: int, d: int) -> int:
+        if self.dense:
+            self._ensure_row(s)
+            return int(self.hops[s, d])
+        hop = self._cache.get((s, d))
+        if hop is None:
+            hop = self._astar(s, d)
+        return hop
+
+    def _ensure_capacity(self, n: int):
+        if n <= self._capacity:
+            return
+        cap = max(n, 2 * self._capacity, 16)
+        dist = np.full((cap, cap), INF)
+        hops = np.full((cap, cap), -1, dtype=np.int32)
+        valid = np.zeros(cap, dtype=bool)
+        old = self._capacity
+        dist[:old, :old] = self.dist
+        hops[:old, :old] = self.hops
+        valid[:old] = self.row_valid
+        self.dist, self.hops, self.row_valid, self._capacity = dist, hops, valid, cap
+
+    def _invalidate_using(self, i: int, j: int, weight: float):
+        n = len(self.nodes)
+        d = self.dist[:n]
+        on_path = np.isfinite(d[:, i]) & (np.isclose(d[:, i] + weight, d[:, j]) | np.isclose(d[:, j] + weight, d[:, i]))
+        self.row_valid[:n] &= ~on_path
+
+    def _ensure_row(self, s: int):
+        if self.row_valid[s]:
+            return
+        with self._lock:
+            if self.row_valid[s]:
+                return
+            dist, first = self._dijkstra(s)
+            n = len(dist)
+            self.dist[s, :n] = dist
+            self.hops[s, :n] = first
+            self.row_valid[s] = True
+
+    def _dijkstra(self, s: int) -> Tuple[List[float], List[int]]:
+        """
+        Distances from s and the first hop on a shortest path to every node.
+        """
+        adj = self.adj
+        dist = [INF] * len(adj)
+        first = [-1] * len(adj)
+        dist[s] = 0.0
+        first[s] = s
+        heap = [(0.0, s)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            hop = first[u]
+            for v, w in adj[u].items():
+                nd = d + w
+                if nd < dist[v]:
+                    dist[v] = nd
+                    first[v] = v if u == s else hop
+                    heapq.heappush(heap, (nd, v))
+        return dist, first
+
+    def _landmarks(self) -> List[Tuple[float, ...]]:
+        """
+        Per-node distances to landmarks picked by farthest-point sampling.
+        """
+        if self._landmark_dist is not None:
+            return self._landmark_dist
+        with self._lock:
+            if self._landmark_dist is not None:
+                return self._landmark_dist
+            alive = [i for i, node in enumerate(self.nodes) if node is not None]
+            rows = []
+            closest = [INF] * len(self.nodes)
+            current = alive[0] if alive else None
+            for _ in range(min(self.num_landmarks, len(alive))):
+                row = self._dijkstra(current)[0]
+                rows.append(row)
+                closest = [min(c, r) for c, r in zip(closest, row)]
+                # Next landmark: farthest reachable node from the chosen set
+                current = max(alive, key=lambda v: closest[v] if closest[v] < INF else -1)
+            self._landmark_dist = list(zip(*rows)) if rows else [()] * len(self.nodes)
+        return self._landmark_dist
+
+    def _astar(self, s: int, d: int) -> int:
+        lm = self._landmarks()
+        target = lm[d]
+
+        def h(v: int) -> float:
+            best = 0.0
+            for a, b in zip(lm[v], target):
+                if a < INF and b < INF:
+                    diff = abs(a - b)
+                    if diff > best:
+                        best = diff
+            return best
+
+        g = {s: 0.0}
+        parent = {s: -1}
+        heap = [(h(s), 0.0, s)]
+        closed = set()
+        while heap:
+            _, gu, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == d:
+                break
+            closed.add(u)
+            for v, w in self.adj[u].items():
+                nd = gu + w
+                if nd < g.get(v, INF):
+                    g[v] = nd
+                    parent[v] = u
+                    heapq.heappush(heap, (nd + h(v), nd, v))
+        else:
+            self._cache[(s, d)] = -1
+            return -1
+
+        # Every suffix of a shortest path is shortest: cache hops along it
+        path = [d]
+        while parent[path[-1]] != -1:
+            path.append(parent[path[-1]])
+        path.reverse()
+        for a, b in zip(path, path[1:]):
+            self._cache[(a, d)] = b
+        return self._cache[(s, d)]
@@ -0,0 +1,357 @@
+import asyncio
+import random
+from time import perf_counter_ns
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.agent import Agent
+from src.core.rng import ShardRNG, using_rng
+
+# (agent_id, actions) pairs in the order World.tick collects outboxes
+Decisions = List[Tuple[Hashable, List[Any]]]
+
+
+class Scheduler:
+    """
+    Runs the perceive/decide phase of World.tick.
+    """
+    def run(self, world) -> Decisions:
+        raise NotImplementedError
+
+    async def arun(self, world) -> Decisions:
+        """
+        Decide phase of AsyncWorld.atick. Schedulers without async support
+        run synchronously, so agents are decided with decide().
+        """
+        return self.run(world)
+
+    def bind(self, world):
+        """
+        Called by World.__init__ with the world this scheduler will run.
+        Stateless schedulers ignore it.
+        """
+        pass
+
+    def fork(self) -> "Scheduler":
+        """
+        Scheduler for a World.fork() copy: the same object unless it keeps
+        per-world state.
+        """
+        return self
+
+    def close(self):
+        pass
+
+
+class SequentialScheduler(Scheduler):
+    """
+    Default scheduler: every active (non-passive) agent perceives and
+    decides in shuffled order.
+
+    With batch_policies=True, agents that share a policy object and use the
+    stock Agent.decide are decided together: each processes its inbox, then
+    the policy's decide_batch runs once for the whole group and the actions
+    are scattered back. Decisions keep the shuffled order.
+    """
+    def __init__(self, batch_policies: bool = False):
+        self.batch_policies = batch_policies
+        # Agents whose adecide() missed its timeout in the last arun()
+        self.last_timeouts: List[Hashable] = []
+
+    def run(self, world) -> Decisions:
+        # Shuffle execution order to prevent bias
+        agent_ids = list(world.active_agents)
+        random.shuffle(agent_ids)
+        return self.decide(world, agent_ids)
+
+    async def arun(self, world) -> Decisions:
+        agent_ids = list(world.active_agents)
+        random.shuffle(agent_ids)
+        return await self.adecide(world, agent_ids)
+
+    def decide(self, world, agent_ids: Sequence[Hashable]) -> Decisions:
+        """
+        Perceive/decide for `agent_ids`, in that order.
+        """
+        if self.batch_policies:
+            return decide_batched(world, agent_ids)
+        if world.profiler is not None:
+            return _decide_timed(world, agent_ids, world.profiler)
+
+        decisions = []
+        for agent_id in agent_ids:
+            agent = world.agents[agent_id]
+            # In a real scenario, we'd pass a filtered view of the world state
+            agent.perceive(world)
+            decisions.append((agent_id, agent.decide()))
+        return decisions
+
+
+    async def adecide(self, world, agent_ids: Sequence[Hashable]) -> Decisions:
+        """
+        decide() for AsyncWorld. Agents that override Agent.adecide perceive,
+        then decide as concurrent tasks, each bounded by its decide_timeout
+        (or the world's); the other agents are decided with decide() while
+        those tasks wait. A task that times out is cancelled and its agent
+        falls back to default_action(). Decisions keep the given order.
+        """
+        agents = world.agents
+        profiler = world.profiler
+        self.last_timeouts = []
+        sync_ids = []
+        tasks: Dict[Hashable, asyncio.Future] = {}
+        for agent_id in agent_ids:
+            agent = agents[agent_id]
+            if type(agent).adecide is Agent.adecide:
+                sync_ids.append(agent_id)
+                continue
+            agent.perceive(world)
+            timeout = agent.decide_timeout if agent.decide_timeout is not None else world.decide_timeout
+            tasks[agent_id] = asyncio.ensure_future(_adecide_timed(agent, timeout, profiler))
+        if not tasks:
+            return self.decide(world, agent_ids)
+
+        try:
+            # Let every task reach its first await before synchronous agents hold the loop
+            await asyncio.sleep(0)
+            actions = dict(self.decide(world, sync_ids))
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            # An agent failed (or the tick was cancelled): stop the other decisions
+            await _cancel_all(tasks.values())
+            raise
+        for agent_id, (timed_out, agent_actions) in zip(tasks, results):
+            if timed_out:
+                self.last_timeouts.append(agent_id)
+                agent_actions = agents[agent_id].default_action()
+            actions[agent_id] = agent_actions
+        if profiler is not None:
+            profiler.count("decide_timeouts", len(self.last_timeouts))
+        return [(agent_id, actions[agent_id]) for agent_id in agent_ids]
+
+
+async def _adecide_timed(agent: Agent, timeout: Optional[float], profiler) -> Tuple[bool, List[Any]]:
+    """
+    Run agent.adecide() under `timeout` seconds (None = no limit).
+    Returns (timed out, actions). Errors raised by adecide() itself,
+    including its own TimeoutError, propagate.
+    """
+    start = perf_counter_ns() if profiler is not None else 0
+    task = asyncio.ensure_future(agent.adecide())
+    try:
+        await asyncio.wait((task,), timeout=timeout)
+    finally:
+        # Deadline passed, or this coroutine was cancelled while waiting
+        timed_out = not task.done()
+        if timed_out:
+            await _cancel_all((task,))
+    result = (True, []) if timed_out else (False, task.result())
+    if profiler is not None:
+        profiler.add_decide(agent.role, perf_counter_ns() - start)
+    return result
+
+
+async def _cancel_all(tasks):
+    """
+    Cancel the unfinished tasks and wait for them to wind down.
+    """
+    pending = [task for task in tasks if not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _decide_timed(world, agent_ids: Sequence[Hashable], profiler) -> Decisions:
+    """
+    The sequential perceive/decide loop, timing each agent by role.
+    """
+    decisions = []
+    for agent_id in agent_ids:
+        agent = world.agents[agent_id]
+        start = perf_counter_ns()
+        agent.perceive(world)
+        agent_actions = agent.decide()
+        profiler.add_decide(agent.role, perf_counter_ns() - start)
+        decisions.append((agent_id, agent_actions))
+    return decisions
+
+
+def decide_batched(world, agent_ids: Sequence[Hashable]) -> Decisions:
+    """
+    Perceive/decide for `agent_ids` with one decide_batch call per shared
+    policy. Agents that override decide() run it individually.
+    With a profiler attached, a group's batch time is split evenly over
+    its agents.
+    """
+    profiler = world.profiler
+    # Per-agent perceive (+ decide) time, only filled when profiling
+    elapsed: Dict[Hashable, int] = {}
+    actions: Dict[Hashable, List[Any]] = {}
+    groups: Dict[int, Tuple[Any, List[Any]]] = {}
+    for agent_id in agent_ids:
+        agent = world.agents[agent_id]
+        start = perf_counter_ns() if profiler is not None else 0
+        agent.perceive(world)
+        if agent.policy is not None and type(agent).decide is Agent.decide:
+            agent.process_messages()
+            groups.setdefault(id(agent.policy), (agent.policy, []))[1].append(agent)
+            if profiler is not None:
+                elapsed[agent_id] = perf_counter_ns() - start
+        else:
+            actions[agent_id] = agent.decide()
+            if profiler is not None:
+                profiler.add_decide(agent.role, perf_counter_ns() - start)
+
+    for policy, agents in groups.values():
+        start = perf_counter_ns() if profiler is not None else 0
+        batch = policy.decide_batch([agent.state for agent in agents], None)
+        for agent, agent_actions in zip(agents, batch):
+            actions[agent.id] = agent_actions
+        if profiler is not None:
+            share = (perf_counter_ns() - start) // len(agents)
+            for agent in agents:
+                profiler.add_decide(agent.role, elapsed[agent.id] + share)
+    return [(agent_id, actions[agent_id]) for agent_id in agent_ids]
+
+
+def shard_seed(seed: int, tick: int, shard: int) -> int:
+    """
+    Deterministic per-shard seed for a given tick.
+    """
+    return int(np.random.SeedSequence([seed, tick, shard]).generate_state(1)[0])
+
+
+# Agent attributes that point at objects shared across agents; workers only
+# see pickled copies of them, which are never copied back
+_SHARED_ATTRS = ("policy", "message_pool", "_store")
+
+
+def _decide_shard(agents: list, seed: int) -> Tuple[list, list]:
+    """
+    Process-pool job: decide for a pickled shard of agents under the
+    shard's ShardRNG, in the same order as a thread shard. The worker's
+    global RNGs are reseeded too, so policies that use them are
+    reproducible. Returns the updated agents and their actions.
+    """
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    rng = ShardRNG(seed)
+    order = list(range(len(agents)))
+    rng.random.shuffle(order)
+    actions = [None] * len(agents)
+    with using_rng(rng):
+        for i in order:
+            actions[i] = agents[i].decide()
+    return agents, actions
+
+
+class ParallelScheduler(Scheduler):
+    """
+    Opt-in parallel perceive/decide phase.
+
+    Agents are split into `num_shards` contiguous shards (in world insertion
+    order) and each shard runs on a concurrent.futures pool. Each shard
+    gets a ShardRNG seeded from (seed, tick, shard): it shuffles the
+    shard's agents, and policies draw from it through current_rng()
+    (RandomPolicy and RLPolicy do). Decisions are returned shard by shard,
+    so outboxes reach the channel in the same order on every run, and
+    training records such as RLPolicy's log-probs are merged back in the
+    same order.
+
+    Decisions only depend on the previous tick's state and the delivered
+    inbox, so the result matches a sequential tick with the same ordering.
+
+    Threads (the default) share agents and the world in place; this pays
+    off for policies that release the GIL, such as RLPolicy's torch
+    forward pass. With use_processes=True, perceive runs in the main
+    process and each shard's agents are pickled to a worker for decide();
+    agents and policies must be picklable, and columnar stores and
+    policies that record training data (an RLPolicy in training mode)
+    are not supported in that mode. Per-agent state comes back from the
+    workers; agents keep their shared policy objects. Message pools are
+    not supported in either mode.
+    """
+    def __init__(self, num_shards: int = 4, max_workers: Optional[int] = None, seed: int = 0,
+                 use_processes: bool = False, executor: Optional[Executor] = None):
+        self.num_shards = max(num_shards, 1)
+        self.seed = seed
+        self.use_processes = use_processes
+        self._owns_executor = executor is None
+        if executor is None:
+            pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            executor = pool_cls(max_workers=max_workers or self.num_shards)
+        self.executor = executor
+
+    def shards(self, agent_ids: Sequence[Hashable]) -> List[List[Hashable]]:
+        n = len(agent_ids)
+        bounds = [n * i // self.num_shards for i in range(self.num_shards + 1)]
+        return [list(agent_ids[bounds[i]:bounds[i + 1]]) for i in range(self.num_shards)]
+
+    def run(self, world) -> Decisions:
+        if world.message_pool is not None:
+            raise ValueError("Parallel scheduling does not support message pools")
+        shards = self.shards(list(world.active_agents))
+        seeds = [shard_seed(self.seed, world.tick_count, i) for i in range(len(shards))]
+        if self.use_processes:
+            return self._run_processes(world, shards, seeds)
+
+        # Build the compiled topology and the routing table here rather than
+        # from several shard threads at once (routing rows lock themselves)
+        world.topology
+        world.routing
+        rngs = [ShardRNG(s) for s in seeds]
+        futures = [self.executor.submit(self._run_shard, world, ids, rng) for ids, rng in zip(shards, rngs)]
+        decisions = []
+        for future in futures:
+            decisions.extend(future.result())
+        for rng in rngs:
+            rng.merge_records()
+        return decisions
+
+    @staticmethod
+    def _run_shard(world, agent_ids: List[Hashable], rng: ShardRNG) -> Decisions:
+        order = list(agent_ids)
+        rng.random.shuffle(order)
+        decisions = []
+        with using_rng(rng):
+            for agent_id in order:
+                agent = world.agents[agent_id]
+                agent.perceive(world)
+                decisions.append((agent_id, agent.decide()))
+        return decisions
+
+    def _run_processes(self, world, shards: List[List[Hashable]], seeds: List[int]) -> Decisions:
+        if world.store is not None:
+            raise ValueError("Process-based scheduling does not support columnar stores")
+        for ids in shards:
+            for agent_id in ids:
+                if getattr(world.agents[agent_id].policy, "records_decisions", False):
+                    raise ValueError("Process-based scheduling cannot bring back policy training records; "
+                                     "call eval() on the policy or use threads")
+        for ids in shards:
+            for agent_id in ids:
+                world.agents[agent_id].perceive(world)
+
+        futures = [self.executor.submit(_decide_shard, [world.agents[a] for a in ids], s)
+                   for ids, s in zip(shards, seeds)]
+        decisions = []
+        for ids, seed, future in zip(shards, seeds, futures):
+            updated, actions = future.result()
+            order = list(range(len(ids)))
+            random.Random(seed).shuffle(order)
+            for i in order:
+                # Copy the worker's post-decide state back onto the live agent,
+                # keeping the live agent's references to shared objects
+                state = updated[i].__dict__
+                for name in _SHARED_ATTRS:
+                    state.pop(name, None)
+                world.agents[ids[i]].__dict__.update(state)
+                decisions.append((ids[i], actions[i]))
+        return decisions
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown()
@@ -0,0 +1,264 @@
+import multiprocessing as mp
+import random
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.agent import Agent
+from src.core.ids import SequentialIdAllocator
+from src.core.scheduler import shard_seed
+from src.core.world import World
+
+
+def home_of(agent: Agent) -> Optional[Hashable]:
+    """
+    Node a mobile agent is attached to (truck location, task origin).
+    Returns None for static agents such as warehouses.
+    """
+    location = getattr(agent, "location", None)
+    if location is not None:
+        return location
+    return getattr(agent, "origin", None)
+
+
+def is_mobile(agent: Agent) -> bool:
+    return hasattr(agent, "location") or hasattr(agent, "origin")
+
+
+def partition_agents(world: World, num_shards: int) -> Dict[Hashable, int]:
+    """
+    Assign every agent to a shard.
+
+    Static agents are ordered breadth-first over the static subgraph and cut
+    into `num_shards` contiguous runs, so each shard holds clusters of
+    connected warehouses. Mobile agents go to the shard of their home node.
+    """
+    anchors = [aid for aid, agent in world.agents.items() if not is_mobile(agent)]
+    anchor_set = set(anchors)
+    order: List[Hashable] = []
+    seen = set()
+    for root in anchors:
+        if root in seen:
+            continue
+        seen.add(root)
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for nbr in world.neighbors(node):
+                if nbr in anchor_set and nbr not in seen:
+                    seen.add(nbr)
+                    queue.append(nbr)
+
+    owner = {aid: i * num_shards // len(order) for i, aid in enumerate(order)}
+    for aid, agent in world.agents.items():
+        if aid not in owner:
+            owner[aid] = owner.get(home_of(agent), 0)
+    return owner
+
+
+class ShardWorld(World):
+    """
+    World owned by one shard process. Records agents added and removed
+    between ticks so the coordinator can keep its ownership map current.
+    Remote neighbours of local nodes appear in the topology as ghost nodes
+    (nodes with edges but no agent); mobile agents can be placed on them.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.added: List[Hashable] = []
+        self.removed: List[Hashable] = []
+
+    def add_agent(self, agent: Agent):
+        super().add_agent(agent)
+        self.added.append(agent.id)
+
+    def remove_agent(self, agent_id: Hashable):
+        if agent_id in self.agents:
+            self.removed.append(agent_id)
+        super().remove_agent(agent_id)
+
+
+def build_shard_world(world: World, owner: Dict[Hashable, int], shard: int, num_shards: int) -> ShardWorld:
+    """
+    Copy the agents owned by `shard`, their placements and every static edge
+    touching them into a ShardWorld. IDs allocated in the shard are strided by num_shards so they
+    never collide with other shards or with existing integer IDs.
+    """
+    int_ids = [aid for aid in world.agents if isinstance(aid, int)]
+    start = (max(int_ids) + 1 if int_ids else 0) + shard
+    local = ShardWorld(id_allocator=SequentialIdAllocator(start, num_shards))
+    local.tick_count = world.tick_count
+    for aid, agent in world.agents.items():
+        if owner[aid] == shard:
+            local.add_agent(agent)
+    for u, v, weight in world.topology.edges():
+        if owner.get(u) == shard or owner.get(v) == shard:
+            local._add_static_edge(u, v, weight)
+    for aid, node in world.occupancy.location.items():
+        if owner[aid] == shard:
+            local.place(aid, node)
+    local.added.clear()
+    return local
+
+
+def _shard_worker(conn, world: ShardWorld, step_fn: Optional[Callable[[World], Any]], seed: int):
+    """
+    Shard process loop. Each "tick" command carries the messages and agents
+    handed to this shard at the last barrier; the reply carries messages for
+    remote receivers, agents whose home moved to another shard, and the IDs
+    added or removed locally.
+    """
+    # Forked workers inherit the parent's NumPy RNG state (and `random` is
+    # reseeded from OS entropy); give each shard its own reproducible stream
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    channel = world.comm_channel
+    while True:
+        cmd, payload = conn.recv()
+        if cmd == "tick":
+            messages, arrivals = payload
+            for agent in arrivals:
+                world.add_agent(agent)
+                home = home_of(agent)
+                if home in world.agents:
+                    world.place(agent.id, home)
+            for receiver_id, msg in messages:
+                channel.multicast(msg, (receiver_id,))
+
+            world.tick()
+            if step_fn is not None:
+                step_fn(world)
+
+            # Truck hand-offs: mobile agents whose home is no longer local
+            migrants = []
+            for agent in list(world.agents.values()):
+                home = home_of(agent)
+                if home is not None and home not in world.agents and home in world.topology.index:
+                    world.remove_agent(agent.id)
+                    migrants.append(agent)
+
+            # Boundary messages: queues for receivers this shard doesn't own
+            outbound = []
+            for receiver_id in [rid for rid in channel.queues if rid not in world.agents]:
+                outbound.extend((receiver_id, msg) for msg in channel.queues.pop(receiver_id))
+
+            conn.send((outbound, migrants, world.added, world.removed))
+            world.added, world.removed = [], []
+        elif cmd == "state":
+            conn.send(world.get_state())
+        elif cmd == "collect":
+            conn.send(list(world.agents.values()))
+        elif cmd == "stop":
+            conn.close()
+            return
+
+
+class ShardedWorld:
+    """
+    Runs one World split across worker processes.
+
+    The agent graph is partitioned with `partition_agents` and each shard
+    ticks its own agents in its own process. At every tick barrier the
+    coordinator forwards messages addressed to agents in other shards
+    and hands off mobile agents whose home node now belongs to another
+    shard. Cross-shard messages keep the one-tick delivery latency of a
+    single World.
+
+    `step_fn(world)` runs in every shard after its tick (e.g. to move trucks);
+    it must be a picklable module-level function. Each shard process seeds
+    the global `random` and NumPy RNGs from (seed, shard index), so shards
+    draw different, reproducible streams. Agents move between
+    processes by pickling, so columnar stores and message pools are not
+    supported.
+    """
+    def __init__(self, world: World, num_shards: int = 2, step_fn: Optional[Callable[[World], Any]] = None,
+                 context: Optional[str] = None, seed: int = 0):
+        if world.store is not None or world.message_pool is not None:
+            raise ValueError("ShardedWorld does not support columnar stores or message pools")
+        self.num_shards = num_shards
+        self.tick_count = world.tick_count
+        self.owner = partition_agents(world, num_shards)
+        self.dropped = 0
+
+        # Messages already queued in the source world go to their owners
+        self._inbound_messages: List[List[Tuple[Hashable, Any]]] = [[] for _ in range(num_shards)]
+        self._inbound_agents: List[List[Agent]] = [[] for _ in range(num_shards)]
+        for receiver_id, queue in world.comm_channel.queues.items():
+            self._route_messages([(receiver_id, msg) for msg in queue])
+
+        ctx = mp.get_context(context)
+        self._conns = []
+        self._procs = []
+        for shard in range(num_shards):
+            local = build_shard_world(world, self.owner, shard, num_shards)
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_shard_worker, daemon=True,
+                               args=(child, local, step_fn, shard_seed(seed, world.tick_count, shard)))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def _route_messages(self, messages: List[Tuple[Hashable, Any]]):
+        for receiver_id, msg in messages:
+            shard = self.owner.get(receiver_id)
+            if shard is None:
+                self.dropped += 1
+            else:
+                self._inbound_messages[shard].append((receiver_id, msg))
+
+    def tick(self):
+        """
+        Tick every shard in parallel, then exchange boundary traffic.
+        """
+        self.tick_count += 1
+        for shard, conn in enumerate(self._conns):
+            conn.send(("tick", (self._inbound_messages[shard], self._inbound_agents[shard])))
+        self._inbound_messages = [[] for _ in range(self.num_shards)]
+        self._inbound_agents = [[] for _ in range(self.num_shards)]
+
+        results = [conn.recv() for conn in self._conns]
+        for shard, (_, _, added, removed) in enumerate(results):
+            for aid in removed:
+                self.owner.pop(aid, None)
+            for aid in added:
+                self.owner[aid] = shard
+        for _, migrants, _, _ in results:
+            for agent in migrants:
+                dest = self.owner[home_of(agent)]
+                self.owner[agent.id] = dest
+                self._inbound_agents[dest].append(agent)
+        for outbound, _, _, _ in results:
+            self._route_messages(outbound)
+
+    def get_state(self) -> Dict[str, Any]:
+        for conn in self._conns:
+            conn.send(("state", None))
+        states = [conn.recv() for conn in self._conns]
+        in_transit = sum(len(a) for a in self._inbound_agents)
+        return {
+            "tick": self.tick_count,
+            "agent_count": sum(s["agent_count"] for s in states) + in_transit,
+            "shards": states,
+        }
+
+    def collect(self) -> Dict[Hashable, Agent]:
+        """
+        Copy of every agent, including those in transit between shards.
+        """
+        for conn in self._conns:
+            conn.send(("collect", None))
+        agents = {}
+        for conn in self._conns:
+            agents.update((a.id, a) for a in conn.recv())
+        for pending in self._inbound_agents:
+            agents.update((a.id, a) for a in pending)
+        return agents
+
+    def close(self):
+        for conn in self._conns:
+            conn.send(("stop", None))
+        for proc in self._procs:
+            proc.join()
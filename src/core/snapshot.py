@@ -0,0 +1,70 @@
+import io
+import pickle
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from src.core.topology import Topology
+from src.learning.policy import Policy
+
+
+class WorldSnapshot:
+    """
+    Frozen copy of a World's dynamic state (agents, occupancy, queued
+    messages, tick, ID allocator, columnar store) as one pickle buffer.
+
+    Objects that are shared rather than copied:
+      - policies, referenced from the buffer by persistent ID, so every world
+        restored from the snapshot uses the same (possibly trained) policy;
+      - the static adjacency and its compiled Topology, which restored worlds
+        share copy-on-write until they connect or disconnect agents.
+    """
+    __slots__ = ("payload", "refs", "static_adj", "topology")
+
+    def __init__(self, payload: bytes, refs: List[Any], static_adj: Dict[Hashable, Dict[Hashable, float]],
+                 topology: Optional[Topology]):
+        self.payload = payload
+        self.refs = refs
+        self.static_adj = static_adj
+        self.topology = topology
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.payload)
+
+    def load(self) -> Dict[str, Any]:
+        return _RefUnpickler(io.BytesIO(self.payload), self.refs).load()
+
+
+def dump_state(state: Dict[str, Any]) -> Tuple[bytes, List[Any]]:
+    """
+    Pickle `state`, replacing shared objects with persistent IDs.
+    Returns the buffer and the referenced objects.
+    """
+    buf = io.BytesIO()
+    pickler = _RefPickler(buf, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dump(state)
+    return buf.getvalue(), pickler.refs
+
+
+class _RefPickler(pickle.Pickler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.refs: List[Any] = []
+        self._ref_ids: Dict[int, int] = {}
+
+    def persistent_id(self, obj):
+        if isinstance(obj, Policy):
+            key = self._ref_ids.get(id(obj))
+            if key is None:
+                key = self._ref_ids[id(obj)] = len(self.refs)
+                self.refs.append(obj)
+            return key
+        return None
+
+
+class _RefUnpickler(pickle.Unpickler):
+    def __init__(self, file, refs: List[Any]):
+        super().__init__(file)
+        self.refs = refs
+
+    def persistent_load(self, key):
+        return self.refs[key]
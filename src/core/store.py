@@ -0,0 +1,305 @@
+import numpy as np
+from collections.abc import MutableSequence
+from typing import Any, Dict, Hashable, List, Optional
+
+
+class AgentStore:
+    """
+    Columnar (struct-of-arrays) registry for agent state.
+
+    Every attached agent gets a dense integer index and a role code, and the
+    attributes declared as columns on its class (see `Column`) are stored in
+    typed NumPy arrays instead of per-object attributes. References to other
+    agents (locations, cargo) are interned into integer handles.
+
+    Column arrays grow by doubling, so views returned by `column()` are only
+    valid until the next `attach`.
+    """
+    def __init__(self, capacity: int = 1024):
+        self.capacity = max(capacity, 1)
+        self.size = 0  # high-water mark of used indices
+        self.agents: List[Any] = [None] * self.capacity
+        self.role = np.full(self.capacity, -1, dtype=np.int16)
+        self.role_codes: Dict[str, int] = {}
+        self.role_names: List[str] = []
+        self._index_of: Dict[Hashable, int] = {}
+        self._free: List[int] = []
+        self._columns: Dict[str, np.ndarray] = {}
+        self._fills: Dict[str, Any] = {}
+        # Intern table for agent ids referenced from columns
+        self._handles: Dict[Hashable, int] = {}
+        self._names: List[Hashable] = []
+
+    def __len__(self):
+        return len(self._index_of)
+
+    def intern(self, key: Optional[Hashable]) -> int:
+        """
+        Return the integer handle for an agent id (-1 for None).
+        """
+        if key is None:
+            return -1
+        handle = self._handles.get(key)
+        if handle is None:
+            handle = len(self._names)
+            self._handles[key] = handle
+            self._names.append(key)
+        return handle
+
+    def name(self, handle: int) -> Optional[Hashable]:
+        """
+        Return the agent id behind an interned handle.
+        """
+        return None if handle < 0 else self._names[handle]
+
+    def role_code(self, role: str) -> int:
+        code = self.role_codes.get(role)
+        if code is None:
+            code = len(self.role_names)
+            self.role_codes[role] = code
+            self.role_names.append(role)
+        return code
+
+    def index_of(self, agent_id: Hashable) -> int:
+        return self._index_of[agent_id]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Live view of a column over the used index range.
+        """
+        return self._columns[name][:self.size]
+
+    def indices_with_role(self, role: str) -> np.ndarray:
+        code = self.role_codes.get(role, -2)
+        return np.nonzero(self.role[:self.size] == code)[0]
+
+    def ensure_column(self, name: str, dtype, fill, width: Optional[int] = None):
+        """
+        Declare a column, or widen a 2D column to at least `width` slots.
+        """
+        col = self._columns.get(name)
+        if col is None:
+            shape = (self.capacity,) if width is None else (self.capacity, width)
+            self._columns[name] = np.full(shape, fill, dtype=dtype)
+            self._fills[name] = fill
+        elif width is not None and col.shape[1] < width:
+            wider = np.full((col.shape[0], width), fill, dtype=col.dtype)
+            wider[:, :col.shape[1]] = col
+            self._columns[name] = wider
+
+    def attach(self, agent) -> int:
+        """
+        Give the agent an index and move its column attributes into the store.
+        """
+        if agent.id in self._index_of:
+            raise ValueError(f"Agent {agent.id} is already in the store")
+        if self._free:
+            index = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            index = self.size
+            self.size += 1
+
+        self.agents[index] = agent
+        self.role[index] = self.role_code(agent.role)
+        self._index_of[agent.id] = index
+
+        columns = type(agent).__columns__
+        values = {name: agent.__dict__.pop(name, None) for name in columns}
+        for name, col in columns.items():
+            col.declare(self, values[name])
+        agent._store = self
+        agent._index = index
+        for name, col in columns.items():
+            if values[name] is not None:
+                col.__set__(agent, values[name])
+        return index
+
+    def detach(self, agent):
+        """
+        Copy the agent's column values back onto the object and free its index.
+        """
+        index = self._index_of.pop(agent.id)
+        columns = type(agent).__columns__
+        values = {name: col.__get__(agent, type(agent)) for name, col in columns.items()}
+        for name, value in values.items():
+            if isinstance(value, CargoView):
+                value = list(value)
+            agent.__dict__[name] = value
+        for name in columns:
+            self._columns[name][index] = self._fills[name]
+        agent._store = None
+        agent._index = -1
+        self.agents[index] = None
+        self.role[index] = -1
+        self._free.append(index)
+
+    def _grow(self):
+        self.capacity *= 2
+        self.agents.extend([None] * (self.capacity - len(self.agents)))
+        self.role = _resized(self.role, self.capacity, -1)
+        for name, col in self._columns.items():
+            self._columns[name] = _resized(col, self.capacity, self._fills[name])
+
+
+def _resized(array: np.ndarray, length: int, fill) -> np.ndarray:
+    out = np.full((length,) + array.shape[1:], fill, dtype=array.dtype)
+    out[:array.shape[0]] = array
+    return out
+
+
+class Column:
+    """
+    Numeric agent attribute that lives in an AgentStore column once the agent
+    is attached, and in the instance __dict__ otherwise.
+    """
+    def __init__(self, dtype=np.int64, fill=0):
+        self.dtype = dtype
+        self.fill = fill
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        # Each class gets its own column map including inherited columns
+        owner.__columns__ = {**owner.__dict__.get("__columns__", getattr(owner, "__columns__", {})), name: self}
+
+    def declare(self, store: AgentStore, value):
+        store.ensure_column(self.name, self.dtype, self.fill)
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        store = agent._store
+        if store is None:
+            return agent.__dict__.get(self.name)
+        return store._columns[self.name][agent._index].item()
+
+    def __set__(self, agent, value):
+        store = agent._store
+        if store is None:
+            agent.__dict__[self.name] = value
+        else:
+            store._columns[self.name][agent._index] = value
+
+
+class HandleColumn(Column):
+    """
+    Reference to another agent (e.g. a location), stored as an interned handle.
+    """
+    def __init__(self):
+        super().__init__(dtype=np.int64, fill=-1)
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        store = agent._store
+        if store is None:
+            return agent.__dict__.get(self.name)
+        return store.name(int(store._columns[self.name][agent._index]))
+
+    def __set__(self, agent, value):
+        store = agent._store
+        if store is None:
+            agent.__dict__[self.name] = value
+        else:
+            store._columns[self.name][agent._index] = store.intern(value)
+
+
+class HandleListColumn(Column):
+    """
+    Short list of agent references (e.g. cargo) stored as a fixed-width row of
+    handles plus a length column. Bound agents see a CargoView over the row.
+    """
+    def __init__(self):
+        super().__init__(dtype=np.int64, fill=-1)
+
+    @property
+    def len_name(self):
+        return self.name + "_len"
+
+    def declare(self, store: AgentStore, value):
+        store.ensure_column(self.name, self.dtype, self.fill, width=max(len(value or ()), 1))
+        store.ensure_column(self.len_name, np.int32, 0)
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        store = agent._store
+        if store is None:
+            return agent.__dict__.get(self.name)
+        return CargoView(store, self.name, agent._index)
+
+    def __set__(self, agent, value):
+        store = agent._store
+        if store is None:
+            agent.__dict__[self.name] = value
+            return
+        items = list(value)
+        store.ensure_column(self.name, self.dtype, self.fill, width=len(items))
+        row = store._columns[self.name][agent._index]
+        row[:] = self.fill
+        row[:len(items)] = [store.intern(item) for item in items]
+        store._columns[self.len_name][agent._index] = len(items)
+
+
+class CargoView(MutableSequence):
+    """
+    List-like view over one agent's row of a HandleListColumn.
+    """
+    __slots__ = ("store", "name", "index")
+
+    def __init__(self, store: AgentStore, name: str, index: int):
+        self.store = store
+        self.name = name
+        self.index = index
+
+    def _row(self):
+        return self.store._columns[self.name][self.index]
+
+    def __len__(self):
+        return int(self.store._columns[self.name + "_len"][self.index])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("cargo index out of range")
+        return self.store.name(int(self._row()[i]))
+
+    def __setitem__(self, i, value):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("cargo index out of range")
+        self._row()[i] = self.store.intern(value)
+
+    def __delitem__(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("cargo index out of range")
+        row = self._row()
+        row[i:n - 1] = row[i + 1:n]
+        row[n - 1] = -1
+        self.store._columns[self.name + "_len"][self.index] = n - 1
+
+    def insert(self, i, value):
+        n = len(self)
+        self.store.ensure_column(self.name, np.int64, -1, width=n + 1)
+        row = self._row()
+        i = max(0, min(n, i + n if i < 0 else i))
+        row[i + 1:n + 1] = row[i:n]
+        row[i] = self.store.intern(value)
+        self.store._columns[self.name + "_len"][self.index] = n + 1
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,97 @@
+import numpy as np
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class Topology:
+    """
+    Immutable CSR adjacency of the static network (e.g. warehouses).
+
+    Node i's neighbours are indices[indptr[i]:indptr[i + 1]] with matching
+    weights, in edge insertion order. World compiles a new Topology when
+    static edges change instead of mutating this one, so snapshots can share
+    it safely.
+    """
+    __slots__ = ("nodes", "index", "indptr", "indices", "weights", "_neighbor_ids")
+
+    def __init__(self, adjacency: Dict[Hashable, Dict[Hashable, float]]):
+        self.nodes: List[Hashable] = list(adjacency)
+        self.index: Dict[Hashable, int] = {node: i for i, node in enumerate(self.nodes)}
+        degrees = [len(nbrs) for nbrs in adjacency.values()]
+        self.indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=self.indptr[1:])
+        self.indices = np.fromiter((self.index[v] for nbrs in adjacency.values() for v in nbrs),
+                                   dtype=np.int64, count=int(self.indptr[-1]))
+        self.weights = np.fromiter((w for nbrs in adjacency.values() for w in nbrs.values()),
+                                   dtype=np.float64, count=int(self.indptr[-1]))
+        # Python-side neighbour tuples for per-agent lookups
+        self._neighbor_ids: Dict[Hashable, Tuple[Hashable, ...]] = {
+            node: tuple(nbrs) for node, nbrs in adjacency.items()
+        }
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.indptr[-1]) // 2
+
+    def neighbors(self, node: Hashable) -> Tuple[Hashable, ...]:
+        return self._neighbor_ids.get(node, ())
+
+    def degree(self, node: Hashable) -> int:
+        return len(self._neighbor_ids.get(node, ()))
+
+    def edges(self) -> Iterator[Tuple[Hashable, Hashable, float]]:
+        """
+        Each undirected edge once, as (u, v, weight).
+        """
+        for i, u in enumerate(self.nodes):
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                j = self.indices[k]
+                if i <= j:
+                    yield u, self.nodes[j], float(self.weights[k])
+
+
+class Occupancy:
+    """
+    Which mobile agents (trucks, tasks) sit at which node.
+    Kept apart from the topology so moving an agent is two dict updates.
+    """
+    __slots__ = ("location", "occupants")
+
+    def __init__(self):
+        self.location: Dict[Hashable, Hashable] = {}
+        # node -> occupants in arrival order (dict used as an ordered set)
+        self.occupants: Dict[Hashable, Dict[Hashable, None]] = {}
+
+    def place(self, agent_id: Hashable, node: Hashable) -> Optional[Hashable]:
+        """
+        Move an agent to a node. Returns its previous node, if any.
+        """
+        old = self.location.get(agent_id)
+        if old is not None:
+            if old == node:
+                return old
+            self._drop(agent_id, old)
+        self.location[agent_id] = node
+        self.occupants.setdefault(node, {})[agent_id] = None
+        return old
+
+    def remove(self, agent_id: Hashable) -> Optional[Hashable]:
+        old = self.location.pop(agent_id, None)
+        if old is not None:
+            self._drop(agent_id, old)
+        return old
+
+    def at(self, node: Hashable) -> Tuple[Hashable, ...]:
+        return tuple(self.occupants.get(node, ()))
+
+    def _drop(self, agent_id: Hashable, node: Hashable):
+        here = self.occupants[node]
+        del here[agent_id]
+        if not here:
+            del self.occupants[node]
+
+    def __len__(self):
+        return len(self.location)
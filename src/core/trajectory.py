@@ -0,0 +1,385 @@
+import json
+import os
+from typing import Any, Dict, Hashable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from src.core.agent import Agent
+from src.core.communication import MessageType
+from src.core.world import World, WorldListener
+
+FORMAT_VERSION = 1
+
+# Event kinds. `agent` and `value` are indexes into the agent table unless noted.
+ADDED = 0          # value: role code
+REMOVED = 1
+LOCATION = 2       # value: node (-1 = not placed)
+CARGO = 3          # value: number of cargo items
+INVENTORY = 4      # value: number of inventory items
+EDGE_ADDED = 5     # agent, value: the two endpoints
+EDGE_REMOVED = 6
+
+EVENT_DTYPE = np.dtype([("frame", "<i8"), ("agent", "<i4"), ("kind", "u1"), ("value", "<i8")])
+MESSAGE_DTYPE = np.dtype([("frame", "<i8"), ("sender", "<i4"), ("receiver", "<i4"), ("msg_type", "u1")])
+KEYFRAME_DTYPE = np.dtype([("agent", "<i4"), ("location", "<i4"), ("cargo", "<i4"), ("inventory", "<i4")])
+
+_MESSAGE_TYPES = list(MessageType)
+_MESSAGE_CODES = {t: i for i, t in enumerate(_MESSAGE_TYPES)}
+
+
+class FrameState(NamedTuple):
+    """
+    World state at the end of one recorded frame. Per-agent arrays are
+    indexed like `agents` (indexes into the reader's agent table).
+    """
+    frame: int
+    tick: int
+    agents: np.ndarray
+    location: np.ndarray
+    cargo: np.ndarray
+    inventory: np.ndarray
+    edges: np.ndarray
+
+
+class TrajectoryRecorder(WorldListener):
+    """
+    Streams a world's state changes to an append-only chunked directory.
+
+    One frame is recorded at the end of every World.tick (frames keep
+    counting across env resets, where the world's tick restarts). Agent
+    additions/removals, placements and static edge changes come from the
+    WorldListener hooks; cargo and inventory sizes are diffed per frame.
+    Messages queued during the tick are recorded as (sender, receiver, type).
+
+    Layout of `path`:
+      meta.json                      chunk list, frame count, role names
+      agents.jsonl                   agent table, one {"id", "role"} per line
+      chunk_NNNNNN/keyframe.npy      full state before the chunk's first frame
+      chunk_NNNNNN/edges.npy         static edges at that point
+      chunk_NNNNNN/events.npy        EVENT_DTYPE records, sorted by frame
+      chunk_NNNNNN/messages.npy      MESSAGE_DTYPE records
+      chunk_NNNNNN/ticks.npy         world tick of each frame
+
+    At most `chunk_frames` frames are buffered in memory; each chunk is
+    self-contained, so readers only touch the chunks they need.
+    """
+    def __init__(self, world: World, path: str, chunk_frames: int = 1024, record_messages: bool = True):
+        self.world = world
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.record_messages = record_messages
+        os.makedirs(path, exist_ok=True)
+        self._agents_file = open(os.path.join(path, "agents.jsonl"), "w")
+
+        self.index: Dict[Hashable, int] = {}
+        self.agent_ids: List[Hashable] = []
+        self.roles: List[str] = []
+        self._role_codes: Dict[str, int] = {}
+        # Mirror of the recorded state, used for keyframes and diffs
+        self._live: Dict[int, List[int]] = {}       # agent -> [location, cargo, inventory]
+        self._edges: Set[Tuple[int, int]] = set()
+        self._tracked: Dict[int, Agent] = {}        # agents with cargo or inventory
+
+        self.frame = 0
+        self.chunks: List[Dict[str, int]] = []
+        self._pending: List[Tuple[int, int, int]] = []
+        self._new_chunk()
+        world.add_listener(self)
+        for agent_id, node in world.occupancy.location.items():
+            self._set(self.index[agent_id], 0, LOCATION, self._intern(node))
+        for u, v, _ in world.topology.edges():
+            self.on_edge_added(u, v, 1.0)
+        self._diff_tracked()
+        # Everything so far is the initial state, not a change
+        self._pending.clear()
+        self._keyframe = self._make_keyframe()
+
+    # --- WorldListener ---
+
+    def on_agent_added(self, agent: Agent):
+        idx = self._intern(agent.id, agent.role)
+        self._live[idx] = [-1, 0, 0]
+        self._pending.append((idx, ADDED, self._role_code(agent.role)))
+        if hasattr(agent, "cargo") or hasattr(agent, "inventory"):
+            self._tracked[idx] = agent
+
+    def on_agent_removed(self, agent: Agent):
+        idx = self.index[agent.id]
+        self._live.pop(idx, None)
+        self._tracked.pop(idx, None)
+        self._pending.append((idx, REMOVED, 0))
+
+    def on_agent_moved(self, agent: Agent, old_node: Optional[Hashable], new_node: Optional[Hashable]):
+        node = -1 if new_node is None else self._intern(new_node)
+        self._set(self.index[agent.id], 0, LOCATION, node)
+
+    def on_edge_added(self, agent1_id: Hashable, agent2_id: Hashable, weight: float):
+        edge = self._edge(agent1_id, agent2_id)
+        if edge not in self._edges:
+            self._edges.add(edge)
+            self._pending.append((edge[0], EDGE_ADDED, edge[1]))
+
+    def on_edge_removed(self, agent1_id: Hashable, agent2_id: Hashable):
+        edge = self._edge(agent1_id, agent2_id)
+        if edge in self._edges:
+            self._edges.discard(edge)
+            self._pending.append((edge[0], EDGE_REMOVED, edge[1]))
+
+    def on_world_restored(self, world: World):
+        # Record the jump as ordinary events: removals, additions, then state
+        current = {self._intern(aid, agent.role): agent for aid, agent in world.agents.items()}
+        for idx in [i for i in self._live if i not in current]:
+            self._live.pop(idx)
+            self._tracked.pop(idx, None)
+            self._pending.append((idx, REMOVED, 0))
+        for idx, agent in current.items():
+            if idx not in self._live:
+                self.on_agent_added(agent)
+            elif hasattr(agent, "cargo") or hasattr(agent, "inventory"):
+                self._tracked[idx] = agent
+        for idx in current:
+            node = world.location_of(self.agent_ids[idx])
+            self._set(idx, 0, LOCATION, -1 if node is None else self._intern(node))
+        edges = {self._edge(u, v) for u, v, _ in world.topology.edges()}
+        for edge in self._edges - edges:
+            self._pending.append((edge[0], EDGE_REMOVED, edge[1]))
+        for edge in edges - self._edges:
+            self._pending.append((edge[0], EDGE_ADDED, edge[1]))
+        self._edges = edges
+
+    def on_tick_end(self, world: World):
+        self.record()
+
+    # --- Recording ---
+
+    def record(self):
+        """
+        Close the current frame. Called automatically at the end of each tick.
+        """
+        frame = self.frame
+        self._diff_tracked()
+        chunk = self._chunk
+        chunk["events"].extend((frame, agent, kind, value) for agent, kind, value in self._pending)
+        self._pending.clear()
+        if self.record_messages:
+            index = self.index
+            for receiver_id, queue in self.world.comm_channel.queues.items():
+                receiver = index.get(receiver_id, -1)
+                for msg in queue:
+                    chunk["messages"].append((frame, index.get(msg.sender_id, -1), receiver,
+                                              _MESSAGE_CODES[msg.msg_type]))
+        chunk["ticks"].append(self.world.tick_count)
+        self.frame += 1
+        if len(chunk["ticks"]) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the frames buffered so far as a chunk and start a new one.
+        """
+        chunk = self._chunk
+        if not chunk["ticks"]:
+            return
+        name = f"chunk_{len(self.chunks):06d}"
+        directory = os.path.join(self.path, name)
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "keyframe.npy"), self._keyframe)
+        np.save(os.path.join(directory, "edges.npy"), self._keyframe_edges)
+        np.save(os.path.join(directory, "events.npy"), np.array(chunk["events"], dtype=EVENT_DTYPE))
+        np.save(os.path.join(directory, "messages.npy"), np.array(chunk["messages"], dtype=MESSAGE_DTYPE))
+        np.save(os.path.join(directory, "ticks.npy"), np.array(chunk["ticks"], dtype=np.int64))
+        self.chunks.append({"name": name, "first_frame": chunk["first_frame"], "num_frames": len(chunk["ticks"])})
+        self._agents_file.flush()
+        self._write_meta()
+        self._new_chunk()
+        self._keyframe = self._make_keyframe()
+
+    def close(self):
+        self.flush()
+        self.world.remove_listener(self)
+        self._agents_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Internals ---
+
+    def _intern(self, agent_id: Hashable, role: str = "") -> int:
+        idx = self.index.get(agent_id)
+        if idx is None:
+            idx = self.index[agent_id] = len(self.roles)
+            self.agent_ids.append(agent_id)
+            self.roles.append(role)
+            key = agent_id if isinstance(agent_id, (int, str)) else str(agent_id)
+            self._agents_file.write(json.dumps({"id": key, "role": role}) + "\n")
+        return idx
+
+    def _role_code(self, role: str) -> int:
+        code = self._role_codes.get(role)
+        if code is None:
+            code = self._role_codes[role] = len(self._role_codes)
+        return code
+
+    def _edge(self, u: Hashable, v: Hashable) -> Tuple[int, int]:
+        a, b = self._intern(u), self._intern(v)
+        return (a, b) if a <= b else (b, a)
+
+    def _set(self, idx: int, field: int, kind: int, value: int):
+        row = self._live.get(idx)
+        if row is not None and row[field] != value:
+            row[field] = value
+            self._pending.append((idx, kind, value))
+
+    def _diff_tracked(self):
+        for idx, agent in self._tracked.items():
+            cargo = getattr(agent, "cargo", None)
+            inventory = getattr(agent, "inventory", None)
+            if cargo is not None:
+                self._set(idx, 1, CARGO, len(cargo))
+            if inventory is not None:
+                self._set(idx, 2, INVENTORY, len(inventory))
+
+    def _make_keyframe(self) -> np.ndarray:
+        self._keyframe_edges = np.array(sorted(self._edges), dtype=np.int32).reshape(-1, 2)
+        return np.array([(idx, *row) for idx, row in self._live.items()], dtype=KEYFRAME_DTYPE)
+
+    def _new_chunk(self):
+        self._chunk = {"first_frame": self.frame, "events": [], "messages": [], "ticks": []}
+
+    def _write_meta(self):
+        meta = {
+            "version": FORMAT_VERSION,
+            "chunk_frames": self.chunk_frames,
+            "num_frames": self.frame,
+            "chunks": self.chunks,
+            "roles": sorted(self._role_codes, key=self._role_codes.get),
+            "message_types": [t.name for t in _MESSAGE_TYPES],
+        }
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+
+class TrajectoryReader:
+    """
+    Random access to a recorded trajectory by frame range.
+
+    Chunk arrays are memory-mapped and opened on demand, so replaying a
+    window of a long run only reads that window's chunks. state_at(f)
+    starts from the keyframe of f's chunk and applies at most one chunk of
+    events; iter_states() walks a range applying events incrementally.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.chunks = self.meta["chunks"]
+        self.num_frames = self.meta["num_frames"]
+        self.role_names: List[str] = self.meta["roles"]
+        self.message_types = [MessageType[name] for name in self.meta["message_types"]]
+        self.agent_ids: List[Any] = []
+        self.roles: List[str] = []
+        with open(os.path.join(path, "agents.jsonl")) as f:
+            for line in f:
+                entry = json.loads(line)
+                self.agent_ids.append(entry["id"])
+                self.roles.append(entry["role"])
+        self._first_frames = np.array([c["first_frame"] for c in self.chunks], dtype=np.int64)
+        self._cache: Dict[Tuple[int, str], np.ndarray] = {}
+
+    def __len__(self):
+        return self.num_frames
+
+    def chunk_of(self, frame: int) -> int:
+        if not 0 <= frame < self.num_frames:
+            raise IndexError(f"frame {frame} out of range [0, {self.num_frames})")
+        return int(np.searchsorted(self._first_frames, frame, side="right")) - 1
+
+    def world_tick(self, frame: int) -> int:
+        c = self.chunk_of(frame)
+        return int(self._array(c, "ticks")[frame - self.chunks[c]["first_frame"]])
+
+    def events(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        return self._range("events", start, stop)
+
+    def messages(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        return self._range("messages", start, stop)
+
+    def state_at(self, frame: int) -> FrameState:
+        return next(self.iter_states(frame, frame + 1))
+
+    def iter_states(self, start: int = 0, stop: Optional[int] = None) -> Iterator[FrameState]:
+        """
+        States at the end of each frame in [start, stop).
+        """
+        stop = self.num_frames if stop is None else min(stop, self.num_frames)
+        if start >= stop:
+            return
+        c = self.chunk_of(start)
+        state = _MutableState(self._array(c, "keyframe"), self._array(c, "edges"))
+        frame = self.chunks[c]["first_frame"]
+        while frame < stop:
+            c = self.chunk_of(frame)
+            chunk = self.chunks[c]
+            end = min(chunk["first_frame"] + chunk["num_frames"], stop)
+            events = self._array(c, "events")
+            ticks = self._array(c, "ticks")
+            bounds = np.searchsorted(events["frame"], np.arange(frame, end + 1))
+            for f in range(frame, end):
+                state.apply(events[bounds[f - frame]:bounds[f - frame + 1]])
+                if f >= start:
+                    yield state.freeze(f, int(ticks[f - chunk["first_frame"]]))
+            frame = end
+
+    def _range(self, name: str, start: int, stop: Optional[int]) -> np.ndarray:
+        stop = self.num_frames if stop is None else min(stop, self.num_frames)
+        if start >= stop:
+            return np.zeros(0, dtype=EVENT_DTYPE if name == "events" else MESSAGE_DTYPE)
+        parts = []
+        for c in range(self.chunk_of(start), self.chunk_of(stop - 1) + 1):
+            records = self._array(c, name)
+            lo, hi = np.searchsorted(records["frame"], [start, stop])
+            parts.append(records[lo:hi])
+        return np.concatenate(parts)
+
+    def _array(self, chunk: int, name: str) -> np.ndarray:
+        key = (chunk, name)
+        array = self._cache.get(key)
+        if array is None:
+            array = np.load(os.path.join(self.path, self.chunks[chunk]["name"], f"{name}.npy"), mmap_mode="r")
+            self._cache[key] = array
+        return array
+
+
+class _MutableState:
+    """
+    Reader-side state being replayed, as dicts keyed by agent index.
+    """
+    def __init__(self, keyframe: np.ndarray, edges: np.ndarray):
+        self.live: Dict[int, List[int]] = {int(r["agent"]): [int(r["location"]), int(r["cargo"]), int(r["inventory"])]
+                                           for r in keyframe}
+        self.edges: Set[Tuple[int, int]] = {(int(u), int(v)) for u, v in edges}
+
+    def apply(self, events: np.ndarray):
+        live = self.live
+        for agent, kind, value in zip(events["agent"].tolist(), events["kind"].tolist(), events["value"].tolist()):
+            if kind == ADDED:
+                live[agent] = [-1, 0, 0]
+            elif kind == REMOVED:
+                live.pop(agent, None)
+            elif kind == EDGE_ADDED:
+                self.edges.add((agent, value))
+            elif kind == EDGE_REMOVED:
+                self.edges.discard((agent, value))
+            elif agent in live:
+                live[agent][kind - LOCATION] = value
+
+    def freeze(self, frame: int, tick: int) -> FrameState:
+        agents = np.fromiter(self.live, dtype=np.int32, count=len(self.live))
+        rows = np.array(list(self.live.values()), dtype=np.int64).reshape(-1, 3)
+        edges = np.array(sorted(self.edges), dtype=np.int32).reshape(-1, 2)
+        return FrameState(frame, tick, agents, rows[:, 0], rows[:, 1], rows[:, 2], edges)
@@ -1,79 +1,477 @@
 import networkx as nx
-import random
-from typing import Dict, List
+from typing import Dict, Hashable, List, Optional, Tuple, Type
 from src.core.agent import Agent
-from src.core.communication import CommunicationChannel, Message
+from src.core.communication import CommunicationChannel, Message, MessagePool
+from src.core.ids import IdAllocator, default_allocator
+from src.core.scheduler import Decisions, Scheduler, SequentialScheduler
+from src.core.store import AgentStore
+from src.core.topology import Occupancy, Topology
+from src.core.snapshot import WorldSnapshot, dump_state
+
+class WorldListener:
+    """
+    Receives notifications when the world's agents or edges change.
+    Used by indexes and caches that are maintained incrementally.
+    """
+    def on_agent_added(self, agent: Agent):
+        pass
+
+    def on_agent_removed(self, agent: Agent):
+        pass
+
+    def on_edge_added(self, agent1_id: Hashable, agent2_id: Hashable, weight: float):
+        pass
+
+    def on_edge_removed(self, agent1_id: Hashable, agent2_id: Hashable):
+        pass
+
+    def on_agent_moved(self, agent: Agent, old_node: Optional[Hashable], new_node: Optional[Hashable]):
+        pass
+
+    def on_tick_end(self, world: "World"):
+        """
+        Called at the end of every World.tick, after actions and message routing.
+        """
+        pass
+
+    def on_world_restored(self, world: "World"):
+        """
+        The world's contents were replaced wholesale by World.restore;
+        incremental state must be rebuilt from `world`.
+        """
+        pass
 
 class World:
-    def __init__(self):
-        self.agents: Dict[str, Agent] = {}
-        self.graph = nx.Graph()
+    """
+    Agents plus two kinds of structure:
+      - the static topology (e.g. the warehouse network), built with
+        connect_agents and read through `topology`, a compiled CSR snapshot;
+      - occupancy, i.e. which mobile agents (trucks, tasks) sit at which node,
+        updated with place() and read with occupants() / location_of().
+
+    `graph` is a networkx view of both, rebuilt on demand for visualisation
+    and export; simulation code should use neighbors() and occupants().
+    """
+    def __init__(self, store: Optional[AgentStore] = None, id_allocator: Optional[IdAllocator] = None,
+                 message_pool: Optional[MessagePool] = None, scheduler: Optional[Scheduler] = None):
+        self.agents: Dict[Hashable, Agent] = {}
+        # Agents the scheduler runs (all but passive ones), in insertion order
+        self.active_agents: Dict[Hashable, Agent] = {}
+        # Static adjacency in edge insertion order; compiled into `topology`
+        self._static_adj: Dict[Hashable, Dict[Hashable, float]] = {}
+        self._topology: Optional[Topology] = None
+        # True while _static_adj is shared with a snapshot (copied before mutation)
+        self._static_shared = False
+        self.occupancy = Occupancy()
+        # Bumped on any change that affects the `graph` view
+        self._version = 0
+        self._graph: Optional[nx.Graph] = None
+        self._graph_version = -1
         self.comm_channel = CommunicationChannel()
         self.tick_count = 0
+        # Optional columnar registry; agents become views over its arrays
+        self.store = store
+        # Agents built with agent_id=world.next_id() get IDs from this allocator.
+        # Defaults to the process-wide allocator, which Agent() also uses when no
+        # ID is given, so IDs stay unique across worlds; pass a private
+        # SequentialIdAllocator for dense IDs 0..n-1 in this world.
+        self.id_allocator = id_allocator if id_allocator is not None else default_allocator()
+        # Optional free list that agents draw messages from; recycled each tick
+        self.message_pool = message_pool
+        # Runs perceive/decide; ParallelScheduler spreads it over a pool
+        self.scheduler = scheduler if scheduler is not None else SequentialScheduler()
+        self.listeners: List[WorldListener] = []
+        # Optional TickProfiler (src/core/profiler.py); None keeps tick uninstrumented
+        self.profiler = None
+        # role -> {agent_id: agent}, kept in insertion order
+        self._by_role: Dict[str, Dict[Hashable, Agent]] = {}
+        # Cached query results, dropped when a matching agent is added/removed
+        self._role_views: Dict[str, Tuple[Agent, ...]] = {}
+        self._type_views: Dict[type, Tuple[Agent, ...]] = {}
+        self._routing = None
+        self.scheduler.bind(self)
+
+    def next_id(self) -> Hashable:
+        """
+        Allocate an ID for a new agent in this world.
+        """
+        return self.id_allocator.allocate()
+
+    def set_profiler(self, profiler):
+        """
+        Attach a TickProfiler (or detach with None). Agents already in the
+        world are not replayed to it, so its counters start from zero.
+        """
+        if self.profiler is not None:
+            self.remove_listener(self.profiler)
+        self.profiler = profiler
+        if profiler is not None:
+            self.listeners.append(profiler)
+
+    def add_listener(self, listener: WorldListener):
+        """
+        Register a listener and replay the agents already in the world to it.
+        """
+        self.listeners.append(listener)
+        for agent in self.agents.values():
+            listener.on_agent_added(agent)
+
+    def remove_listener(self, listener: WorldListener):
+        self.listeners.remove(listener)
 
     def add_agent(self, agent: Agent):
         """
         Add an agent to the world.
         """
+        if agent.id in self.agents:
+            raise ValueError(f"Duplicate agent id {agent.id!r}")
         self.agents[agent.id] = agent
-        self.graph.add_node(agent.id, agent=agent)
+        if not agent.passive:
+            self.active_agents[agent.id] = agent
+        self._version += 1
+        self._by_role.setdefault(agent.role, {})[agent.id] = agent
+        self._invalidate_views(agent)
+        if self.store is not None:
+            self.store.attach(agent)
+        if self.message_pool is not None:
+            agent.message_pool = self.message_pool
+        for listener in self.listeners:
+            listener.on_agent_added(agent)
 
-    def remove_agent(self, agent_id: str):
+    def remove_agent(self, agent_id: Hashable):
         """
         Remove an agent from the world.
         """
         if agent_id in self.agents:
-            del self.agents[agent_id]
-            self.graph.remove_node(agent_id)
+            agent = self.agents.pop(agent_id)
+            self.active_agents.pop(agent_id, None)
+            self._version += 1
+            self.occupancy.remove(agent_id)
+            # Anything parked at a removed node is left unplaced
+            for occupant in self.occupancy.at(agent_id):
+                self.unplace(occupant)
+            self._remove_static_node(agent_id)
+            del self._by_role[agent.role][agent_id]
+            self._invalidate_views(agent)
+            if self.store is not None:
+                self.store.detach(agent)
+            if self.message_pool is not None:
+                agent.message_pool = None
+            for listener in self.listeners:
+                listener.on_agent_removed(agent)
+
+    def agents_by_role(self, role: str) -> Tuple[Agent, ...]:
+        """
+        All agents with the given role, in insertion order.
+        The tuple is cached until an agent with that role is added or removed.
+        """
+        view = self._role_views.get(role)
+        if view is None:
+            view = self._role_views[role] = tuple(self._by_role.get(role, {}).values())
+        return view
 
-    def connect_agents(self, agent1_id: str, agent2_id: str, weight: float = 1.0):
+    def agents_of_type(self, cls: Type[Agent]) -> Tuple[Agent, ...]:
         """
-        Create a connection (edge) between two agents.
+        All agents that are instances of `cls`, in insertion order. Cached like agents_by_role.
+        """
+        view = self._type_views.get(cls)
+        if view is None:
+            view = self._type_views[cls] = tuple(a for a in self.agents.values() if isinstance(a, cls))
+        return view
+
+    def count_role(self, role: str) -> int:
+        return len(self._by_role.get(role, ()))
+
+    def _invalidate_views(self, agent: Agent):
+        self._role_views.pop(agent.role, None)
+        if self._type_views:
+            for cls in type(agent).__mro__:
+                self._type_views.pop(cls, None)
+
+    def connect_agents(self, agent1_id: Hashable, agent2_id: Hashable, weight: float = 1.0):
+        """
+        Create a static connection (edge) between two agents, e.g. a road
+        between warehouses. Use place() for trucks and tasks.
         """
         if agent1_id in self.agents and agent2_id in self.agents:
-            self.graph.add_edge(agent1_id, agent2_id, weight=weight)
+            self._add_static_edge(agent1_id, agent2_id, weight)
+            for listener in self.listeners:
+                listener.on_edge_added(agent1_id, agent2_id, weight)
+
+    def disconnect_agents(self, agent1_id: Hashable, agent2_id: Hashable):
+        """
+        Remove the static connection between two agents, if any.
+        """
+        if agent2_id in self._static_adj.get(agent1_id, ()):
+            self._own_static()
+            del self._static_adj[agent1_id][agent2_id]
+            del self._static_adj[agent2_id][agent1_id]
+            self._topology_changed()
+            for listener in self.listeners:
+                listener.on_edge_removed(agent1_id, agent2_id)
+
+    def _own_static(self):
+        if self._static_shared:
+            self._static_adj = {node: dict(nbrs) for node, nbrs in self._static_adj.items()}
+            self._static_shared = False
+
+    def _add_static_edge(self, u: Hashable, v: Hashable, weight: float):
+        self._own_static()
+        self._static_adj.setdefault(u, {})[v] = weight
+        self._static_adj.setdefault(v, {})[u] = weight
+        self._topology_changed()
+
+    def _remove_static_node(self, node: Hashable):
+        if node not in self._static_adj:
+            return
+        self._own_static()
+        nbrs = self._static_adj.pop(node, None)
+        if nbrs is not None:
+            for nbr in nbrs:
+                del self._static_adj[nbr][node]
+            self._topology_changed()
+
+    def _topology_changed(self):
+        self._topology = None
+        self._version += 1
+
+    @property
+    def topology(self) -> Topology:
+        """
+        CSR snapshot of the static network. Never mutated: a new one is
+        compiled on first access after connect/disconnect/remove.
+        """
+        if self._topology is None:
+            self._topology = Topology(self._static_adj)
+        return self._topology
+
+    def neighbors(self, node: Hashable) -> Tuple[Hashable, ...]:
+        """
+        Static neighbours of a node, in edge insertion order.
+        """
+        return self.topology.neighbors(node)
+
+    def place(self, agent_id: Hashable, node: Hashable):
+        """
+        Put a mobile agent at a node of the static network (moving it if it
+        is already placed). Keeps the agent's `location` attribute in sync.
+        """
+        if node not in self.agents and node not in self._static_adj:
+            raise KeyError(f"Unknown node {node!r}")
+        agent = self.agents[agent_id]
+        old = self.occupancy.place(agent_id, node)
+        if old == node:
+            return
+        if hasattr(agent, "location"):
+            agent.location = node
+        self._version += 1
+        for listener in self.listeners:
+            listener.on_agent_moved(agent, old, node)
+
+    def unplace(self, agent_id: Hashable):
+        """
+        Take an agent off the network (it stays in the world).
+        """
+        old = self.occupancy.remove(agent_id)
+        if old is not None:
+            self._version += 1
+            for listener in self.listeners:
+                listener.on_agent_moved(self.agents[agent_id], old, None)
+
+    def occupants(self, node: Hashable) -> Tuple[Hashable, ...]:
+        """
+        IDs of the agents placed at a node, in arrival order.
+        """
+        return self.occupancy.at(node)
+
+    def location_of(self, agent_id: Hashable) -> Optional[Hashable]:
+        return self.occupancy.location.get(agent_id)
+
+    def adjacent(self, agent_id: Hashable) -> Tuple[Hashable, ...]:
+        """
+        Everything an agent is linked to: static neighbours, agents placed at
+        it and the node it is placed at. Default broadcast recipients.
+        """
+        linked = self.topology.neighbors(agent_id) + self.occupancy.at(agent_id)
+        node = self.occupancy.location.get(agent_id)
+        return linked if node is None else linked + (node,)
+
+    @property
+    def graph(self) -> nx.Graph:
+        """
+        networkx view of agents, static edges and occupancy (occupant -- node
+        edges). Built on demand and cached until the world changes; edits to
+        it are not reflected back into the world.
+        """
+        if self._graph is None or self._graph_version != self._version:
+            g = nx.Graph()
+            for agent_id, agent in self.agents.items():
+                g.add_node(agent_id, agent=agent)
+            for node in self._static_adj:
+                if node not in g:
+                    g.add_node(node, ghost=True)
+            for u, v, weight in self.topology.edges():
+                g.add_edge(u, v, weight=weight)
+            for agent_id, node in self.occupancy.location.items():
+                if node in g:
+                    g.add_edge(agent_id, node, weight=1.0)
+            self._graph, self._graph_version = g, self._version
+        return self._graph
+
+    @property
+    def routing(self):
+        """
+        Next-hop routing table over the warehouse network, built on first use
+        and kept up to date as agents and edges change.
+        """
+        if self._routing is None:
+            from src.core.routing import RoutingTable
+            self._routing = RoutingTable(self)
+        return self._routing
+
+    def snapshot(self) -> WorldSnapshot:
+        """
+        Capture agents, occupancy, queued messages, tick and ID allocator
+        state. Policies and the static topology are shared, not copied.
+        """
+        state = {
+            "agents": self.agents,
+            "occupancy": self.occupancy,
+            "comm_channel": self.comm_channel,
+            "tick_count": self.tick_count,
+            # The process-wide default allocator stays shared
+            "id_allocator": None if self.id_allocator is default_allocator() else self.id_allocator,
+            "store": self.store,
+            "message_pool": self.message_pool,
+        }
+        payload, refs = dump_state(state)
+        self._static_shared = True
+        return WorldSnapshot(payload, refs, self._static_adj, self.topology)
+
+    def restore(self, snapshot: WorldSnapshot):
+        """
+        Replace this world's contents with a snapshot's, keeping the
+        scheduler and listeners (which are told via on_world_restored).
+        """
+        state = snapshot.load()
+        self.agents = state["agents"]
+        self.occupancy = state["occupancy"]
+        self.comm_channel = state["comm_channel"]
+        self.tick_count = state["tick_count"]
+        self.id_allocator = state["id_allocator"] if state["id_allocator"] is not None else default_allocator()
+        self.store = state["store"]
+        self.message_pool = state["message_pool"]
+        self._static_adj = snapshot.static_adj
+        self._topology = snapshot.topology
+        self._static_shared = True
+
+        self._by_role = {}
+        for agent_id, agent in self.agents.items():
+            self._by_role.setdefault(agent.role, {})[agent_id] = agent
+        self.active_agents = {agent_id: agent for agent_id, agent in self.agents.items() if not agent.passive}
+        self._role_views = {}
+        self._type_views = {}
+        self._version += 1
+        self._graph = None
+        for listener in list(self.listeners):
+            listener.on_world_restored(self)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: WorldSnapshot, scheduler: Optional[Scheduler] = None) -> "World":
+        world = cls(scheduler=scheduler)
+        world.restore(snapshot)
+        return world
+
+    def fork(self) -> "World":
+        """
+        Independent copy of this world for branching rollouts. It shares
+        policies, the scheduler (unless it keeps per-world state) and, until
+        either side edits it, the topology.
+        """
+        return type(self).from_snapshot(self.snapshot(), scheduler=self.scheduler.fork())
 
     def tick(self):
         """
         Advance the world by one step.
         """
+        delivered = self._begin_tick()
+        # 2. Agent Perception & Decision
+        decisions = self.scheduler.run(self)
+        self._end_tick(decisions, delivered)
+
+    def _begin_tick(self) -> Optional[List[Message]]:
+        """
+        Start a tick: bump the counter and deliver queued messages.
+        Returns the delivered messages when a message pool recycles them.
+        """
         self.tick_count += 1
+        prof = self.profiler
+        if prof is not None:
+            prof.start()
         
-        # 1. Deliver messages
-        messages = self.comm_channel.deliver()
-        for msg in messages:
-            if msg.receiver_id in self.agents:
-                self.agents[msg.receiver_id].receive_message(msg)
+        # 1. Deliver messages (per-receiver queues straight into inboxes)
+        pool = self.message_pool
+        delivered = [] if pool is not None else None
+        dropped = self.comm_channel.dropped
+        routed = self.comm_channel.route(self.agents, delivered)
+        if prof is not None:
+            prof.lap("deliver")
+            prof.count("messages_routed", routed)
+            prof.count("messages_dropped", self.comm_channel.dropped - dropped)
+        return delivered
 
-        # 2. Agent Perception & Decision
-        # Shuffle execution order to prevent bias
-        agent_ids = list(self.agents.keys())
-        random.shuffle(agent_ids)
-
-        actions = {}
-        for agent_id in agent_ids:
-            agent = self.agents[agent_id]
-            # In a real scenario, we'd pass a filtered view of the world state
-            agent.perceive(self) 
-            agent_actions = agent.decide()
-            actions[agent_id] = agent_actions
-            
-            # Collect outgoing messages
-            for msg in agent.get_outbox():
+    def _end_tick(self, decisions: Decisions, delivered: Optional[List[Message]]):
+        """
+        Finish a tick after the decide phase: collect outboxes, act,
+        recycle messages and notify listeners.
+        """
+        prof = self.profiler
+        if prof is not None:
+            prof.lap("decide")
+
+        # Collect outgoing messages in decision order
+        for agent_id, _ in decisions:
+            for msg in self.agents[agent_id].get_outbox():
                 msg.timestamp = self.tick_count
-                self.comm_channel.send(msg)
+                if msg.receiver_id is None:
+                    recipients = msg.recipients
+                    if recipients is None:
+                        recipients = self.adjacent(agent_id)
+                    msg.refs = len(recipients)
+                    self.comm_channel.multicast(msg, recipients)
+                else:
+                    msg.refs = 1
+                    self.comm_channel.send(msg)
+        if prof is not None:
+            prof.lap("collect")
 
         # 3. Resolve Actions (Placeholder)
         # Here we would handle physical interactions, conflicts, etc.
-        for agent_id, agent_actions in actions.items():
+        for agent_id, agent_actions in decisions:
             self.agents[agent_id].act()
+        if prof is not None:
+            prof.lap("act")
+
+        # 4. Recycle messages consumed this tick
+        if delivered:
+            self.message_pool.release_delivered(delivered)
+        if prof is not None:
+            prof.lap("release")
+
+        for listener in self.listeners:
+            listener.on_tick_end(self)
+        if prof is not None:
+            prof.lap("listeners")
 
     def get_state(self):
         """
         Return a summary of the world state.
         """
-        return {
+        state = {
             "tick": self.tick_count,
             "agent_count": len(self.agents),
-            "edges": self.graph.number_of_edges()
+            "edges": self.topology.num_edges + len(self.occupancy)
         }
+        if self.profiler is not None:
+            state["profile"] = self.profiler.summary()
+        return state
@@ -0,0 +1,237 @@
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, NamedTuple, Optional
+
+import numpy as np
+import torch
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+
+from src.learning.rl_policy import RLPolicy
+from src.learning.rollout import RolloutBuffer
+
+
+class RolloutInfo(NamedTuple):
+    worker: int
+    policy_version: int
+    episode_reward: float
+    steps: int
+
+
+class SharedWeights:
+    """
+    Policy parameters in one shared-memory float32 vector, plus a version
+    counter. The learner publishes under a lock; actors copy in when the
+    version has moved on since their last sync.
+    """
+    def __init__(self, ctx, num_params: int):
+        self.shm = shared_memory.SharedMemory(create=True, size=num_params * 4)
+        self.num_params = num_params
+        self.version = ctx.Value("q", 0, lock=False)
+        self.lock = ctx.Lock()
+
+    def vector(self) -> np.ndarray:
+        return np.ndarray((self.num_params,), dtype=np.float32, buffer=self.shm.buf)
+
+    def publish(self, policy: RLPolicy):
+        flat = parameters_to_vector(policy.parameters()).detach().numpy()
+        with self.lock:
+            self.vector()[:] = flat
+            self.version.value += 1
+
+    def sync(self, policy: RLPolicy, seen_version: int) -> int:
+        """
+        Load the latest weights into `policy` if newer than seen_version.
+        Returns the version now loaded.
+        """
+        if self.version.value == seen_version:
+            return seen_version
+        with self.lock:
+            version = self.version.value
+            flat = torch.from_numpy(self.vector().copy())
+        vector_to_parameters(flat, policy.parameters())
+        return version
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["shm"] = self.shm.name
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.shm = shared_memory.SharedMemory(name=state["shm"])
+
+
+def _actor_worker(worker: int, env_fn: Callable[[], Any], policy_fn: Callable[[], RLPolicy],
+                  weights: SharedWeights, slot_names: List[str], free_slots, full_slots, stop,
+                  num_steps: int, num_agents: int, seed: int):
+    """
+    Actor loop: wait for a free slot, sync weights, play one episode into the
+    slot's shared RolloutBuffer, and hand the slot to the learner.
+    If anything fails, the traceback is sent to the learner as slot -1.
+    """
+    # One intra-op thread per actor so N actors use N cores
+    torch.set_num_threads(1)
+    torch.manual_seed(seed + worker)
+    blocks = []
+    failed = False
+    try:
+        env = env_fn()
+        if env.num_trucks != num_agents:
+            raise ValueError(f"env has {env.num_trucks} trucks, ActorPool expects {num_agents}")
+        policy = policy_fn()
+        policy.eval()
+        version = -1
+        blocks = [shared_memory.SharedMemory(name=name) for name in slot_names]
+        buffers = [RolloutBuffer(num_steps, num_agents, policy.network[0].in_features, storage=b.buf)
+                   for b in blocks]
+
+        obs, _ = env.reset(seed=seed + worker)
+        while not stop.is_set():
+            try:
+                slot = free_slots.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            version = weights.sync(policy, version)
+            buffer = buffers[slot]
+            buffer.reset()
+            episode_reward = 0.0
+            done = False
+            while not done and not buffer.full:
+                state_dict = {'vector': obs}
+                actions = [a[0] for a in policy.decide_batch([state_dict] * env.num_trucks, None)]
+                next_obs, reward, terminated, truncated, _ = env.step(actions)
+                done = terminated or truncated
+                buffer.add(obs, actions, reward, done)
+                episode_reward += reward
+                obs = next_obs
+            if done:
+                obs, _ = env.reset()
+            full_slots.put((worker, slot, RolloutInfo(worker, version, episode_reward, buffer.step)))
+    except BaseException:
+        failed = True
+        full_slots.put((worker, -1, traceback.format_exc()))
+        raise
+    finally:
+        # Don't block exit on rollouts the learner will never read (but do
+        # deliver an error report)
+        if not failed:
+            full_slots.cancel_join_thread()
+        buffer = buffers = None
+        for block in blocks:
+            block.close()
+
+
+class ActorPool:
+    """
+    Actor/learner experience collection for train_rl.
+
+    Each of `num_workers` processes runs its own env (from `env_fn`) with a
+    local copy of the policy (from `policy_fn`) and fills RolloutBuffers laid
+    out in shared memory, `slots_per_worker` per actor so it can keep
+    playing while the learner reads the previous one. The learner (the
+    calling process) takes rollouts with next_rollout() and pushes new
+    weights with publish(); actors pick them up before their next episode,
+    so a rollout may lag the learner by a version (RolloutInfo records which
+    one produced it).
+
+    env_fn and policy_fn must be picklable (e.g. functools.partial of a
+    class) and the env must expose num_trucks like LogisticsEnv, equal to
+    `num_agents`. Actors start from the weights of `policy` (the
+    learner's) if given. If an actor fails or dies, next_rollout() raises
+    RuntimeError with its traceback or exit code.
+    """
+    def __init__(self, env_fn: Callable[[], Any], policy_fn: Callable[[], RLPolicy], num_agents: int,
+                 num_workers: int = 2, num_steps: int = 200, slots_per_worker: int = 2, seed: int = 0,
+                 policy: Optional[RLPolicy] = None, context: Optional[str] = None):
+        ctx = mp.get_context(context)
+        policy = policy if policy is not None else policy_fn()
+        self.num_agents = num_agents
+        self.obs_dim = policy.network[0].in_features
+        self.num_steps = num_steps
+
+        self.weights = SharedWeights(ctx, sum(p.numel() for p in policy.parameters()))
+        self.weights.publish(policy)
+        size = RolloutBuffer.nbytes(num_steps, self.num_agents, self.obs_dim)
+        self._blocks: List[List[shared_memory.SharedMemory]] = []
+        self._buffers: List[List[RolloutBuffer]] = []
+        self._free = []
+        self._full = ctx.Queue()
+        self._stop = ctx.Event()
+        self._procs = []
+        for worker in range(num_workers):
+            blocks = [shared_memory.SharedMemory(create=True, size=size) for _ in range(slots_per_worker)]
+            self._blocks.append(blocks)
+            self._buffers.append([RolloutBuffer(num_steps, self.num_agents, self.obs_dim, storage=b.buf)
+                                  for b in blocks])
+            free = ctx.Queue()
+            for slot in range(slots_per_worker):
+                free.put(slot)
+            self._free.append(free)
+            proc = ctx.Process(target=_actor_worker, daemon=True,
+                               args=(worker, env_fn, policy_fn, self.weights, [b.name for b in blocks],
+                                     free, self._full, self._stop, num_steps, num_agents, seed))
+            proc.start()
+            self._procs.append(proc)
+
+    def next_rollout(self, out: RolloutBuffer, timeout: Optional[float] = None) -> RolloutInfo:
+        """
+        Copy the next finished rollout into `out` and recycle its slot.
+        Raises queue.Empty after `timeout` seconds without one, and
+        RuntimeError if an actor failed or died.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        dead_since = None
+        while True:
+            try:
+                worker, slot, info = self._full.get(timeout=0.1)
+                break
+            except queue.Empty:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    raise
+                dead = [w for w, proc in enumerate(self._procs) if proc.exitcode is not None]
+                if not dead:
+                    continue
+                # Give a dead actor's error report a moment to arrive
+                dead_since = dead_since if dead_since is not None else now
+                if now - dead_since > 1.0:
+                    raise RuntimeError(f"Actor {dead[0]} exited with code {self._procs[dead[0]].exitcode}")
+        if slot < 0:
+            raise RuntimeError(f"Actor {worker} failed:\n{info}")
+        shared = self._buffers[worker][slot]
+        # The step counter lives in the actor process; the length comes with the message
+        shared.step = info.steps
+        out.copy_from(shared)
+        self._free[worker].put(slot)
+        return info
+
+    def publish(self, policy: RLPolicy) -> int:
+        """
+        Broadcast the learner's weights; returns the new version.
+        """
+        self.weights.publish(policy)
+        return self.weights.version.value
+
+    def close(self):
+        self._stop.set()
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self._buffers = []
+        for blocks in self._blocks:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        self._blocks = []
+        self.weights.shm.close()
+        self.weights.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Sequence
 import random
 
+from src.core.rng import current_rng
+
 class Policy(ABC):
+    # True while decide() keeps per-decision training data (see merge_records)
+    records_decisions = False
+
     @abstractmethod
     def decide(self, agent_state: Dict[str, Any], world_view: Any) -> List[Any]:
         """
@@ -10,12 +15,26 @@ class Policy(ABC):
         """
         pass
 
+    def decide_batch(self, agent_states: Sequence[Dict[str, Any]], world_view: Any) -> List[List[Any]]:
+        """
+        Decide for several agents at once; one action list per state.
+        Policies with a vectorized forward pass (e.g. RLPolicy) override this.
+        """
+        return [self.decide(state, world_view) for state in agent_states]
+
     def update(self, reward: float, done: bool):
         """
         Update the policy based on feedback (for RL).
         """
         pass
 
+    def merge_records(self, records: List[Any]):
+        """
+        Take the per-decision data this policy recorded through
+        ShardRNG.record during a parallel decide phase, in decision order.
+        """
+        pass
+
 class RandomPolicy(Policy):
     def __init__(self, action_space: List[Any]):
         self.action_space = action_space
@@ -23,7 +42,8 @@ class RandomPolicy(Policy):
     def decide(self, agent_state: Dict[str, Any], world_view: Any) -> List[Any]:
         if not self.action_space:
             return []
-        return [random.choice(self.action_space)]
+        rng = current_rng()
+        return [(rng.random if rng is not None else random).choice(self.action_space)]
 
 class RuleBasedPolicy(Policy):
     def __init__(self, rules: callable):
@@ -1,7 +1,9 @@
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Sequence, Tuple
+from src.core.rng import current_rng
 from src.learning.policy import Policy
 
 class RLPolicy(Policy, nn.Module):
@@ -22,22 +24,72 @@ class RLPolicy(Policy, nn.Module):
         self.rewards = []
 
     def decide(self, agent_state: Dict[str, Any], world_view: Any) -> List[Any]:
-        # Convert state to tensor
+        return self.decide_batch([agent_state], world_view)[0]
+
+    def decide_batch(self, agent_states: Sequence[Dict[str, Any]], world_view: Any) -> List[List[Any]]:
+        """
+        One forward pass for every state that has a 'vector' entry.
+
+        In training mode the log-probs of the sampled actions are appended to
+        saved_log_probs (one per agent, in order) for the policy-gradient
+        update. After eval() the pass runs under torch.inference_mode and
+        nothing is recorded.
+        """
         # NOTE: This assumes agent_state contains a 'vector' key or similar that is already numerical
         # In a real app, we'd need a preprocessing step here.
-        if 'vector' not in agent_state:
-            return []
-            
-        state_tensor = torch.FloatTensor(agent_state['vector'])
-        probs = self.network(state_tensor)
-        
-        # Sample action
+        rows = [i for i, state in enumerate(agent_states) if 'vector' in state]
+        results: List[List[Any]] = [[] for _ in agent_states]
+        if not rows:
+            return results
+
+        batch = torch.from_numpy(np.stack([np.asarray(agent_states[i]['vector'], dtype=np.float32) for i in rows]))
+        if self.training:
+            actions = self._sample(batch)
+        else:
+            with torch.inference_mode():
+                actions = self._sample(batch)
+        for i, action in zip(rows, actions.tolist()):
+            results[i] = [action]
+        return results
+
+    @property
+    def records_decisions(self) -> bool:
+        return self.training
+
+    def _sample(self, batch: torch.Tensor) -> torch.Tensor:
+        probs = self.network(batch)
         m = torch.distributions.Categorical(probs)
-        action = m.sample()
-        
-        self.saved_log_probs.append(m.log_prob(action))
-        
-        return [action.item()]
+        # Under ParallelScheduler, sample and record per shard
+        rng = current_rng()
+        if rng is None:
+            actions = m.sample()
+        else:
+            actions = torch.multinomial(probs, 1, True, generator=rng.torch).squeeze(-1)
+        if self.training:
+            log_probs = m.log_prob(actions).unbind()
+            if rng is None:
+                self.saved_log_probs.extend(log_probs)
+            else:
+                rng.record(self, log_probs)
+        return actions
+
+    def merge_records(self, records: List[Any]):
+        self.saved_log_probs.extend(records)
+
+    def __getstate__(self):
+        # Saved log-probs carry autograd graphs, which cannot cross process
+        # boundaries; pickled copies start without them
+        state = self.__dict__.copy()
+        state["saved_log_probs"] = []
+        return state
+
+    def evaluate_actions(self, obs: torch.Tensor, actions: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Log-probs and entropies of `actions` under the current weights, in one
+        forward pass over a (B, input_dim) batch (e.g. RolloutBuffer.tensors()).
+        """
+        m = torch.distributions.Categorical(self.network(obs))
+        return m.log_prob(actions), m.entropy()
 
     def update(self, reward: float, done: bool):
         self.rewards.append(reward)
@@ -0,0 +1,143 @@
+import numpy as np
+import torch
+from typing import Dict, List, Optional, Tuple, Union
+
+ArrayLike = Union[np.ndarray, float, int, bool]
+
+
+class RolloutBuffer:
+    """
+    Fixed-size store of T x N transitions (T steps, N agents) for
+    REINFORCE/PPO updates.
+
+    Observations, actions, rewards, dones and (optional) value estimates
+    live in preallocated arrays, so add() is a handful of slice writes.
+    Returns and GAE advantages are computed per agent column with one
+    vectorized backward pass over time; a done at step t stops
+    bootstrapping from t + 1 in that column only.
+
+    Pass `storage` (any writable buffer of at least nbytes(...) bytes, e.g.
+    a SharedMemory block) to lay the arrays out in it instead of allocating.
+    """
+    def __init__(self, num_steps: int, num_agents: int, obs_dim: int,
+                 gamma: float = 0.99, gae_lambda: float = 0.95, storage=None):
+        self.num_steps = num_steps
+        self.num_agents = num_agents
+        self.obs_dim = obs_dim
+        self.gamma = gamma
+        self.gae_lambda = gae_lambda
+
+        offset = 0
+        for name, shape, dtype in self.layout(num_steps, num_agents, obs_dim):
+            if storage is None:
+                array = np.zeros(shape, dtype=dtype)
+            else:
+                array = np.ndarray(shape, dtype=dtype, buffer=storage, offset=offset)
+                offset += array.nbytes
+            setattr(self, name, array)
+        self.step = 0
+
+    @staticmethod
+    def layout(num_steps: int, num_agents: int, obs_dim: int) -> List[Tuple[str, tuple, type]]:
+        shape = (num_steps, num_agents)
+        # Widest dtypes first keeps every array aligned inside shared storage
+        return [
+            ("actions", shape, np.int64),
+            ("obs", shape + (obs_dim,), np.float32),
+            ("rewards", shape, np.float32),
+            ("values", shape, np.float32),
+            ("returns", shape, np.float32),
+            ("advantages", shape, np.float32),
+            ("dones", shape, np.bool_),
+        ]
+
+    @classmethod
+    def nbytes(cls, num_steps: int, num_agents: int, obs_dim: int) -> int:
+        return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize
+                   for _, shape, dtype in cls.layout(num_steps, num_agents, obs_dim))
+
+    def __len__(self):
+        return self.step
+
+    @property
+    def full(self) -> bool:
+        return self.step >= self.num_steps
+
+    def reset(self):
+        """
+        Start a new rollout. Arrays are reused, not reallocated.
+        """
+        self.step = 0
+
+    def copy_from(self, other: "RolloutBuffer"):
+        """
+        Copy the filled steps of another buffer of the same shape.
+        """
+        T = other.step
+        for name, _, _ in self.layout(self.num_steps, self.num_agents, self.obs_dim):
+            getattr(self, name)[:T] = getattr(other, name)[:T]
+        self.step = T
+
+    def add(self, obs: ArrayLike, actions: ArrayLike, rewards: ArrayLike, dones: ArrayLike,
+            values: Optional[ArrayLike] = None):
+        """
+        Record one step for all agents. Each argument is either per-agent
+        (leading dimension N) or shared and broadcast, e.g. a global
+        observation of shape (obs_dim,) or a scalar team reward.
+        """
+        if self.full:
+            raise IndexError(f"RolloutBuffer is full ({self.num_steps} steps)")
+        t = self.step
+        self.obs[t] = obs
+        self.actions[t] = actions
+        self.rewards[t] = rewards
+        self.dones[t] = dones
+        self.values[t] = 0.0 if values is None else values
+        self.step += 1
+
+    def compute_returns(self, last_values: ArrayLike = 0.0) -> np.ndarray:
+        """
+        Discounted returns G_t = r_t + gamma * G_{t+1} per agent, bootstrapped
+        from `last_values` after the final step unless it was done.
+        """
+        T = self.step
+        running = np.broadcast_to(np.asarray(last_values, dtype=np.float32), (self.num_agents,)).copy()
+        for t in range(T - 1, -1, -1):
+            running *= self.gamma * ~self.dones[t]
+            running += self.rewards[t]
+            self.returns[t] = running
+        return self.returns[:T]
+
+    def compute_gae(self, last_values: ArrayLike = 0.0) -> np.ndarray:
+        """
+        Generalized advantage estimates from the stored values; also fills
+        `returns` with advantages + values (the value-function targets).
+        """
+        T = self.step
+        next_values = np.broadcast_to(np.asarray(last_values, dtype=np.float32), (self.num_agents,))
+        running = np.zeros(self.num_agents, dtype=np.float32)
+        for t in range(T - 1, -1, -1):
+            not_done = ~self.dones[t]
+            delta = self.rewards[t] + self.gamma * next_values * not_done - self.values[t]
+            running = delta + self.gamma * self.gae_lambda * not_done * running
+            self.advantages[t] = running
+            next_values = self.values[t]
+        self.returns[:T] = self.advantages[:T] + self.values[:T]
+        return self.advantages[:T]
+
+    def tensors(self) -> Dict[str, torch.Tensor]:
+        """
+        The filled part of the buffer flattened to (T * N, ...) tensors that
+        share memory with the arrays, for a single batched update.
+        """
+        T = self.step
+        flat = lambda a: torch.from_numpy(a[:T].reshape((T * self.num_agents,) + a.shape[2:]))
+        return {
+            "obs": flat(self.obs),
+            "actions": flat(self.actions),
+            "rewards": flat(self.rewards),
+            "dones": flat(self.dones),
+            "values": flat(self.values),
+            "returns": flat(self.returns),
+            "advantages": flat(self.advantages),
+        }
@@ -2,14 +2,25 @@ import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
 from src.core.world import World
+from src.core.store import AgentStore
+from src.core.ids import SequentialIdAllocator
+from src.simulation.observation import ObservationEncoder
 from src.agents.physical import TruckAgent, WarehouseAgent
 from src.agents.abstract import TaskAgent
 
 class LogisticsEnv(gym.Env):
-    def __init__(self, num_trucks: int = 4, num_warehouses: int = 8):
+    def __init__(self, num_trucks: int = 4, num_warehouses: int = 8, columnar: bool = False,
+                 copy_obs: bool = True):
         self.num_trucks = num_trucks
         self.num_warehouses = num_warehouses
-        self.world = World()
+        self.columnar = columnar
+        # copy_obs=False returns the encoder's buffer itself (overwritten next step)
+        self.copy_obs = copy_obs
+        self.world = self._make_world()
+        # Warehouses, roads and (unplaced) trucks are identical every episode:
+        # build them once and restore this snapshot on reset
+        self._build_network()
+        self._skeleton = self.world.snapshot()
         # Action space: 5 actions per truck. MultiDiscrete? 
         # For simplicity in this custom loop, we'll just expect a list of ints.
         self.action_space = spaces.MultiDiscrete([5] * num_trucks) 
@@ -20,55 +31,61 @@ class LogisticsEnv(gym.Env):
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        self.world = World()
-        
+        self.world.restore(self._skeleton)
+        warehouses = self.world.agents_by_role("warehouse")
+            
+        # Place Trucks
+        # Draw every start position in one call so the stream matches VecLogisticsEnv
+        starts = self.np_random.integers(len(warehouses), size=self.num_trucks)
+        for i, t in enumerate(self.world.agents_by_role("truck")):
+            # Start at random warehouse
+            self.world.place(t.id, warehouses[starts[i]].id)
+            
+        return self._get_obs(), {}
+
+    def _build_network(self):
         # Create Warehouses
         warehouses = []
         for i in range(self.num_warehouses):
-            w = WarehouseAgent()
+            w = WarehouseAgent(agent_id=self.world.next_id())
             self.world.add_agent(w)
             warehouses.append(w)
             
         # Connect Warehouses (Simple Cycle + Random shortcuts)
         for i in range(len(warehouses)):
             self.world.connect_agents(warehouses[i].id, warehouses[(i+1)%len(warehouses)].id)
-            
-        # Create Trucks
+
+        # Create Trucks (placed at random warehouses on reset)
         for i in range(self.num_trucks):
-            t = TruckAgent()
-            # Start at random warehouse
-            start_w = np.random.choice(warehouses)
-            t.location = start_w.id
-            self.world.add_agent(t)
-            self.world.connect_agents(t.id, start_w.id)
-            
-        return self._get_obs(), {}
+            self.world.add_agent(TruckAgent(agent_id=self.world.next_id()))
+
+    def _make_world(self) -> World:
+        # Per-world dense IDs: warehouses get 0..W-1, trucks W..W+T-1
+        world = World(store=AgentStore() if self.columnar else None, id_allocator=SequentialIdAllocator())
+        self._encoder = ObservationEncoder(world, self.num_trucks, self.num_warehouses)
+        return world
 
     def step(self, actions):
         # Reward: -0.01 per tick (fuel)
         reward = -0.01
+        prof = self.world.profiler
+        if prof is not None:
+            prof.start()
+        pickups = deliveries = 0
 
         # actions: List of integers, one per TruckAgent
-        trucks = [a for a in self.world.agents.values() if a.role == "truck"]
+        trucks = self.world.agents_by_role("truck")
         
         # Apply actions
         for i, truck in enumerate(trucks):
             if i < len(actions):
                 action = actions[i]
                 if action > 0:
-                    neighbors = list(self.world.graph.neighbors(truck.location))
+                    # Only the static warehouse network: trucks and tasks are occupants, not neighbours
+                    neighbors = self.world.neighbors(truck.location)
                     if neighbors and (action - 1) < len(neighbors):
-                        # Move truck
-                        # Disconnect from old
-                        old_loc = truck.location
-                        truck.location = neighbors[action - 1]
-                        # Update graph connections (remove old edge, add new edge)
-                        # In this simplified model, we assume truck is "at" a node.
-                        # We might not need to strictly remove/add edges if we just track location property,
-                        # but for graph vis it helps.
-                        if self.world.graph.has_edge(truck.id, old_loc):
-                            self.world.graph.remove_edge(truck.id, old_loc)
-                        self.world.connect_agents(truck.id, truck.location)
+                        # Move truck (updates truck.location and the occupancy index)
+                        self.world.place(truck.id, neighbors[action - 1])
                         
                         # Pickup Logic
                         # If truck is at a warehouse and warehouse has tasks, pick one up
@@ -80,6 +97,8 @@ class LogisticsEnv(gym.Env):
                             if warehouse and warehouse.role == "warehouse" and warehouse.inventory:
                                 task_id = warehouse.inventory.pop(0)
                                 truck.cargo.append(task_id)
+                                self._encoder.mark_dirty(warehouse)
+                                pickups += 1
                                 # Also move task agent to truck location (conceptually)
                                 # In graph, maybe connect task to truck?
                                 # For now, just tracking ID is enough for logic.
@@ -98,18 +117,31 @@ class LogisticsEnv(gym.Env):
                                 # Remove task agent from world? Or mark completed?
                                 self.world.remove_agent(task_id)
                                 reward += 10.0 # Big reward for delivery
-        if np.random.random() < 0.1:
-            warehouses = [a for a in self.world.agents.values() if a.role == "warehouse"]
+                                deliveries += 1
+        if prof is not None:
+            prof.lap("env.actions")
+            prof.count("env.pickups", pickups)
+            prof.count("env.deliveries", deliveries)
+
+        if self.np_random.random() < 0.1:
+            warehouses = self.world.agents_by_role("warehouse")
             if len(warehouses) >= 2:
-                origin, dest = np.random.choice(warehouses, 2, replace=False)
-                task = TaskAgent(origin=origin.id, destination=dest.id)
+                i, j = self.np_random.choice(len(warehouses), 2, replace=False)
+                origin, dest = warehouses[i], warehouses[j]
+                task = TaskAgent(origin=origin.id, destination=dest.id, agent_id=self.world.next_id())
                 origin.inventory.append(task.id)
+                self._encoder.mark_dirty(origin)
                 self.world.add_agent(task)
-                self.world.connect_agents(task.id, origin.id)
+                self.world.place(task.id, origin.id)
+        if prof is not None:
+            prof.lap("env.spawn")
 
+        # Times its own phases and restarts the profiler's lap clock
         self.world.tick()
         
         obs = self._get_obs()
+        if prof is not None:
+            prof.lap("env.obs")
         
         
         terminated = False
@@ -117,30 +149,14 @@ class LogisticsEnv(gym.Env):
         if self.world.tick_count >= 200:
             truncated = True
             
-        info = {}
+        info = {"pickups": pickups, "deliveries": deliveries}
         
         return obs, reward, terminated, truncated, info
 
     def _get_obs(self):
-        # 2 features per truck + 1 feature per warehouse
-        obs = []
-        
-        trucks = [a for a in self.world.agents.values() if a.role == "truck"]
-        # Sort by ID to ensure consistency? Or just iteration order (which might vary)
-        # Better to sort.
-        trucks.sort(key=lambda x: x.id)
-        
-        for truck in trucks:
-            obs.append(1.0 if truck.cargo else 0.0)
-            obs.append(hash(truck.location) % 100 / 100.0)
-            
-        warehouses = [a for a in self.world.agents.values() if a.role == "warehouse"]
-        warehouses.sort(key=lambda x: x.id)
-        
-        for w in warehouses:
-            obs.append(len(w.inventory))
-            
-        return np.array(obs, dtype=np.float32)
+        # 2 features per truck + 1 feature per warehouse, trucks/warehouses sorted by ID.
+        # The encoder only rewrites agents marked dirty since the last call.
+        return self._encoder.encode(copy=self.copy_obs)
 
     def render(self):
         print(f"Tick: {self.world.tick_count}, Agents: {len(self.world.agents)}")
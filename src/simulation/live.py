@@ -0,0 +1,281 @@
+import multiprocessing as mp
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Published metrics, in slot order
+METRICS = ("reward", "episode_reward", "deliveries", "agents", "steps_per_sec")
+
+# Header slots
+_SEQ, _TICK, _EPISODE, _STEPS, _NUM_TRUCKS, _PUBLISHED, _STATUS = range(7)
+_HEADER = 8
+RUNNING, FINISHED = 1, 2
+
+
+class LiveFrame(NamedTuple):
+    """
+    One published snapshot. Per-warehouse arrays are indexed like the
+    warehouses of the env (agents_by_role order); truck arrays hold a
+    strided sample of at most `max_trucks` trucks.
+    """
+    tick: int
+    episode: int
+    steps: int
+    finished: bool
+    metrics: Dict[str, float]
+    inventory: np.ndarray
+    trucks_at: np.ndarray
+    loaded_at: np.ndarray
+    truck_location: np.ndarray
+    truck_loaded: np.ndarray
+
+
+class LiveBuffer:
+    """
+    Shared-memory block a simulation process publishes into and any number
+    of viewers read from.
+
+    Writes are guarded by a sequence counter (odd while a write is in
+    progress): readers copy the arrays and retry if the counter moved, so
+    neither side ever waits for the other. The warehouse edge list is
+    written once and never changes.
+    """
+    def __init__(self, num_warehouses: int, num_edges: int, max_trucks: int, storage):
+        self.num_warehouses = num_warehouses
+        self.num_edges = num_edges
+        self.max_trucks = max_trucks
+        offset = 0
+        for name, shape, dtype in self.layout(num_warehouses, num_edges, max_trucks):
+            array = np.ndarray(shape, dtype=dtype, buffer=storage, offset=offset)
+            offset += array.nbytes
+            setattr(self, name, array)
+
+    @staticmethod
+    def layout(num_warehouses: int, num_edges: int, max_trucks: int) -> List[Tuple[str, tuple, type]]:
+        # Widest dtypes first keeps every array aligned inside shared storage
+        return [
+            ("header", (_HEADER,), np.int64),
+            ("metrics", (len(METRICS),), np.float64),
+            ("edges", (num_edges, 2), np.int32),
+            ("inventory", (num_warehouses,), np.int32),
+            ("trucks_at", (num_warehouses,), np.int32),
+            ("loaded_at", (num_warehouses,), np.int32),
+            ("truck_location", (max_trucks,), np.int32),
+            ("truck_loaded", (max_trucks,), np.bool_),
+        ]
+
+    @classmethod
+    def nbytes(cls, num_warehouses: int, num_edges: int, max_trucks: int) -> int:
+        return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize
+                   for _, shape, dtype in cls.layout(num_warehouses, num_edges, max_trucks))
+
+    def read(self, retries: int = 100) -> Optional[LiveFrame]:
+        """
+        Copy a consistent snapshot, or None if nothing was published yet
+        (or every attempt overlapped a write).
+        """
+        header = self.header
+        for _ in range(retries):
+            seq = int(header[_SEQ])
+            if seq == 0:
+                return None
+            if seq & 1:
+                continue
+            n = int(header[_NUM_TRUCKS])
+            frame = LiveFrame(
+                tick=int(header[_TICK]),
+                episode=int(header[_EPISODE]),
+                steps=int(header[_STEPS]),
+                finished=int(header[_STATUS]) == FINISHED,
+                metrics=dict(zip(METRICS, self.metrics.tolist())),
+                inventory=self.inventory.copy(),
+                trucks_at=self.trucks_at.copy(),
+                loaded_at=self.loaded_at.copy(),
+                truck_location=self.truck_location[:n].copy(),
+                truck_loaded=self.truck_loaded[:n].copy(),
+            )
+            if int(header[_SEQ]) == seq:
+                return frame
+        return None
+
+    def begin_write(self):
+        self.header[_SEQ] += 1
+
+    def end_write(self):
+        self.header[_PUBLISHED] += 1
+        self.header[_SEQ] += 1
+
+
+def _network(env) -> Tuple[List[Any], np.ndarray]:
+    """
+    Warehouses of an env and its warehouse-to-warehouse edges as index pairs.
+    """
+    warehouses = [w.id for w in env.world.agents_by_role("warehouse")]
+    index = {w: i for i, w in enumerate(warehouses)}
+    edges = [(index[u], index[v]) for u, v, _ in env.world.topology.edges() if u in index and v in index]
+    return warehouses, np.array(edges, dtype=np.int32).reshape(-1, 2)
+
+
+def _simulate(env_fn: Callable[[], Any], shm_name: str, num_edges: int, max_trucks: int, stop,
+              publish_interval: float, max_steps: Optional[int], seed: int):
+    """
+    Simulation loop: step the env with random actions as fast as it goes and
+    publish a downsampled snapshot at most every `publish_interval` seconds.
+    """
+    block = shared_memory.SharedMemory(name=shm_name)
+    env = env_fn()
+    warehouses, _ = _network(env)
+    index = {w: i for i, w in enumerate(warehouses)}
+    live = LiveBuffer(len(warehouses), num_edges, max_trucks, block.buf)
+    rng = np.random.default_rng(seed)
+    nvec = env.action_space.nvec
+    env.reset(seed=seed)
+
+    episode = steps = deliveries = 0
+    episode_reward = reward = 0.0
+    last_publish = last_steps_time = time.perf_counter()
+    last_steps = 0
+    try:
+        while not stop.is_set() and (max_steps is None or steps < max_steps):
+            _, reward, terminated, truncated, info = env.step(rng.integers(nvec).tolist())
+            steps += 1
+            episode_reward += reward
+            deliveries += info["deliveries"]
+            now = time.perf_counter()
+            if now - last_publish >= publish_interval:
+                rate = (steps - last_steps) / (now - last_steps_time)
+                last_steps, last_steps_time = steps, now
+                _publish(live, env, index, episode, steps, RUNNING,
+                         (reward, episode_reward, deliveries, len(env.world.agents), rate))
+                last_publish = now
+            if terminated or truncated:
+                env.reset()
+                episode += 1
+                episode_reward = 0.0
+        _publish(live, env, index, episode, steps, FINISHED,
+                 (reward, episode_reward, deliveries, len(env.world.agents), 0.0))
+    finally:
+        live = None
+        block.close()
+
+
+def _publish(live: LiveBuffer, env, index: Dict[Any, int], episode: int, steps: int, status: int,
+             metrics: Tuple[float, ...]):
+    world = env.world
+    trucks = world.agents_by_role("truck")
+    stride = max(1, -(-len(trucks) // live.max_trucks))
+    sample = trucks[::stride]
+    inventory = [len(world.agents[w].inventory) for w in index]
+    location = np.array([index.get(t.location, -1) for t in trucks], dtype=np.int64)
+    loaded = np.array([bool(t.cargo) for t in trucks], dtype=bool)
+    placed = location >= 0
+    W = live.num_warehouses
+
+    live.begin_write()
+    header = live.header
+    header[_TICK] = world.tick_count
+    header[_EPISODE] = episode
+    header[_STEPS] = steps
+    header[_STATUS] = status
+    header[_NUM_TRUCKS] = len(sample)
+    live.metrics[:] = metrics
+    live.inventory[:] = inventory
+    live.trucks_at[:] = np.bincount(location[placed], minlength=W)
+    live.loaded_at[:] = np.bincount(location[placed & loaded], minlength=W)
+    live.truck_location[:len(sample)] = location[::stride]
+    live.truck_loaded[:len(sample)] = loaded[::stride]
+    live.end_write()
+
+
+class LiveSimulation:
+    """
+    Runs a LogisticsEnv-style env (from `env_fn`, picklable) with random
+    actions in a separate process and publishes its state through a
+    LiveBuffer in shared memory, so viewers never slow it down.
+
+    The simulation publishes at most every `publish_interval` seconds,
+    whatever the viewers do. Snapshots are downsampled: per-warehouse
+    inventory, truck counts and loaded-truck counts, plus a strided sample
+    of at most `max_trucks` individual trucks. Viewers call read() (or
+    attach a LiveView to `name` from another process) at their own rate.
+
+    The process created the block, so it owns it: stop() ends the
+    simulation and frees the memory. It stops by itself after `max_steps`
+    steps if given.
+    """
+    def __init__(self, env_fn: Callable[[], Any], publish_interval: float = 0.1, max_trucks: int = 1024,
+                 max_steps: Optional[int] = None, seed: int = 0, context: Optional[str] = None):
+        ctx = mp.get_context(context)
+        warehouses, edges = _network(env_fn())
+        self.num_warehouses = len(warehouses)
+        self.edges = edges
+        self.max_trucks = max_trucks
+        size = LiveBuffer.nbytes(self.num_warehouses, len(edges), max_trucks)
+        self._block = shared_memory.SharedMemory(create=True, size=size)
+        self._block.buf[:size] = bytes(size)
+        self.buffer = LiveBuffer(self.num_warehouses, len(edges), max_trucks, self._block.buf)
+        self.buffer.edges[:] = edges
+        self._stop = ctx.Event()
+        self._proc = ctx.Process(target=_simulate, daemon=True,
+                                 args=(env_fn, self._block.name, len(edges), max_trucks, self._stop,
+                                       publish_interval, max_steps, seed))
+        self._proc.start()
+
+    @property
+    def name(self) -> str:
+        return self._block.name
+
+    @property
+    def spec(self) -> Dict[str, int]:
+        """
+        What a LiveView in another process needs to attach.
+        """
+        return {"name": self.name, "num_warehouses": self.num_warehouses, "num_edges": len(self.edges),
+                "max_trucks": self.max_trucks}
+
+    def is_alive(self) -> bool:
+        return self._proc.is_alive()
+
+    def read(self) -> Optional[LiveFrame]:
+        return self.buffer.read()
+
+    def stop(self):
+        if self._block is None:
+            return
+        self._stop.set()
+        self._proc.join(timeout=5)
+        if self._proc.is_alive():
+            self._proc.terminate()
+        self.buffer = None
+        self._block.close()
+        self._block.unlink()
+        self._block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class LiveView:
+    """
+    Read-only attachment to a running LiveSimulation from another process,
+    given its `spec`.
+    """
+    def __init__(self, name: str, num_warehouses: int, num_edges: int, max_trucks: int):
+        self._block = shared_memory.SharedMemory(name=name)
+        # Attaching registers the block with this process's resource tracker,
+        # which would unlink it on exit; the simulation process owns it
+        resource_tracker.unregister(self._block._name, "shared_memory")
+        self.buffer = LiveBuffer(num_warehouses, num_edges, max_trucks, self._block.buf)
+        self.edges = self.buffer.edges.copy()
+
+    def read(self) -> Optional[LiveFrame]:
+        return self.buffer.read()
+
+    def close(self):
+        self.buffer = None
+        self._block.close()
@@ -0,0 +1,115 @@
+import bisect
+import numpy as np
+from typing import Hashable, List, Optional
+from src.core.agent import Agent
+from src.core.world import World, WorldListener
+
+
+class ObservationEncoder(WorldListener):
+    """
+    Incremental encoder for LogisticsEnv's flat observation.
+
+    Layout: [has_cargo, location feature] per truck, then the inventory size
+    of every warehouse, with trucks and warehouses ordered by ID. The role
+    lists are kept sorted as agents are added and removed, features are
+    written into a preallocated float32 buffer, and only agents marked dirty
+    since the last encode() are rewritten.
+
+    Truck moves made with World.place are picked up automatically; anything
+    else that changes a truck's cargo or a warehouse's inventory must call
+    mark_dirty(agent), as LogisticsEnv.step does.
+    """
+    def __init__(self, world: World, num_trucks: int, num_warehouses: int):
+        self.num_trucks = num_trucks
+        self.num_warehouses = num_warehouses
+        self.buffer = np.zeros((2 * num_trucks) + num_warehouses, dtype=np.float32)
+        self._clear()
+        world.add_listener(self)
+
+    def _clear(self):
+        self.trucks: List[Agent] = []
+        self.warehouses: List[Agent] = []
+        self._truck_ids: List[Hashable] = []
+        self._warehouse_ids: List[Hashable] = []
+        self._dirty = set()
+        self._dirty_from_truck: Optional[int] = None
+        self._dirty_from_warehouse: Optional[int] = None
+
+    def on_agent_added(self, agent: Agent):
+        if agent.role == "truck":
+            pos = bisect.bisect(self._truck_ids, agent.id)
+            self._truck_ids.insert(pos, agent.id)
+            self.trucks.insert(pos, agent)
+            self._dirty_from_truck = _min(self._dirty_from_truck, pos)
+        elif agent.role == "warehouse":
+            pos = bisect.bisect(self._warehouse_ids, agent.id)
+            self._warehouse_ids.insert(pos, agent.id)
+            self.warehouses.insert(pos, agent)
+            self._dirty_from_warehouse = _min(self._dirty_from_warehouse, pos)
+
+    def on_agent_removed(self, agent: Agent):
+        if agent.role == "truck":
+            pos = bisect.bisect_left(self._truck_ids, agent.id)
+            del self._truck_ids[pos]
+            del self.trucks[pos]
+            self._dirty_from_truck = _min(self._dirty_from_truck, pos)
+        elif agent.role == "warehouse":
+            pos = bisect.bisect_left(self._warehouse_ids, agent.id)
+            del self._warehouse_ids[pos]
+            del self.warehouses[pos]
+            self._dirty_from_warehouse = _min(self._dirty_from_warehouse, pos)
+        self._dirty.discard(agent)
+
+    def on_world_restored(self, world: World):
+        self._clear()
+        for agent in world.agents.values():
+            self.on_agent_added(agent)
+        # Rewrite every slot even if fewer agents came back
+        self._dirty_from_truck = 0
+        self._dirty_from_warehouse = 0
+
+    def on_agent_moved(self, agent: Agent, old_node: Optional[Hashable], new_node: Optional[Hashable]):
+        if agent.role == "truck":
+            self._dirty.add(agent)
+
+    def mark_dirty(self, agent: Agent):
+        self._dirty.add(agent)
+
+    def encode(self, copy: bool = True) -> np.ndarray:
+        """
+        Bring the buffer up to date and return it.
+        With copy=False the live buffer is returned; it changes on the next call.
+        """
+        buf = self.buffer
+        t = self.num_trucks
+        if self._dirty_from_truck is not None:
+            # Slots shifted: rewrite every truck from the first changed one
+            buf[2 * self._dirty_from_truck:2 * t] = 0.0
+            for slot in range(self._dirty_from_truck, min(len(self.trucks), t)):
+                self._write_truck(slot, self.trucks[slot])
+            self._dirty_from_truck = None
+        if self._dirty_from_warehouse is not None:
+            buf[2 * t + self._dirty_from_warehouse:] = 0.0
+            for slot in range(self._dirty_from_warehouse, min(len(self.warehouses), self.num_warehouses)):
+                buf[2 * t + slot] = len(self.warehouses[slot].inventory)
+            self._dirty_from_warehouse = None
+
+        for agent in self._dirty:
+            if agent.role == "truck":
+                slot = bisect.bisect_left(self._truck_ids, agent.id)
+                if slot < t:
+                    self._write_truck(slot, agent)
+            else:
+                slot = bisect.bisect_left(self._warehouse_ids, agent.id)
+                if slot < self.num_warehouses:
+                    buf[2 * t + slot] = len(agent.inventory)
+        self._dirty.clear()
+        return buf.copy() if copy else buf
+
+    def _write_truck(self, slot: int, truck: Agent):
+        self.buffer[2 * slot] = 1.0 if truck.cargo else 0.0
+        self.buffer[2 * slot + 1] = hash(truck.location) % 100 / 100.0
+
+
+def _min(current: Optional[int], pos: int) -> int:
+    return pos if current is None else min(current, pos)
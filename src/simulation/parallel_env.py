@@ -0,0 +1,232 @@
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from pettingzoo import ParallelEnv
+from typing import Dict, List, Optional, Tuple
+from src.core.ids import SequentialIdAllocator
+from src.core.world import World
+from src.agents.physical import WarehouseAgent
+
+
+def ring_world(num_warehouses: int) -> World:
+    """
+    The warehouse cycle LogisticsEnv.reset builds, without trucks.
+    """
+    world = World(id_allocator=SequentialIdAllocator())
+    warehouses = [WarehouseAgent(agent_id=world.next_id()) for _ in range(num_warehouses)]
+    for w in warehouses:
+        world.add_agent(w)
+    for i in range(num_warehouses):
+        world.connect_agents(warehouses[i].id, warehouses[(i + 1) % num_warehouses].id)
+    return world
+
+
+class LogisticsParallelEnv(ParallelEnv):
+    """
+    PettingZoo ParallelEnv where every truck is an agent with its own local
+    observation and reward.
+
+    The warehouse network comes from a World (a ring like LogisticsEnv by
+    default); it is read once into a padded neighbour table, and next hops
+    come from the world's RoutingTable. Trucks, cargo and warehouse queues
+    are plain arrays, and step_batch() applies every truck's action with
+    array operations, so the per-step cost does not grow with Python
+    objects. step() is the dict-based PettingZoo API on top of it.
+
+    Rules follow LogisticsEnv: action 0 stays, action k moves to the k-th
+    neighbour (no-op past the degree), an empty truck arriving at a
+    warehouse takes its oldest task (trucks arriving together take tasks in
+    agent order), and a loaded truck arriving at its cargo's destination
+    delivers it. New tasks arrive as a Poisson process with `task_rate`
+    tasks per step; tasks for a full warehouse queue are dropped.
+
+    Observation per truck: [location, has_cargo, cargo destination,
+    inventory here], then for each neighbour slot [exists, inventory,
+    on the shortest path to the cargo destination]. Node IDs are scaled
+    to [0, 1). Reward per truck: -0.01 per step, +10 per delivery it made.
+    """
+    metadata = {"name": "logistics_parallel_v0", "render_modes": []}
+
+    def __init__(self, num_trucks: int = 4, num_warehouses: int = 8, world: Optional[World] = None,
+                 max_episode_steps: int = 200, task_rate: float = 0.1, queue_capacity: int = 64):
+        self.world = world if world is not None else ring_world(num_warehouses)
+        routing = self.world.routing
+        if not routing.dense:
+            raise ValueError(f"Warehouse network exceeds the routing table's dense limit ({routing.dense_limit})")
+        routing.precompute()
+        # Routing indices keep tombstones (None) for removed warehouses;
+        # warehouses here are numbered 0..W-1 in routing order without them
+        live = np.array([i for i, node in enumerate(routing.nodes) if node is not None], dtype=np.int64)
+        compact = np.full(len(routing.nodes), -1, dtype=np.int64)
+        compact[live] = np.arange(len(live))
+        self.nodes = [routing.nodes[i] for i in live]
+        self.num_warehouses = len(self.nodes)
+        self.num_trucks = num_trucks
+        self.max_episode_steps = max_episode_steps
+        self.task_rate = task_rate
+        self.queue_capacity = queue_capacity
+
+        # Padded neighbour table
+        W = self.num_warehouses
+        nbrs = [[compact[routing.index[n]] for n in self.world.neighbors(node) if n in routing.index]
+                for node in self.nodes]
+        self.max_degree = max((len(n) for n in nbrs), default=0)
+        self.neighbors = np.full((W, max(self.max_degree, 1)), -1, dtype=np.int64)
+        for i, row in enumerate(nbrs):
+            self.neighbors[i, :len(row)] = row
+        self.degree = (self.neighbors >= 0).sum(axis=1)
+        # next_hop[s, d]: neighbour of s on a shortest path to d (-1 if none)
+        hops = routing.hops[np.ix_(live, live)].astype(np.int64)
+        self.next_hop = np.where(hops >= 0, compact[np.maximum(hops, 0)], -1)
+
+        self.possible_agents = [f"truck_{i}" for i in range(num_trucks)]
+        self.agent_index = {name: i for i, name in enumerate(self.possible_agents)}
+        self.agents: List[str] = []
+        self.obs_dim = 4 + 3 * self.max_degree
+        self._observation_space = spaces.Box(low=0.0, high=np.inf, shape=(self.obs_dim,), dtype=np.float32)
+        self._action_space = spaces.Discrete(1 + self.max_degree)
+
+        self.truck_loc = np.zeros(num_trucks, dtype=np.int64)
+        self.cargo_dest = np.full(num_trucks, -1, dtype=np.int64)
+        self.inv_dest = np.zeros((W, queue_capacity), dtype=np.int64)
+        self.inv_head = np.zeros(W, dtype=np.int64)
+        self.inv_count = np.zeros(W, dtype=np.int64)
+        self.tick_count = 0
+        self.dropped_tasks = 0
+        self._obs = np.zeros((num_trucks, self.obs_dim), dtype=np.float32)
+        self._np_random = seeding.np_random()[0]
+
+    def observation_space(self, agent: str) -> spaces.Box:
+        return self._observation_space
+
+    def action_space(self, agent: str) -> spaces.Discrete:
+        return self._action_space
+
+    # --- Batched API ---
+
+    def reset_batch(self, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Reset and return the (num_trucks, obs_dim) observation array.
+        """
+        if seed is not None:
+            self._np_random = seeding.np_random(seed)[0]
+            for i, space in enumerate((self._observation_space, self._action_space)):
+                space.seed(seed + i)
+        self.truck_loc[:] = self._np_random.integers(self.num_warehouses, size=self.num_trucks)
+        self.cargo_dest[:] = -1
+        self.inv_head[:] = 0
+        self.inv_count[:] = 0
+        self.tick_count = 0
+        self.dropped_tasks = 0
+        self.agents = list(self.possible_agents)
+        return self._get_obs()
+
+    def step_batch(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Apply one action per truck (array of length num_trucks).
+        Returns (observations, rewards, terminated, truncated) as arrays.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        loc = self.truck_loc
+        slot = actions - 1
+        moved = (actions > 0) & (slot < self.degree[loc])
+        dest = self.neighbors[loc, np.clip(slot, 0, self.neighbors.shape[1] - 1)]
+        loc[moved] = dest[moved]
+
+        empty = self.cargo_dest < 0
+        # Delivery: loaded truck arrives at its cargo's destination
+        drop = moved & ~empty & (self.cargo_dest == dest)
+        self.cargo_dest[drop] = -1
+
+        # Pickup: empty trucks arriving at the same warehouse take tasks in agent order
+        pickers = np.nonzero(moved & empty)[0]
+        if pickers.size:
+            w, rank, order = _group_ranks(dest[pickers])
+            take = rank < self.inv_count[w]
+            w, rank = w[take], rank[take]
+            taker = pickers[order][take]
+            self.cargo_dest[taker] = self.inv_dest[w, (self.inv_head[w] + rank) % self.queue_capacity]
+            taken = np.bincount(w, minlength=self.num_warehouses)
+            self.inv_head[:] = (self.inv_head + taken) % self.queue_capacity
+            self.inv_count -= taken
+
+        self._spawn_tasks()
+        self.tick_count += 1
+
+        rewards = np.where(drop, 10.0 - 0.01, -0.01)
+        terminated = np.zeros(self.num_trucks, dtype=bool)
+        truncated = np.full(self.num_trucks, self.tick_count >= self.max_episode_steps)
+        return self._get_obs(), rewards, terminated, truncated
+
+    def _spawn_tasks(self):
+        W = self.num_warehouses
+        n = self._np_random.poisson(self.task_rate) if W >= 2 else 0
+        if not n:
+            return
+        origin = self._np_random.integers(W, size=n)
+        dest = (origin + self._np_random.integers(1, W, size=n)) % W
+        w, rank, order = _group_ranks(origin)
+        fits = self.inv_count[w] + rank < self.queue_capacity
+        self.dropped_tasks += int((~fits).sum())
+        w, rank = w[fits], rank[fits]
+        tail = (self.inv_head[w] + self.inv_count[w] + rank) % self.queue_capacity
+        self.inv_dest[w, tail] = dest[order][fits]
+        self.inv_count += np.bincount(w, minlength=W)
+
+    def _get_obs(self) -> np.ndarray:
+        obs = self._obs
+        W = self.num_warehouses
+        loc, cargo = self.truck_loc, self.cargo_dest
+        loaded = cargo >= 0
+        obs[:, 0] = loc / W
+        obs[:, 1] = loaded
+        obs[:, 2] = np.where(loaded, cargo, 0) / W
+        obs[:, 3] = self.inv_count[loc]
+
+        nbrs = self.neighbors[loc, :self.max_degree]
+        exists = nbrs >= 0
+        hop = np.where(loaded, self.next_hop[loc, np.maximum(cargo, 0)], -1)
+        obs[:, 4::3] = exists
+        obs[:, 5::3] = np.where(exists, self.inv_count[np.maximum(nbrs, 0)], 0)
+        obs[:, 6::3] = exists & (nbrs == hop[:, None])
+        return obs.copy()
+
+    # --- PettingZoo API ---
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
+        obs = self.reset_batch(seed)
+        return {a: obs[i] for i, a in enumerate(self.agents)}, {a: {} for a in self.agents}
+
+    def step(self, actions: Dict[str, int]):
+        batch = np.zeros(self.num_trucks, dtype=np.int64)
+        for agent, action in actions.items():
+            batch[self.agent_index[agent]] = action
+        obs, rewards, terminated, truncated = self.step_batch(batch)
+        agents = self.agents
+        result = (
+            {a: obs[i] for i, a in enumerate(agents)},
+            {a: float(rewards[i]) for i, a in enumerate(agents)},
+            {a: bool(terminated[i]) for i, a in enumerate(agents)},
+            {a: bool(truncated[i]) for i, a in enumerate(agents)},
+            {a: {} for a in agents},
+        )
+        if truncated.any() or terminated.any():
+            self.agents = []
+        return result
+
+    def render(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _group_ranks(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stable-sort `keys` and number the entries within each run of equal keys.
+    Returns (sorted keys, rank within key, sort order).
+    """
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    rank = np.arange(len(keys)) - np.searchsorted(sorted_keys, sorted_keys, side="left")
+    return sorted_keys, rank, order
@@ -0,0 +1,182 @@
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+from typing import List, Optional, Sequence, Union
+
+
+def ring_neighbors(num_warehouses: int) -> np.ndarray:
+    """
+    Neighbour table of the warehouse cycle built by LogisticsEnv.reset.
+    Row w lists the neighbours of warehouse w in the same order as
+    World.neighbors (edge insertion order), padded with -1.
+    """
+    adj = [dict() for _ in range(num_warehouses)]
+    for i in range(num_warehouses):
+        j = (i + 1) % num_warehouses
+        adj[i][j] = True
+        adj[j][i] = True
+    max_degree = max((len(a) for a in adj), default=0)
+    table = np.full((num_warehouses, max(max_degree, 1)), -1, dtype=np.int64)
+    for w, nbrs in enumerate(adj):
+        table[w, :len(nbrs)] = list(nbrs)
+    return table
+
+
+class VecLogisticsEnv(VectorEnv):
+    """
+    Vectorized LogisticsEnv: steps `num_envs` independent worlds at once.
+
+    Truck locations, cargo, warehouse inventories and pending tasks live in
+    preallocated NumPy arrays instead of Agent objects, and the move / pickup /
+    deliver / spawn rules of LogisticsEnv.step are applied to every episode
+    with array operations. Trucks are processed one index at a time (vectorized
+    over envs) so two trucks arriving at the same warehouse in one step pick
+    tasks in the same order as the scalar env.
+
+    Each sub-env draws from its own Generator seeded like LogisticsEnv.reset,
+    so env i reset with seed s + i follows the same trajectory as a scalar
+    LogisticsEnv reset with seed s + i.
+
+    Actions beyond a warehouse's degree are no-ops in both envs.
+
+    With the dense per-world IDs LogisticsEnv assigns (warehouse i has ID i),
+    observations match the scalar env exactly, including the location
+    feature `hash(location) % 100 / 100`.
+    """
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(self, num_envs: int = 8, num_trucks: int = 4, num_warehouses: int = 8,
+                 max_episode_steps: int = 200, spawn_prob: float = 0.1):
+        self.num_envs = num_envs
+        self.num_trucks = num_trucks
+        self.num_warehouses = num_warehouses
+        self.max_episode_steps = max_episode_steps
+        self.spawn_prob = spawn_prob
+
+        self.single_action_space = spaces.MultiDiscrete([5] * num_trucks)
+        obs_dim = (2 * num_trucks) + num_warehouses
+        self.single_observation_space = spaces.Box(low=0, high=100, shape=(obs_dim,), dtype=np.float32)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+        # Static topology shared by every sub-env
+        self.neighbors = ring_neighbors(num_warehouses)
+        self.degree = (self.neighbors >= 0).sum(axis=1)
+
+        # Dynamic state. A warehouse receives at most one task per step, so a
+        # ring buffer of max_episode_steps slots can never overflow.
+        n, t, w = num_envs, num_trucks, num_warehouses
+        self.queue_capacity = max(max_episode_steps, 1)
+        self.truck_loc = np.zeros((n, t), dtype=np.int64)
+        self.cargo_dest = np.full((n, t), -1, dtype=np.int64)  # -1 = empty
+        self.inv_dest = np.zeros((n, w, self.queue_capacity), dtype=np.int64)
+        self.inv_head = np.zeros((n, w), dtype=np.int64)
+        self.inv_count = np.zeros((n, w), dtype=np.int64)
+        self.tick_count = np.zeros(n, dtype=np.int64)
+
+        self._obs = np.zeros((n, obs_dim), dtype=np.float32)
+        self._rewards = np.zeros(n, dtype=np.float64)
+        self._autoreset = np.zeros(n, dtype=bool)
+        self._rngs: List[np.random.Generator] = [seeding.np_random()[0] for _ in range(n)]
+        self._env_index = np.arange(n)
+
+    def reset(self, *, seed: Optional[Union[int, Sequence[Optional[int]]]] = None, options=None):
+        if seed is not None:
+            seeds = [seed + i for i in range(self.num_envs)] if isinstance(seed, int) else list(seed)
+            if len(seeds) != self.num_envs:
+                raise ValueError(f"Expected {self.num_envs} seeds, got {len(seeds)}")
+            self._rngs = [seeding.np_random(s)[0] for s in seeds]
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        self._autoreset[:] = False
+        return self._get_obs(), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs, self.num_trucks)
+        resetting = self._autoreset.copy()
+        active = ~resetting
+
+        delivered = self._move_trucks(actions, active)
+        self._spawn_tasks(active)
+        self.tick_count[active] += 1
+
+        self._rewards[:] = 0.0
+        self._rewards[active] = -0.01 + 10.0 * delivered[active].sum(axis=1)
+
+        if resetting.any():
+            self._reset_envs(resetting)
+
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = active & (self.tick_count >= self.max_episode_steps)
+        self._autoreset = terminated | truncated
+        return self._get_obs(), self._rewards.copy(), terminated, truncated, {}
+
+    def _reset_envs(self, mask: np.ndarray):
+        """
+        Reset the sub-envs selected by `mask`, drawing truck start positions
+        from each env's own RNG.
+        """
+        self.cargo_dest[mask] = -1
+        self.inv_head[mask] = 0
+        self.inv_count[mask] = 0
+        self.tick_count[mask] = 0
+        for i in np.nonzero(mask)[0]:
+            self.truck_loc[i] = self._rngs[i].integers(self.num_warehouses, size=self.num_trucks)
+
+    def _move_trucks(self, actions: np.ndarray, active: np.ndarray) -> np.ndarray:
+        """
+        Apply one action per truck in every active env.
+        Returns a (num_envs, num_trucks) bool array of deliveries made this step.
+        """
+        delivered = np.zeros((self.num_envs, self.num_trucks), dtype=bool)
+        max_degree = self.neighbors.shape[1]
+        for t in range(self.num_trucks):
+            action = actions[:, t]
+            loc = self.truck_loc[:, t]
+            slot = action - 1
+            moved = active & (action > 0) & (slot < self.degree[loc])
+            dest = self.neighbors[loc, np.clip(slot, 0, max_degree - 1)]
+            self.truck_loc[moved, t] = dest[moved]
+
+            cargo = self.cargo_dest[:, t]
+            empty = cargo < 0
+
+            # Pickup: empty truck takes the oldest task waiting at its new node
+            pick = np.nonzero(moved & empty & (self.inv_count[self._env_index, dest] > 0))[0]
+            if pick.size:
+                w = dest[pick]
+                head = self.inv_head[pick, w]
+                self.cargo_dest[pick, t] = self.inv_dest[pick, w, head]
+                self.inv_head[pick, w] = (head + 1) % self.queue_capacity
+                self.inv_count[pick, w] -= 1
+
+            # Delivery: loaded truck arrives at its cargo's destination
+            drop = moved & ~empty & (cargo == dest)
+            self.cargo_dest[drop, t] = -1
+            delivered[:, t] = drop
+        return delivered
+
+    def _spawn_tasks(self, active: np.ndarray):
+        """
+        Spawn a task with probability spawn_prob in every active env.
+        RNG draws stay per env so each sub-env matches the scalar stream.
+        """
+        if self.num_warehouses < 2:
+            for i in np.nonzero(active)[0]:
+                self._rngs[i].random()
+            return
+        for i in np.nonzero(active)[0]:
+            rng = self._rngs[i]
+            if rng.random() < self.spawn_prob:
+                origin, dest = rng.choice(self.num_warehouses, 2, replace=False)
+                tail = (self.inv_head[i, origin] + self.inv_count[i, origin]) % self.queue_capacity
+                self.inv_dest[i, origin, tail] = dest
+                self.inv_count[i, origin] += 1
+
+    def _get_obs(self) -> np.ndarray:
+        t = self.num_trucks
+        self._obs[:, 0:2 * t:2] = self.cargo_dest >= 0
+        self._obs[:, 1:2 * t:2] = (self.truck_loc % 100) / 100.0
+        self._obs[:, 2 * t:] = self.inv_count
+        return self._obs.copy()
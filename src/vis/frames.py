@@ -0,0 +1,201 @@
+import io
+import os
+import queue
+import struct
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+class FrameSink:
+    """
+    Destination for rendered frames. Visualizer.draw() hands each frame
+    over as an (H, W, 4) uint8 RGBA array that is only valid during the
+    call (it is the canvas buffer, overwritten by the next render), so
+    sinks must encode or copy it before returning.
+    """
+    def write(self, frame: np.ndarray, tick: int):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PNGFrameSink(FrameSink):
+    """
+    One PNG per frame, named like the original Visualizer output
+    (vis_tick_NNN.png), for tools that glob frame files.
+    """
+    def __init__(self, output_dir: str = ".", pattern: str = "vis_tick_{tick:03d}.png"):
+        self.output_dir = output_dir
+        self.pattern = pattern
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, frame: np.ndarray, tick: int):
+        Image.fromarray(frame, "RGBA").save(os.path.join(self.output_dir, self.pattern.format(tick=tick)))
+
+
+class GifWriter:
+    """
+    Streams an animated GIF to disk one frame at a time.
+
+    Each frame is quantized and LZW-encoded by PIL on its own (as a
+    single-frame GIF in memory); its image block is then appended to the
+    output with a local colour table and a delay. Only the current frame
+    is ever held, so memory stays flat however long the animation.
+    """
+    def __init__(self, path: str, duration: int = 200, loop: int = 0):
+        self.path = path
+        self.delay = max(int(round(duration / 10)), 1)  # GIF delays are in 1/100 s
+        self.loop = loop
+        self.num_frames = 0
+        self._size: Optional[Tuple[int, int]] = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "wb")
+
+    def write(self, image: Image.Image):
+        """
+        Append one frame (any PIL mode; RGBA/RGB are quantized to 256 colours).
+        """
+        if image.mode != "P":
+            image = image.convert("RGB").quantize(colors=256, method=Image.Quantize.FASTOCTREE,
+                                                  dither=Image.Dither.NONE)
+        if self._size is None:
+            self._size = image.size
+            self._write_header(*image.size)
+        elif image.size != self._size:
+            raise ValueError(f"Frame size {image.size} differs from the first frame's {self._size}")
+        buf = io.BytesIO()
+        image.save(buf, format="GIF", interlace=False)
+        palette, block = _split_gif(buf.getvalue())
+        # Graphic Control Extension: disposal "leave in place", delay
+        self._file.write(b"\x21\xf9\x04\x04" + struct.pack("<H", self.delay) + b"\x00\x00")
+        self._file.write(block[:9])
+        if palette is not None:
+            # Move the single-frame file's global colour table into this frame
+            bits = (len(palette) // 3).bit_length() - 2
+            self._file.write(bytes([(block[9] & 0x40) | 0x80 | bits]) + palette)
+        else:
+            self._file.write(block[9:10])
+        self._file.write(block[10:])
+        self.num_frames += 1
+
+    def write_array(self, frame: np.ndarray):
+        self.write(Image.fromarray(frame))
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._size is None:
+            # No frames: leave a valid 1x1 GIF rather than an empty file
+            self.write(Image.new("P", (1, 1)))
+        self._file.write(b"\x3b")
+        self._file.close()
+
+    def _write_header(self, width: int, height: int):
+        f = self._file
+        f.write(b"GIF89a" + struct.pack("<HH", width, height) + b"\x00\x00\x00")
+        # NETSCAPE2.0 application extension: loop count
+        f.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\x00")
+
+
+def _split_gif(data: bytes) -> Tuple[Optional[bytes], bytes]:
+    """
+    Split a single-frame GIF into (global colour table, image block). The
+    image block runs from the image descriptor to the end of its data.
+    """
+    flags = data[10]
+    pos = 13
+    palette = None
+    if flags & 0x80:
+        size = 3 << ((flags & 0x07) + 1)
+        palette = data[pos:pos + size]
+        pos += size
+    while data[pos] == 0x21:
+        # Skip extension blocks: introducer, label, then data sub-blocks
+        pos += 2
+        while data[pos]:
+            pos += data[pos] + 1
+        pos += 1
+    if data[pos] != 0x2c:
+        raise ValueError("No image descriptor in encoded frame")
+    start = pos
+    local = data[pos + 9]
+    pos += 10
+    if local & 0x80:
+        pos += 3 << ((local & 0x07) + 1)
+    pos += 1  # LZW minimum code size
+    while data[pos]:
+        pos += data[pos] + 1
+    return palette, data[start:pos + 1]
+
+
+class GifFrameSink(FrameSink):
+    """
+    Animated GIF encoded incrementally with GifWriter: memory does not grow
+    with the number of frames.
+
+    With background=True, write() only copies the frame into a queue of at
+    most `max_pending` frames and a thread quantizes and encodes it, so the
+    simulation loop pays little more than the copy; when the queue is full,
+    write() waits (bounded memory beats dropping frames).
+    """
+    def __init__(self, path: str, duration: int = 200, loop: int = 0, background: bool = False,
+                 max_pending: int = 8):
+        self.path = path
+        self.writer = GifWriter(path, duration=duration, loop=loop)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._queue: Optional[queue.Queue] = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._run, name="gif-encoder", daemon=True)
+            self._thread.start()
+
+    @property
+    def num_frames(self) -> int:
+        return self.writer.num_frames
+
+    def write(self, frame: np.ndarray, tick: int):
+        if self._queue is None:
+            self.writer.write_array(frame)
+            return
+        if self._error is not None:
+            self._raise_error()
+        self._queue.put(frame.copy())
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._queue is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self.writer.close()
+        self._raise_error()
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is None:
+                try:
+                    self.writer.write_array(frame)
+                except BaseException as e:  # surfaced on the next write()/close()
+                    self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Encoding {self.path} failed") from error
@@ -1,46 +1,160 @@
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+
 from src.core.world import World
+from src.vis.frames import FrameSink, PNGFrameSink
+
+ROLE_COLORS = {"truck": "blue", "warehouse": "red", "task": "green"}
 
-import os
 
 class Visualizer:
-    def __init__(self, world: World, output_dir: str = "."):
+    """
+    Renders the world on one persistent matplotlib figure.
+
+    Static nodes (the warehouse topology plus agents that are not placed
+    anywhere) get a spring layout computed once and extended only when new
+    nodes appear; existing nodes keep their positions. The static layer
+    (edges, nodes, labels) is rendered once and cached as a background.
+    Each frame restores it and draws only the trucks and tasks (one
+    scatter placed around their node's cached position) and the title.
+
+    draw() passes the RGBA frame to `sink`; by default a PNGFrameSink in
+    `output_dir`, as before. Use a GifFrameSink to encode in memory instead,
+    or render() to get the frame directly (e.g. for a dashboard).
+    """
+    def __init__(self, world: World, output_dir: str = ".", sink: Optional[FrameSink] = None,
+                 figsize: Tuple[float, float] = (6.4, 4.8), dpi: int = 100, labels: bool = True):
         self.world = world
         self.output_dir = output_dir
-        self.fig, self.ax = plt.subplots()
-        
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
+        self.sink = sink if sink is not None else PNGFrameSink(output_dir)
+        self.labels = labels
+        self.fig, self.ax = plt.subplots(figsize=figsize, dpi=dpi)
+        self.ax.set_axis_off()
+
+        self.pos: Dict[Hashable, np.ndarray] = {}
+        self._layout_topology = None
+        self._layout_nodes: frozenset = frozenset()
+        self._edges = LineCollection([], colors="black", linewidths=1.0, zorder=1)
+        self.ax.add_collection(self._edges)
+        self._nodes = self.ax.scatter([], [], s=300, zorder=2)
+        self._occupants = self.ax.scatter([], [], s=60, zorder=3, edgecolors="white", linewidths=0.5)
+        self._labels: List = []
+        self._title = self.ax.set_title("")
+        # Per-frame artists are left out of the cached background
+        self._occupants.set_animated(True)
+        self._title.set_animated(True)
+        self._background = None
+        self._rgba: Dict[str, Tuple[float, ...]] = {}
+        # Distance of trucks/tasks from their node, scaled with the layout
+        self._radius = 0.05
+
+    def render(self) -> np.ndarray:
+        """
+        Update the figure to the current world state and return the frame as
+        an (H, W, 4) uint8 array backed by the canvas (valid until the next
+        render).
+        """
+        world = self.world
+        canvas = self.fig.canvas
+        if self._update_layout() or self._background is None:
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.fig.bbox)
+        else:
+            canvas.restore_region(self._background)
+
+        placed = world.occupancy.occupants
+        offsets, colors = [], []
+        for node, occupants in placed.items():
+            center = self.pos.get(node)
+            if center is None:
+                continue
+            k = len(occupants)
+            for i, agent_id in enumerate(occupants):
+                angle = 2 * math.pi * i / k
+                offsets.append((center[0] + self._radius * math.cos(angle),
+                                center[1] + self._radius * math.sin(angle)))
+                colors.append(self._color(world.agents.get(agent_id)))
+        self._occupants.set_offsets(np.array(offsets).reshape(-1, 2))
+        self._occupants.set_facecolors(colors)
+        self._title.set_text(f"Tick: {world.tick_count}")
+
+        self.ax.draw_artist(self._occupants)
+        self.ax.draw_artist(self._title)
+        return np.asarray(canvas.buffer_rgba())
 
     def draw(self):
-        self.ax.clear()
-        pos = nx.spring_layout(self.world.graph, seed=42)
-        
-        # Draw nodes
-        colors = []
-        labels = {}
-        for node in self.world.graph.nodes():
-            agent = self.world.agents.get(node)
-            if agent:
-                labels[node] = f"{agent.role[:1]}.{agent.id[:4]}"
-                if agent.role == "truck":
-                    colors.append("blue")
-                elif agent.role == "warehouse":
-                    colors.append("red")
-                elif agent.role == "task":
-                    colors.append("green")
-                else:
-                    colors.append("gray")
-            else:
-                colors.append("black")
-                labels[node] = "?"
-        
-        nx.draw(self.world.graph, pos, ax=self.ax, node_color=colors, with_labels=True, labels=labels)
-        self.ax.set_title(f"Tick: {self.world.tick_count}")
-        
-        filepath = os.path.join(self.output_dir, f"vis_tick_{self.world.tick_count:03d}.png")
-        self.fig.savefig(filepath)
+        """
+        Render the current tick and hand the frame to the sink.
+        """
+        self.sink.write(self.render(), self.world.tick_count)
 
     def close(self):
+        self.sink.close()
         plt.close(self.fig)
+
+    def _update_layout(self) -> bool:
+        """
+        Bring the static layer up to date; returns True if it changed.
+        """
+        world = self.world
+        topology = world.topology
+        occupancy = world.occupancy.location
+        nodes = frozenset(topology.nodes).union(a for a in world.agents if a not in occupancy)
+        if topology is self._layout_topology and nodes == self._layout_nodes:
+            return False
+        graph = nx.Graph()
+        graph.add_nodes_from(nodes)
+        graph.add_edges_from((u, v) for u, v, _ in topology.edges())
+        new = nodes - self.pos.keys()
+        if new:
+            # Extend the layout: known nodes stay where they are
+            fixed = [n for n in nodes if n in self.pos]
+            initial = {n: self.pos[n] for n in fixed} or None
+            try:
+                layout = nx.spring_layout(graph, pos=initial, fixed=fixed or None, seed=42)
+            except ImportError:
+                # networkx needs scipy for spring layouts of 500+ nodes
+                layout = nx.circular_layout(graph)
+            self.pos.update((n, np.asarray(layout[n])) for n in new)
+        for n in [n for n in self.pos if n not in nodes]:
+            del self.pos[n]
+        self._layout_topology, self._layout_nodes = topology, nodes
+
+        order = list(graph.nodes)
+        xy = np.array([self.pos[n] for n in order]).reshape(-1, 2)
+        self._edges.set_segments([(self.pos[u], self.pos[v]) for u, v in graph.edges])
+        self._nodes.set_offsets(xy)
+        self._nodes.set_facecolors([self._color(world.agents.get(n)) for n in order])
+        for text in self._labels:
+            text.remove()
+        self._labels = []
+        if self.labels:
+            for n, (x, y) in zip(order, xy):
+                agent = world.agents.get(n)
+                self._labels.append(self.ax.text(x, y, agent.name if agent else "?", ha="center", va="center",
+                                                 fontsize=8, color="white", zorder=4))
+
+        # Fit the view and scale the occupant ring to the layout size
+        if len(xy):
+            lo, hi = xy.min(axis=0), xy.max(axis=0)
+            span = max(float((hi - lo).max()), 1.0)
+            margin = 0.1 * span
+            self.ax.set_xlim(lo[0] - margin, hi[0] + margin)
+            self.ax.set_ylim(lo[1] - margin, hi[1] + margin)
+            self._radius = 0.06 * span
+        else:
+            self._radius = 0.05
+        return True
+
+    def _color(self, agent) -> Tuple[float, ...]:
+        name = "black" if agent is None else ROLE_COLORS.get(agent.role, "gray")
+        rgba = self._rgba.get(name)
+        if rgba is None:
+            rgba = self._rgba[name] = to_rgba(name)
+        return rgba
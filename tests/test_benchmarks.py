@@ -0,0 +1,23 @@
+import unittest
+from benchmarks.harness import Benchmark, compare, key, run
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def test_run_and_compare(self):
+        calls = []
+        bench = Benchmark("noop", lambda n: (lambda: calls.append(n)), [{"n": 1}, {"n": 2}],
+                          items=lambda n: n)
+        results = run([bench], quick=True, repeat=2, min_time=0.001, log=lambda line: None)
+        self.assertEqual([r["key"] for r in results["results"]], ["noop[n=1]"])
+        self.assertGreater(results["results"][0]["items_per_sec"], 0)
+        self.assertTrue(calls)
+
+        baseline = {"results": [dict(results["results"][0], median=results["results"][0]["median"] / 2)]}
+        regressions = compare(results, baseline, threshold=0.5)
+        self.assertEqual([r[0] for r in regressions], ["noop[n=1]"])
+        self.assertEqual(compare(results, baseline, threshold=1.5), [])
+        self.assertEqual(key("env_step", {"warehouses": 8, "trucks": 4}), "env_step[trucks=4,warehouses=8]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,48 @@
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
 import unittest
+import numpy as np
+import torch
 from src.core.agent import Agent
 from src.core.world import World
-from src.core.communication import MessageType
+from src.core.communication import CommunicationChannel, FrozenMessage, Mailbox, Message, MessagePool, MessageType
+from src.core.store import AgentStore
+from src.core.ids import SequentialIdAllocator
+from src.core.metrics import MetricsLogger, StreamingMetricsLogger, read_metrics
+from src.core.profiler import TickProfiler
+from src.core.events import EventScheduler
+from src.core.async_world import AsyncWorld
+from src.core.scheduler import ParallelScheduler, SequentialScheduler
+from src.learning.policy import RandomPolicy, RuleBasedPolicy
+from src.learning.rl_policy import RLPolicy
+from src.core.sharding import ShardedWorld
+from src.agents.physical import TruckAgent, WarehouseAgent
+from src.agents.abstract import TaskAgent
+
+class PingAgent(Agent):
+    def decide(self):
+        actions = super().decide()
+        self.send_message(self.peer, MessageType.INFO, self.id)
+        return actions
+
+    def process_messages(self):
+        self.state.setdefault("seen", []).extend(msg.content for msg in self.inbox)
+        self.inbox.clear()
+
+def echo_id(state, world_view):
+    return [state["id"]]
+
+def advance_trucks(world):
+    # Move every truck one step around the warehouse ring (ids 0..3)
+    for agent in list(world.agents.values()):
+        if agent.role == "truck":
+            world.place(agent.id, (agent.location + 1) % 4)
+        elif isinstance(agent, PingAgent):
+            agent.state["draw"] = (random.random(), np.random.random())
 
 class TestCoreEngine(unittest.TestCase):
     def test_agent_creation(self):
@@ -9,6 +50,330 @@ class TestCoreEngine(unittest.TestCase):
         self.assertIsNotNone(agent.id)
         self.assertEqual(agent.role, "tester")
 
+    def test_world_id_allocator(self):
+        world = World(id_allocator=SequentialIdAllocator())
+        agents = [Agent(agent_id=world.next_id()) for _ in range(3)]
+        for agent in agents:
+            world.add_agent(agent)
+        self.assertEqual([a.id for a in agents], [0, 1, 2])
+        with self.assertRaises(ValueError):
+            world.add_agent(Agent(agent_id=1))
+        # Allocators travel with snapshots and keep counting
+        fork = world.fork()
+        self.assertEqual([fork.next_id(), world.next_id()], [3, 3])
+        self.assertEqual(SequentialIdAllocator(start=1, step=4).allocate(), 1)
+
+    def test_role_index(self):
+        world = World()
+        trucks = [TruckAgent() for _ in range(2)]
+        warehouse = WarehouseAgent()
+        for agent in trucks + [warehouse]:
+            world.add_agent(agent)
+        self.assertEqual(world.agents_by_role("truck"), tuple(trucks))
+        self.assertIs(world.agents_by_role("truck"), world.agents_by_role("truck"))
+        self.assertEqual(world.agents_of_type(Agent), tuple(trucks + [warehouse]))
+
+        world.remove_agent(trucks[0].id)
+        self.assertEqual(world.agents_by_role("truck"), (trucks[1],))
+        self.assertEqual(world.agents_of_type(TruckAgent), (trucks[1],))
+        self.assertEqual(world.agents_by_role("task"), ())
+
+    def test_routing_table(self):
+        world = World(id_allocator=SequentialIdAllocator())
+        for _ in range(6):
+            world.add_agent(WarehouseAgent(agent_id=world.next_id()))
+        for i in range(6):
+            world.connect_agents(i, (i + 1) % 6)
+        routing = world.routing
+        self.assertEqual(routing.next_hop(0, 2), 1)
+        self.assertEqual(routing.next_hop(0, 4), 5)
+        self.assertEqual(routing.distance(0, 3), 3.0)
+
+        # Cutting 0-1 forces the long way round; only affected rows are rebuilt
+        routing.precompute()
+        world.disconnect_agents(0, 1)
+        self.assertFalse(routing.row_valid[0])
+        self.assertEqual(routing.next_hop(0, 2), 5)
+        world.connect_agents(0, 3, weight=0.5)
+        self.assertEqual(routing.next_hop(0, 2), 3)
+
+        truck = TruckAgent(agent_id=world.next_id())
+        truck.location = 0
+        truck.cargo.append(world.next_id())
+        world.add_agent(truck)
+        task = TaskAgent(origin=0, destination=2, agent_id=truck.cargo[0])
+        world.add_agent(task)
+        truck.perceive(world)
+        self.assertEqual(truck.decide(), [("move", 3)])
+
+    def test_topology_and_occupancy(self):
+        world = World(id_allocator=SequentialIdAllocator())
+        for _ in range(3):
+            world.add_agent(WarehouseAgent(agent_id=world.next_id()))
+        world.connect_agents(0, 1)
+        world.connect_agents(0, 2, weight=2.0)
+        truck = TruckAgent(agent_id=world.next_id())
+        task = TaskAgent(origin=0, destination=2, agent_id=world.next_id())
+        world.add_agent(truck)
+        world.add_agent(task)
+        world.place(truck.id, 0)
+        world.place(task.id, 0)
+
+        topology = world.topology
+        self.assertEqual(world.neighbors(0), (1, 2))
+        self.assertEqual(list(topology.weights[topology.indptr[0]:topology.indptr[1]]), [1.0, 2.0])
+        self.assertEqual(world.occupants(0), (truck.id, task.id))
+        self.assertEqual(sorted(world.graph.neighbors(0)), [1, 2, truck.id, task.id])
+
+        world.place(truck.id, 1)
+        self.assertIs(world.topology, topology)
+        self.assertEqual(truck.location, 1)
+        self.assertEqual(world.occupants(0), (task.id,))
+        self.assertTrue(world.graph.has_edge(truck.id, 1))
+        self.assertEqual(world.get_state()["edges"], 4)
+
+        world.remove_agent(1)
+        self.assertEqual(world.neighbors(0), (2,))
+        self.assertIsNone(world.location_of(truck.id))
+
+    def test_snapshot_restore_and_fork(self):
+        policy = RuleBasedPolicy(lambda state, view: [])
+        world = World(id_allocator=SequentialIdAllocator())
+        for _ in range(3):
+            world.add_agent(WarehouseAgent(agent_id=world.next_id()))
+        world.connect_agents(0, 1)
+        world.connect_agents(1, 2)
+        truck = TruckAgent(agent_id=world.next_id())
+        truck.policy = policy
+        world.add_agent(truck)
+        world.place(truck.id, 0)
+        world.agents[0].inventory.append("task")
+        world.comm_channel.send(Message(truck.id, 1, MessageType.ASK, "Any tasks?"))
+        self.assertEqual(world.routing.next_hop(0, 2), 1)
+        snapshot = world.snapshot()
+
+        world.place(truck.id, 2)
+        world.agents[0].inventory.clear()
+        world.add_agent(Agent(agent_id=world.next_id()))
+        world.tick()
+        world.restore(snapshot)
+        self.assertEqual(world.tick_count, 0)
+        self.assertEqual(len(world.agents), 4)
+        self.assertEqual(world.agents[truck.id].location, 0)
+        self.assertEqual(world.occupants(0), (truck.id,))
+        self.assertEqual(world.agents[0].inventory, ["task"])
+        self.assertEqual(world.comm_channel.pending(), 1)
+        self.assertIs(world.agents[truck.id].policy, policy)
+        self.assertEqual(world.next_id(), 4)
+        self.assertEqual(world.routing.next_hop(0, 2), 1)
+
+        fork = world.fork()
+        self.assertIs(fork.topology, world.topology)
+        fork.connect_agents(0, 2)
+        fork.agents[0].inventory.append("other")
+        self.assertEqual(fork.routing.next_hop(0, 2), 2)
+        self.assertEqual(world.neighbors(0), (1,))
+        self.assertEqual(world.agents[0].inventory, ["task"])
+
+    def test_streaming_metrics_logger(self):
+        with tempfile.TemporaryDirectory() as path:
+            logger = StreamingMetricsLogger(path, flush_rows=10, flush_interval=0.05)
+            for i in range(25):
+                metrics = {"reward": 1.0}
+                if i >= 20:
+                    metrics["deliveries"] = i
+                logger.log(i, metrics)
+            logger.flush()
+            self.assertEqual(logger.rows_written, 25)
+            logger.log(25, {"reward": 2, "status": "ok"})
+            # The time trigger writes the last row without another flush
+            deadline = time.time() + 5
+            while logger.rows_written < 26 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(logger.rows_written, 26)
+            logger.close()
+
+            columns = read_metrics(path)
+            np.testing.assert_array_equal(columns["tick"], np.arange(26))
+            self.assertEqual(columns["reward"][-1], 2.0)
+            self.assertTrue(np.isnan(columns["deliveries"][:20]).all())
+            self.assertEqual(columns["deliveries"][24], 24)
+            self.assertEqual(columns["status"][-1], "ok")
+            self.assertIsNone(columns["status"][0])
+            self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(path)))
+
+        # Several threads against a one-batch queue and a busy time trigger
+        with tempfile.TemporaryDirectory() as path:
+            logger = StreamingMetricsLogger(path, flush_rows=3, flush_interval=0.001, max_pending=1)
+
+            def work(k):
+                for i in range(500):
+                    logger.log(i, {"thread": k})
+            threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=30)
+            logger.close()
+            columns = read_metrics(path)
+            for k in range(4):
+                np.testing.assert_array_equal(columns["tick"][columns["thread"] == k], np.arange(500))
+
+    def test_tick_profiler(self):
+        world = World(id_allocator=SequentialIdAllocator())
+        a = PingAgent(agent_id=world.next_id(), role="pinger")
+        b = PingAgent(agent_id=world.next_id(), role="pinger")
+        a.peer, b.peer = b.id, a.id
+        world.add_agent(a)
+        world.add_agent(b)
+        self.assertNotIn("profile", world.get_state())
+
+        profiler = TickProfiler()
+        world.set_profiler(profiler)
+        world.add_agent(Agent(agent_id=world.next_id()))
+        world.connect_agents(a.id, b.id)
+        for _ in range(3):
+            world.tick()
+        world.remove_agent(2)
+
+        profile = world.get_state()["profile"]
+        self.assertEqual(profile["ticks"], 3)
+        self.assertEqual(set(profile["phase_ms_per_tick"]),
+                         {"deliver", "decide", "collect", "act", "release", "listeners"})
+        self.assertEqual(profile["decide"]["pinger"]["count"], 6)
+        self.assertEqual(profile["decide"]["generic"]["count"], 3)
+        self.assertEqual(profile["counters"]["messages_routed"], 4)
+        self.assertEqual(profile["counters"]["agents_added"], 1)
+        self.assertEqual(profile["counters"]["agents_removed"], 1)
+        self.assertEqual(profile["counters"]["edges_added"], 1)
+
+        metrics = profiler.to_metrics(reset=True)
+        self.assertEqual(metrics["profile.messages_routed"], 4)
+        self.assertIn("profile.decide.pinger.p99_us", metrics)
+        MetricsLogger().log(world.tick_count, metrics)
+        self.assertEqual(profiler.summary()["ticks"], 0)
+
+        world.set_profiler(None)
+        self.assertNotIn(profiler, world.listeners)
+
+    def test_event_scheduler_wakes_only_due_agents(self):
+        scheduler = EventScheduler()
+        world = World(scheduler=scheduler, id_allocator=SequentialIdAllocator())
+        warehouse = WarehouseAgent(agent_id=world.next_id())
+        world.add_agent(warehouse)
+        tasks = [TaskAgent(origin=0, destination=0, agent_id=world.next_id()) for _ in range(50)]
+        for task in tasks:
+            world.add_agent(task)
+            warehouse.inventory.append(task.id)
+        truck = TruckAgent(agent_id=world.next_id())
+        world.add_agent(truck)
+        world.place(truck.id, warehouse.id)
+        slow = Agent(agent_id=world.next_id())
+        slow.wake_interval = 3
+        world.add_agent(slow)
+
+        decided = []
+        for _ in range(7):
+            world.tick()
+            decided.append(scheduler.last_due)
+        # Tick 1: everyone's first decision (tasks are passive and never run).
+        # Then the truck every tick, the warehouse whenever the truck's ASK
+        # arrives, `slow` every 3 ticks.
+        self.assertEqual(decided[0], 3)
+        self.assertEqual(decided[1:], [2, 2, 3, 2, 2, 3])
+        # ASK for the warehouse and its BID back to the truck, both in flight
+        self.assertEqual(world.comm_channel.pending(), 2)
+
+        scheduler.wake(slow.id)
+        scheduler.wake(tasks[0].id)
+        world.remove_agent(tasks[1].id)
+        world.tick()
+        self.assertEqual(scheduler.last_due, 3)
+
+        fork = world.fork()
+        self.assertIsNot(fork.scheduler, scheduler)
+        fork.tick()
+        self.assertEqual(fork.scheduler.last_due, 3)
+
+    def test_async_world_runs_decisions_concurrently(self):
+        class PlannerAgent(Agent):
+            # Asks a stand-in planner that answers after `delay` seconds
+            def __init__(self, delay, **kwargs):
+                super().__init__(role="planner", **kwargs)
+                self.delay = delay
+                self.plans = []
+
+            async def adecide(self):
+                self.process_messages()
+                await asyncio.sleep(self.delay)
+                self.plans.append("plan")
+                return ["plan"]
+
+            def default_action(self):
+                self.plans.append("wait")
+                return ["wait"]
+
+        world = AsyncWorld(decide_timeout=0.2)
+        planners = [PlannerAgent(0.05) for _ in range(20)]
+        late = PlannerAgent(5.0)
+        late.decide_timeout = 0.1
+        plain = PingAgent()
+        plain.peer = planners[0].id
+        for agent in planners + [late, plain]:
+            world.add_agent(agent)
+        world.set_profiler(TickProfiler())
+
+        start = time.perf_counter()
+        world.tick()
+        world.tick()
+        elapsed = time.perf_counter() - start
+        # Two ticks of 20 x 50 ms decisions plus a 5 s planner, in well under a second
+        self.assertLess(elapsed, 1.0)
+        self.assertTrue(all(p.plans == ["plan", "plan"] for p in planners))
+        self.assertEqual(late.plans, ["wait", "wait"])
+        self.assertEqual(world.scheduler.last_timeouts, [late.id])
+        self.assertEqual(world.profiler.counters["decide_timeouts"], 2)
+        # Synchronous agents still decide, and their messages are routed
+        self.assertEqual(len(planners[0].inbox), 0)
+        self.assertEqual(world.comm_channel.pending(), 1)
+
+        async def drive():
+            await world.atick()
+        asyncio.run(drive())
+        self.assertEqual(world.tick_count, 3)
+        world.close()
+
+    def test_async_world_agent_errors_propagate(self):
+        class FailingAgent(Agent):
+            # Its own client gives up: not the scheduler's deadline
+            async def adecide(self):
+                await asyncio.sleep(0.01)
+                raise asyncio.TimeoutError("planner unreachable")
+
+        class SlowAgent(Agent):
+            cancelled = False
+
+            async def adecide(self):
+                try:
+                    await asyncio.sleep(5.0)
+                except asyncio.CancelledError:
+                    SlowAgent.cancelled = True
+                    raise
+                return []
+
+        world = AsyncWorld(decide_timeout=1.0)
+        world.add_agent(FailingAgent())
+        world.add_agent(SlowAgent())
+        start = time.perf_counter()
+        with self.assertRaisesRegex(asyncio.TimeoutError, "planner unreachable"):
+            world.tick()
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(world.scheduler.last_timeouts, [])
+        # The other decision was cancelled rather than left running on the loop
+        self.assertTrue(SlowAgent.cancelled)
+        self.assertEqual(asyncio.all_tasks(world._loop), set())
+        world.close()
+
     def test_world_tick(self):
         world = World()
         agent1 = Agent(role="sender")
@@ -32,6 +397,252 @@ class TestCoreEngine(unittest.TestCase):
         self.assertEqual(len(agent2.inbox), 1)
         self.assertEqual(agent2.inbox[0].content, "Hello")
         self.assertEqual(agent2.inbox[0].sender_id, agent1.id)
+    def test_channel_routing(self):
+        channel = CommunicationChannel()
+        sender, a, b = Agent(), Agent(), Agent()
+        b.inbox = Mailbox(capacity=1, policy=Mailbox.BACKPRESSURE)
+        agents = {x.id: x for x in (sender, a, b)}
+
+        msg = Message(sender.id, None, MessageType.INFO, "hi")
+        channel.multicast(msg, [a.id, b.id])
+        channel.send(Message(sender.id, b.id, MessageType.INFO, "second"))
+        channel.send(Message(sender.id, "missing", MessageType.INFO, "lost"))
+
+        self.assertEqual(channel.route(agents), 2)
+        self.assertIs(a.inbox[0], b.inbox[0])
+        self.assertEqual(channel.dropped, 1)
+        # The second message for b waits in the channel until b has room
+        self.assertEqual(channel.pending(), 1)
+        b.inbox.clear()
+        channel.route(agents)
+        self.assertEqual(b.inbox[0].content, "second")
+
+        capped = Mailbox(capacity=2)
+        for i in range(3):
+            capped.append(Message(sender.id, a.id, MessageType.INFO, i))
+        self.assertEqual([m.content for m in capped], [1, 2])
+        self.assertEqual(capped.dropped, 1)
+
+    def test_message_pool_and_freeze(self):
+        pool = MessagePool()
+        world = World(message_pool=pool)
+        world.comm_channel.freeze = True
+        sender, receiver = Agent(), Agent()
+        world.add_agent(sender)
+        world.add_agent(receiver)
+        for _ in range(3):
+            sender.send_message(receiver.id, MessageType.INFO, "ping")
+            world.tick()
+        # Each message is recycled the tick after it is sent
+        self.assertGreater(pool.reused, 0)
+        self.assertEqual(pool.allocated, 2)
+
+        msg = Message(sender.id, receiver.id, MessageType.INFO, "x").freeze()
+        with self.assertRaises(AttributeError):
+            msg.content = "y"
+
+        # Frozen messages in flight survive snapshots and forks
+        world = World()
+        world.comm_channel.freeze = True
+        sender, receiver = Agent(), PingAgent()
+        receiver.peer = sender.id
+        world.add_agent(sender)
+        world.add_agent(receiver)
+        sender.send_message(receiver.id, MessageType.INFO, "ping")
+        sender.broadcast(MessageType.ASK, "all", receiver_ids=[sender.id, receiver.id])
+        world.tick()
+        fork = world.fork()
+        queues = fork.comm_channel.queues
+        self.assertEqual([m.content for m in queues[receiver.id]], ["ping", "all"])
+        self.assertTrue(all(type(m) is FrozenMessage for m in queues[receiver.id]))
+        # The multicast message is still one object shared by both queues
+        shared = [m for m in queues[sender.id] if m.content == "all"]
+        self.assertIs(shared[0], queues[receiver.id][1])
+        fork.tick()
+        self.assertEqual(fork.agents[receiver.id].state["seen"], ["ping", "all"])
+
+    def test_parallel_scheduler_is_deterministic(self):
+        def run():
+            scheduler = ParallelScheduler(num_shards=3, seed=5)
+            world = World(scheduler=scheduler, id_allocator=SequentialIdAllocator())
+            for _ in range(10):
+                agent = PingAgent(agent_id=world.next_id())
+                agent.peer = (agent.id + 1) % 10
+                world.add_agent(agent)
+            world.tick()
+            scheduler.close()
+            return [msg.content for msg in world.comm_channel.deliver()]
+
+        first = run()
+        self.assertEqual(sorted(first), list(range(10)))
+        self.assertEqual(first, run())
+
+    def test_parallel_scheduler_process_mode(self):
+        policy = RuleBasedPolicy(echo_id)
+
+        def run(scheduler):
+            world = World(scheduler=scheduler, id_allocator=SequentialIdAllocator())
+            for _ in range(8):
+                agent = PingAgent(policy=policy, agent_id=world.next_id())
+                agent.peer = (agent.id + 1) % 8
+                agent.state["id"] = agent.id
+                world.add_agent(agent)
+            world.tick()
+            world.tick()
+            decisions = scheduler.run(world)
+            scheduler.close()
+            return world, decisions
+
+        world, decisions = run(ParallelScheduler(num_shards=3, seed=5, use_processes=True))
+        _, expected = run(ParallelScheduler(num_shards=3, seed=5))
+        self.assertEqual(decisions, expected)
+        # Worker state comes back, but agents keep the shared policy
+        for agent in world.agents.values():
+            self.assertIs(agent.policy, policy)
+            self.assertEqual(agent.state["seen"], [(agent.id - 1) % 8])
+
+        scheduler = ParallelScheduler(num_shards=2)
+        world = World(scheduler=scheduler, message_pool=MessagePool())
+        world.add_agent(Agent())
+        with self.assertRaises(ValueError):
+            world.tick()
+        scheduler.close()
+
+    def test_parallel_scheduler_seeds_policies(self):
+        torch.manual_seed(0)
+        rl = RLPolicy(input_dim=3, output_dim=4)
+        rand = RandomPolicy(list(range(100)))
+        vectors = np.random.default_rng(0).random((12, 3)).astype(np.float32)
+
+        def run(use_processes=False):
+            scheduler = ParallelScheduler(num_shards=3, seed=7, use_processes=use_processes)
+            world = World(scheduler=scheduler, id_allocator=SequentialIdAllocator())
+            for i in range(12):
+                agent = Agent(policy=rl if i % 2 else rand, agent_id=world.next_id())
+                agent.state["vector"] = vectors[i]
+                world.add_agent(agent)
+            try:
+                return scheduler.run(world)
+            finally:
+                scheduler.close()
+
+        first = run()
+        # Log-probs come back in decision order, one per RL agent
+        rl_decisions = [(agent_id, actions) for agent_id, actions in first if agent_id % 2]
+        self.assertEqual(len(rl.saved_log_probs), 6)
+        with torch.no_grad():
+            for (agent_id, actions), log_prob in zip(rl_decisions, rl.saved_log_probs):
+                probs = rl.network(torch.from_numpy(vectors[agent_id]))
+                self.assertAlmostEqual(log_prob.item(), torch.log(probs[actions[0]]).item(), places=5)
+        # Per-shard streams make thread runs reproducible
+        self.assertEqual(run(), first)
+
+        with self.assertRaises(ValueError):
+            run(use_processes=True)
+        rl.eval()
+        self.assertEqual(run(use_processes=True), first)
+
+    def test_batched_policy_decisions(self):
+        class CountingPolicy(RuleBasedPolicy):
+            batches = 0
+
+            def decide_batch(self, agent_states, world_view):
+                self.batches += 1
+                return super().decide_batch(agent_states, world_view)
+
+        policy = CountingPolicy(lambda state, view: [state["n"]])
+        world = World(scheduler=SequentialScheduler(batch_policies=True), id_allocator=SequentialIdAllocator())
+        for n in range(5):
+            agent = Agent(policy=policy, agent_id=world.next_id())
+            agent.state["n"] = n
+            world.add_agent(agent)
+        world.add_agent(PingAgent(agent_id=world.next_id()))
+        world.agents[5].peer = 0
+
+        decisions = world.scheduler.run(world)
+        self.assertEqual(policy.batches, 1)
+        self.assertEqual(sorted(aid for aid, _ in decisions), list(range(6)))
+        for agent_id, actions in decisions:
+            self.assertEqual(actions, [agent_id] if agent_id < 5 else [])
+
+        rl = RLPolicy(input_dim=3, output_dim=4)
+        states = [{"vector": [0.0, 1.0, 2.0]}, {}, {"vector": [1.0, 0.0, 0.0]}]
+        actions = rl.decide_batch(states, None)
+        self.assertEqual([len(a) for a in actions], [1, 0, 1])
+        self.assertEqual(len(rl.saved_log_probs), 2)
+        rl.eval()
+        rl.decide_batch(states, None)
+        self.assertEqual(len(rl.saved_log_probs), 2)
+
+    def test_sharded_world(self):
+        world = World(id_allocator=SequentialIdAllocator())
+        warehouses = [WarehouseAgent(agent_id=world.next_id()) for _ in range(4)]
+        pingers = [PingAgent(agent_id=world.next_id()) for _ in range(2)]
+        pingers[0].peer, pingers[1].peer = pingers[1].id, pingers[0].id
+        # Insertion order puts the two pingers at opposite ends of the partition
+        for agent in [pingers[0]] + warehouses + [pingers[1]]:
+            world.add_agent(agent)
+        for i in range(4):
+            world.connect_agents(i, (i + 1) % 4)
+        truck = TruckAgent(agent_id=world.next_id())
+        world.add_agent(truck)
+        world.place(truck.id, 0)
+
+        sharded = ShardedWorld(world, num_shards=2, step_fn=advance_trucks)
+        try:
+            self.assertNotEqual(sharded.owner[pingers[0].id], sharded.owner[pingers[1].id])
+            for _ in range(5):
+                sharded.tick()
+            agents = sharded.collect()
+        finally:
+            sharded.close()
+        self.assertEqual(len(agents), 7)
+        self.assertEqual(agents[truck.id].location, 1)
+        self.assertIn(pingers[1].id, agents[pingers[0].id].state["seen"])
+        self.assertIn(pingers[0].id, agents[pingers[1].id].state["seen"])
+
+        # Two identical shards draw different, reproducible random streams
+        def draws():
+            world = World(id_allocator=SequentialIdAllocator())
+            pingers = [PingAgent(agent_id=world.next_id()) for _ in range(2)]
+            pingers[0].peer, pingers[1].peer = pingers[1].id, pingers[0].id
+            for agent in pingers:
+                world.add_agent(agent)
+            sharded = ShardedWorld(world, num_shards=2, step_fn=advance_trucks, seed=3)
+            try:
+                sharded.tick()
+                agents = sharded.collect()
+            finally:
+                sharded.close()
+            return [agents[p.id].state["draw"] for p in pingers]
+
+        first = draws()
+        self.assertNotEqual(first[0][1], first[1][1])
+        self.assertEqual(first, draws())
+
+    def test_columnar_store(self):
+        world = World(store=AgentStore(capacity=2))
+        w1, w2 = WarehouseAgent(), WarehouseAgent()
+        truck = TruckAgent(capacity=2)
+        for agent in (w1, w2, truck):
+            world.add_agent(agent)
+        world.connect_agents(w1.id, w2.id)
+        world.place(truck.id, w1.id)
+
+        store = world.store
+        self.assertEqual(store.name(store.column("location")[store.index_of(truck.id)]), w1.id)
+        truck.perceive(world)
+        self.assertEqual(truck.state["neighbors"], [w2.id])
+
+        truck.cargo.append("task-a")
+        truck.cargo.append("task-b")
+        self.assertEqual(truck.cargo.pop(0), "task-a")
+        self.assertEqual(list(truck.cargo), ["task-b"])
+        self.assertEqual(truck.capacity, 2)
+
+        world.remove_agent(truck.id)
+        self.assertEqual(truck.cargo, ["task-b"])
+        self.assertEqual(truck.location, w1.id)
 
 if __name__ == '__main__':
     unittest.main()
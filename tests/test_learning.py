@@ -0,0 +1,78 @@
+import functools
+import unittest
+import numpy as np
+import torch
+from src.simulation.environment import LogisticsEnv
+from src.learning.actors import ActorPool
+from src.learning.rl_policy import RLPolicy
+from src.learning.rollout import RolloutBuffer
+
+
+class TestRolloutBuffer(unittest.TestCase):
+    def test_returns_and_gae(self):
+        rng = np.random.default_rng(0)
+        T, N, gamma = 6, 3, 0.9
+        buffer = RolloutBuffer(num_steps=T, num_agents=N, obs_dim=2, gamma=gamma, gae_lambda=1.0)
+        rewards = rng.normal(size=(T, N)).astype(np.float32)
+        dones = np.zeros((T, N), dtype=bool)
+        dones[2, 1] = True
+        for t in range(T):
+            buffer.add(np.zeros(2), np.zeros(N), rewards[t], dones[t])
+        self.assertTrue(buffer.full)
+
+        returns = buffer.compute_returns()
+        for n in range(N):
+            running = 0.0
+            for t in reversed(range(T)):
+                running = rewards[t, n] + (0.0 if dones[t, n] else gamma * running)
+                self.assertAlmostEqual(returns[t, n], running, places=5)
+        # With zero values and lambda = 1, advantages are the discounted returns
+        expected = returns.copy()
+        np.testing.assert_allclose(buffer.compute_gae(), expected, rtol=1e-5)
+
+    def test_evaluate_actions_matches_sampling(self):
+        torch.manual_seed(0)
+        policy = RLPolicy(input_dim=4, output_dim=5)
+        buffer = RolloutBuffer(num_steps=3, num_agents=2, obs_dim=4)
+        for _ in range(3):
+            obs = np.random.rand(4).astype(np.float32)
+            actions = [a[0] for a in policy.decide_batch([{"vector": obs}] * 2, None)]
+            buffer.add(obs, actions, 1.0, False)
+
+        batch = buffer.tensors()
+        self.assertEqual(tuple(batch["obs"].shape), (6, 4))
+        log_probs, entropy = policy.evaluate_actions(batch["obs"], batch["actions"])
+        saved = torch.stack(policy.saved_log_probs)
+        torch.testing.assert_close(log_probs, saved)
+        self.assertEqual(tuple(entropy.shape), (6,))
+
+
+class TestActorPool(unittest.TestCase):
+    def test_rollouts_follow_published_weights(self):
+        env_fn = functools.partial(LogisticsEnv, num_trucks=2, num_warehouses=3)
+        policy_fn = functools.partial(RLPolicy, input_dim=7, output_dim=5)
+        policy = policy_fn()
+        buffer = RolloutBuffer(num_steps=200, num_agents=2, obs_dim=7)
+        with ActorPool(env_fn, policy_fn, num_agents=2, num_workers=2, policy=policy) as pool:
+            info = pool.next_rollout(buffer, timeout=60)
+            self.assertEqual(info.steps, 200)
+            self.assertEqual(len(buffer), 200)
+            self.assertTrue(buffer.dones[199].all())
+            self.assertTrue(np.isin(buffer.actions[:200], range(5)).all())
+
+            version = pool.publish(policy)
+            versions = [pool.next_rollout(buffer, timeout=60).policy_version for _ in range(6)]
+            self.assertEqual(versions[-1], version)
+
+    def test_failed_actor_is_reported(self):
+        # The env has 2 trucks, not 3: every actor fails on startup
+        env_fn = functools.partial(LogisticsEnv, num_trucks=2, num_warehouses=3)
+        policy_fn = functools.partial(RLPolicy, input_dim=7, output_dim=5)
+        buffer = RolloutBuffer(num_steps=200, num_agents=3, obs_dim=7)
+        with ActorPool(env_fn, policy_fn, num_agents=3, num_workers=1) as pool:
+            with self.assertRaisesRegex(RuntimeError, "ActorPool expects 3"):
+                pool.next_rollout(buffer, timeout=60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+import functools
+import tempfile
+import time
+import unittest
+import numpy as np
+from src.simulation.environment import LogisticsEnv
+from src.simulation.vec_env import VecLogisticsEnv
+from src.simulation.parallel_env import LogisticsParallelEnv, ring_world
+from pettingzoo.test import parallel_api_test
+from src.core.trajectory import TrajectoryReader, TrajectoryRecorder
+from src.simulation.live import LiveSimulation
+from src.agents.abstract import TaskAgent
+
+
+def scalar_state(env: LogisticsEnv):
+    """
+    Project the scalar env's agents onto the index space used by VecLogisticsEnv.
+    """
+    agents = list(env.world.agents.values())
+    warehouses = [a for a in agents if a.role == "warehouse"]
+    trucks = [a for a in agents if a.role == "truck"]
+    index = {w.id: i for i, w in enumerate(warehouses)}
+    locations = [index[t.location] for t in trucks]
+    cargo = [index[env.world.agents[t.cargo[0]].destination] if t.cargo else -1 for t in trucks]
+    inventory = [len(w.inventory) for w in warehouses]
+    return locations, cargo, inventory
+
+
+class TestLogisticsEnv(unittest.TestCase):
+    def test_waiting_tasks_are_not_scheduled(self):
+        env = LogisticsEnv(num_trucks=4, num_warehouses=8)
+        env.reset(seed=0)
+        world = env.world
+        warehouses = world.agents_by_role("warehouse")
+        for i in range(2000):
+            origin = warehouses[i % 8]
+            task = TaskAgent(origin=origin.id, destination=warehouses[(i + 1) % 8].id, agent_id=world.next_id())
+            world.add_agent(task)
+            world.place(task.id, origin.id)
+            origin.inventory.append(task.id)
+
+        scheduled = []
+        run = world.scheduler.run
+
+        def counting_run(w):
+            decisions = run(w)
+            scheduled.append(len(decisions))
+            return decisions
+        world.scheduler.run = counting_run
+        for _ in range(5):
+            env.step([1, 2, 0, 1])
+        self.assertEqual(scheduled, [12] * 5)
+        self.assertEqual(len(world.active_agents), 12)
+
+    def test_step_reports_deliveries(self):
+        env = LogisticsEnv(num_trucks=4, num_warehouses=4)
+        env.reset(seed=3)
+        rng = np.random.default_rng(3)
+        total = 0
+        for _ in range(200):
+            _, reward, _, _, info = env.step(rng.integers(env.action_space.nvec).tolist())
+            self.assertAlmostEqual(reward, -0.01 + 10.0 * info["deliveries"])
+            self.assertGreaterEqual(info["pickups"], 0)
+            total += info["deliveries"]
+        self.assertGreater(total, 0)
+
+
+class TestVecLogisticsEnv(unittest.TestCase):
+    def test_matches_scalar_env(self):
+        num_envs, num_trucks, num_warehouses, seed = 3, 4, 6, 7
+        vec = VecLogisticsEnv(num_envs=num_envs, num_trucks=num_trucks, num_warehouses=num_warehouses)
+        scalars = [LogisticsEnv(num_trucks=num_trucks, num_warehouses=num_warehouses) for _ in range(num_envs)]
+
+        vec.reset(seed=seed)
+        for i, env in enumerate(scalars):
+            env.reset(seed=seed + i)
+
+        # Actions past a warehouse's degree are no-ops in both envs
+        action_rng = np.random.default_rng(0)
+        for _ in range(vec.max_episode_steps):
+            actions = action_rng.integers(0, 5, size=(num_envs, num_trucks))
+            obs, rewards, _, truncated, _ = vec.step(actions)
+            for i, env in enumerate(scalars):
+                scalar_obs, reward, _, trunc, _ = env.step(list(actions[i]))
+                np.testing.assert_array_equal(obs[i], scalar_obs)
+                locations, cargo, inventory = scalar_state(env)
+                self.assertEqual(list(vec.truck_loc[i]), locations)
+                self.assertEqual(list(vec.cargo_dest[i]), cargo)
+                self.assertEqual(list(vec.inv_count[i]), inventory)
+                self.assertAlmostEqual(rewards[i], reward)
+                self.assertEqual(truncated[i], trunc)
+
+    def test_next_step_autoreset(self):
+        vec = VecLogisticsEnv(num_envs=2, num_trucks=2, num_warehouses=4, max_episode_steps=3)
+        vec.reset(seed=0)
+        actions = np.ones((2, 2), dtype=np.int64)
+        for _ in range(3):
+            obs, rewards, terminated, truncated, _ = vec.step(actions)
+        self.assertTrue(truncated.all())
+        obs, rewards, terminated, truncated, _ = vec.step(actions)
+        self.assertTrue((rewards == 0).all())
+        self.assertFalse(truncated.any())
+        self.assertTrue((vec.tick_count == 0).all())
+        self.assertEqual(obs.shape, vec.observation_space.shape)
+
+    def test_columnar_env_matches_object_env(self):
+        envs = [LogisticsEnv(num_trucks=3, num_warehouses=5, columnar=c) for c in (False, True)]
+        for env in envs:
+            env.reset(seed=3)
+        action_rng = np.random.default_rng(1)
+        for _ in range(100):
+            actions = list(action_rng.integers(0, 3, size=3))
+            rewards = [env.step(actions)[1] for env in envs]
+            self.assertEqual(rewards[0], rewards[1])
+            self.assertEqual(scalar_state(envs[0]), scalar_state(envs[1]))
+
+    def test_observation_encoder_tracks_agent_set(self):
+        env = LogisticsEnv(num_trucks=3, num_warehouses=4, copy_obs=False)
+        obs, _ = env.reset(seed=0)
+        self.assertIs(obs, env.step([1, 1, 1])[0])
+
+        # Removing a truck shifts the remaining ones down a slot
+        first = min(a.id for a in env.world.agents.values() if a.role == "truck")
+        env.world.remove_agent(first)
+        obs = env._get_obs()
+        trucks = sorted((a for a in env.world.agents.values() if a.role == "truck"), key=lambda a: a.id)
+        expected = []
+        for truck in trucks:
+            expected += [1.0 if truck.cargo else 0.0, hash(truck.location) % 100 / 100.0]
+        np.testing.assert_allclose(obs[:4], expected)
+        np.testing.assert_array_equal(obs[4:6], 0.0)
+
+
+class TestLogisticsParallelEnv(unittest.TestCase):
+    def test_parallel_api(self):
+        parallel_api_test(LogisticsParallelEnv(num_trucks=3, num_warehouses=5), num_cycles=250)
+
+    def test_batched_pickup_and_delivery(self):
+        env = LogisticsParallelEnv(num_trucks=3, num_warehouses=4, task_rate=0.0)
+        env.reset_batch(seed=0)
+        # Two tasks queued at warehouse 1; three empty trucks arrive from 0 and 2
+        env.truck_loc[:] = [0, 2, 0]
+        env.inv_dest[1, :2] = [3, 2]
+        env.inv_count[1] = 2
+        ring = [list(row) for row in env.neighbors]
+        actions = [ring[0].index(1) + 1, ring[2].index(1) + 1, ring[0].index(1) + 1]
+        obs, rewards, _, _ = env.step_batch(np.array(actions))
+        self.assertEqual(list(env.truck_loc), [1, 1, 1])
+        self.assertEqual(list(env.cargo_dest), [3, 2, -1])
+        self.assertEqual(env.inv_count[1], 0)
+        np.testing.assert_array_equal(obs[:, 1], [1.0, 1.0, 0.0])
+
+        # Truck 1 follows its next-hop flag to warehouse 2 and delivers
+        hop_slot = int(np.argmax(obs[1, 6::3]))
+        _, rewards, _, _ = env.step_batch(np.array([0, hop_slot + 1, 0]))
+        self.assertEqual(env.truck_loc[1], 2)
+        np.testing.assert_allclose(rewards, [-0.01, 9.99, -0.01])
+
+    def test_network_with_removed_warehouse(self):
+        world = ring_world(5)
+        world.routing.precompute()
+        # Removing warehouse 2 leaves a tombstone in the routing table
+        world.remove_agent(2)
+        world.connect_agents(1, 3)
+        env = LogisticsParallelEnv(num_trucks=2, world=world)
+        self.assertEqual(env.nodes, [0, 1, 3, 4])
+        # Compact ring 0-1-2-3 (warehouses 0, 1, 3, 4)
+        self.assertEqual([sorted(n for n in row if n >= 0) for row in env.neighbors],
+                         [[1, 3], [0, 2], [1, 3], [0, 2]])
+        self.assertEqual(env.next_hop[0, 1], 1)
+        self.assertEqual(env.next_hop[0, 3], 3)
+        self.assertEqual(env.next_hop[1, 2], 2)
+        self.assertIn(env.next_hop[0, 2], (1, 3))
+        env.reset_batch(seed=0)
+        env.step_batch(np.ones(2, dtype=np.int64))
+        self.assertTrue(((env.truck_loc >= 0) & (env.truck_loc < 4)).all())
+
+
+class TestTrajectoryRecorder(unittest.TestCase):
+    def snapshot(self, world):
+        return {aid: (world.location_of(aid), len(getattr(a, "cargo", ())), len(getattr(a, "inventory", ())))
+                for aid, a in world.agents.items()}
+
+    def test_replay_matches_live_run(self):
+        env = LogisticsEnv(num_trucks=3, num_warehouses=4)
+        env.reset(seed=0)
+        rng = np.random.default_rng(0)
+        expected = []
+        with tempfile.TemporaryDirectory() as path:
+            recorder = TrajectoryRecorder(env.world, path, chunk_frames=16)
+            for episode in range(2):
+                for _ in range(30):
+                    env.step(list(rng.integers(0, 5, size=3)))
+                    expected.append((env.world.tick_count, self.snapshot(env.world)))
+                env.reset(seed=episode + 1)
+            recorder.close()
+
+            reader = TrajectoryReader(path)
+            self.assertEqual(len(reader), 60)
+            self.assertEqual(len(reader.chunks), 4)
+            for state in reader.iter_states():
+                replayed = {reader.agent_ids[a]: (None if loc < 0 else reader.agent_ids[loc], c, i)
+                            for a, loc, c, i in zip(state.agents, state.location, state.cargo, state.inventory)}
+                self.assertEqual((state.tick, replayed), expected[state.frame])
+
+            state = reader.state_at(45)
+            self.assertEqual(state.tick, 16)
+            self.assertEqual(len(state.edges), 4)
+            self.assertTrue(np.all(reader.events(20, 40)["frame"] >= 20))
+
+
+class TestLiveSimulation(unittest.TestCase):
+    def test_publishes_downsampled_state(self):
+        env_fn = functools.partial(LogisticsEnv, num_trucks=6, num_warehouses=5)
+        with LiveSimulation(env_fn, publish_interval=0.01, max_trucks=4, max_steps=500) as sim:
+            self.assertEqual(sim.edges.shape, (5, 2))
+            frame = sim.read()
+            deadline = time.time() + 30
+            while (frame is None or not frame.finished) and time.time() < deadline:
+                time.sleep(0.05)
+                frame = sim.read()
+            self.assertTrue(frame.finished)
+            self.assertEqual(frame.steps, 500)
+            self.assertEqual(frame.episode, 2)
+            self.assertEqual(frame.tick, 100)
+            self.assertEqual(frame.trucks_at.sum(), 6)
+            self.assertLessEqual(frame.loaded_at.sum(), 6)
+            # Six trucks sampled with stride 2 to fit max_trucks
+            self.assertEqual(len(frame.truck_location), 3)
+            self.assertTrue(np.isin(frame.truck_location, range(5)).all())
+            self.assertEqual(frame.metrics["agents"], 5 + 6 + frame.inventory.sum() + frame.loaded_at.sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
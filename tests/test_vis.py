@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from PIL import Image, ImageSequence
+from src.agents.physical import WarehouseAgent
+from src.simulation.environment import LogisticsEnv
+from src.vis.frames import GifFrameSink, GifWriter, PNGFrameSink
+from src.vis.visualizer import Visualizer
+
+
+class TestVisualizer(unittest.TestCase):
+    def test_layout_is_cached_and_extended(self):
+        env = LogisticsEnv(num_trucks=2, num_warehouses=4)
+        env.reset(seed=0)
+        with tempfile.TemporaryDirectory() as path:
+            vis = Visualizer(env.world, sink=PNGFrameSink(path))
+            vis.draw()
+            first = {n: p.copy() for n, p in vis.pos.items()}
+            self.assertEqual(set(first), set(env.world.topology.nodes))
+
+            env.step([1, 1])
+            frame = vis.render()
+            self.assertEqual(frame.shape[2], 4)
+            for n, p in first.items():
+                np.testing.assert_array_equal(vis.pos[n], p)
+
+            w = WarehouseAgent(agent_id=env.world.next_id())
+            env.world.add_agent(w)
+            env.world.connect_agents(w.id, 0)
+            vis.draw()
+            self.assertIn(w.id, vis.pos)
+            for n, p in first.items():
+                np.testing.assert_array_equal(vis.pos[n], p)
+            vis.close()
+            self.assertEqual(len(os.listdir(path)), 2)
+
+    def test_gif_sink(self):
+        env = LogisticsEnv(num_trucks=2, num_warehouses=4)
+        env.reset(seed=0)
+        with tempfile.TemporaryDirectory() as path:
+            gif = os.path.join(path, "run.gif")
+            vis = Visualizer(env.world, sink=GifFrameSink(gif, duration=50, background=True, max_pending=2))
+            for _ in range(5):
+                env.step([1, 2])
+                vis.draw()
+            vis.close()
+            with Image.open(gif) as image:
+                self.assertEqual(image.n_frames, 5)
+                self.assertEqual(image.info["duration"], 50)
+
+    def test_gif_writer_streams_exact_frames(self):
+        frames = []
+        for i in range(4):
+            frame = np.full((30, 40, 4), 255, dtype=np.uint8)
+            frame[5:15, 5 + 5 * i:15 + 5 * i, :3] = (200, 40 * i, 0)
+            frames.append(frame)
+        with tempfile.TemporaryDirectory() as path:
+            gif = os.path.join(path, "frames.gif")
+            writer = GifWriter(gif, duration=100)
+            for frame in frames:
+                writer.write_array(frame)
+            writer.close()
+            with Image.open(gif) as image:
+                decoded = [np.asarray(f.convert("RGB")) for f in ImageSequence.Iterator(image)]
+            self.assertEqual(len(decoded), 4)
+            for got, expected in zip(decoded, frames):
+                np.testing.assert_array_equal(got, expected[:, :, :3])
+
+
+if __name__ == '__main__':
+    unittest.main()